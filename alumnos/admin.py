@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Alumno, InscripcionCarrera
+from .models import Alumno, InscripcionCarrera, RegistroAcademico
 
 
 @admin.register(Alumno)
@@ -15,3 +15,11 @@ class InscripcionCarreraAdmin(admin.ModelAdmin):
     list_filter = ['activa', 'carrera']
     search_fields = ['alumno__nombre', 'alumno__apellido', 'carrera__nombre']
     date_hierarchy = 'fecha_inscripcion'
+
+
+@admin.register(RegistroAcademico)
+class RegistroAcademicoAdmin(admin.ModelAdmin):
+    list_display = ['alumno', 'carrera', 'materias_aprobadas', 'promedio', 'carga_horaria', 'fecha_actualizacion']
+    list_filter = ['carrera']
+    search_fields = ['alumno__nombre', 'alumno__apellido', 'alumno__numero_legajo']
+    readonly_fields = ['fecha_actualizacion']
@@ -0,0 +1,298 @@
+"""
+Certificados de alumnos (analítico y constancia de alumno regular)
+Los datos de cada certificado se leen con consultas masivas y se reducen a
+un dict plano; su hash SHA-256 (la "huella") identifica el contenido:
+- si ya existe en disco un PDF con esa huella, se sirve tal cual
+- si no, se renderiza en un pool de procesos (alumnos.pdf) y se guarda
+  con escritura atómica, borrando las versiones anteriores del alumno;
+  obtener_documento devuelve el archivo ya abierto, así que un pedido
+  concurrente que sirve una versión anterior no se queda sin ella
+- el PDF se guarda al terminar el render aunque el pedido que lo lanzó
+  haya dejado de esperar (DocumentoEnPreparacion), y los pedidos del
+  mismo contenido mientras tanto esperan ese render en lugar de repetirlo
+Cualquier cambio en las filas de origen cambia la huella, así que no hace
+falta invalidar nada a mano.
+"""
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FuturesTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from pathlib import Path
+
+from django.conf import settings
+from django.db.models import Count
+from django.utils import timezone
+
+from inscripciones.models import Inscripcion, InscripcionArchivada, PeriodoLectivo
+from materias.models import Materia
+from .models import Alumno, InscripcionCarrera
+from .pdf import renderizar
+
+
+TIPOS = ['analitico', 'constancia']
+
+# Cambiar al modificar el diseño de los PDF para regenerar los ya guardados
+VERSION_PLANTILLA = 1
+
+# Alumnos cuyos datos se leen juntos en el modo por lote
+LOTE_DATOS = 200
+
+_pool = None
+_pool_lock = threading.Lock()
+
+# Renders en curso: ruta del PDF -> Future
+_en_curso = {}
+_en_curso_lock = threading.Lock()
+
+
+class DocumentoEnPreparacion(Exception):
+    """El render superó DOCUMENTOS_TIMEOUT; sigue en curso y se guardará al terminar"""
+
+
+def get_pool():
+    """
+    Pool de procesos compartido por las vistas
+    Se crea al primer uso con 'spawn': los procesos hijos solo importan
+    alumnos.pdf y no heredan conexiones ni hilos del servidor.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.DOCUMENTOS_PROCESOS,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return _pool
+
+
+def _descartar_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def _formatear_periodo(anio, cuatrimestre):
+    return f'{anio} - {cuatrimestre}° C' if cuatrimestre else str(anio)
+
+
+def recopilar_datos(tipo, alumno_ids):
+    """
+    Datos planos de los certificados de varios alumnos: {alumno_id: datos}
+    La cantidad de consultas no depende de la cantidad de alumnos.
+    """
+    if tipo not in TIPOS:
+        raise ValueError(f'Tipo de certificado desconocido: {tipo}')
+    alumno_ids = list(alumno_ids)
+
+    datos = {
+        fila['id']: {
+            'institucion': settings.DOCUMENTOS_INSTITUCION,
+            'alumno': {campo: fila[campo] for campo in ('nombre', 'apellido', 'dni', 'numero_legajo')},
+            'carreras': [],
+        }
+        for fila in Alumno.objects.filter(pk__in=alumno_ids).values(
+            'id', 'nombre', 'apellido', 'dni', 'numero_legajo'
+        )
+    }
+
+    carreras = defaultdict(list)
+    for fila in InscripcionCarrera.objects.filter(
+        alumno_id__in=datos, activa=True
+    ).order_by('carrera__nombre').values('alumno_id', 'carrera_id', 'carrera__nombre', 'fecha_inscripcion'):
+        carreras[fila['alumno_id']].append(fila)
+
+    if tipo == 'analitico':
+        _completar_analitico(datos, carreras)
+    else:
+        _completar_constancia(datos, carreras)
+
+    for alumno_datos in datos.values():
+        alumno_datos['huella'] = calcular_huella(tipo, alumno_datos)
+    return datos
+
+
+def _completar_analitico(datos, carreras):
+    carrera_ids = {fila['carrera_id'] for filas in carreras.values() for fila in filas}
+    materias_plan = dict(
+        Materia.objects.filter(carrera_id__in=carrera_ids, activa=True).order_by().values(
+            'carrera_id'
+        ).annotate(total=Count('id')).values_list('carrera_id', 'total')
+    )
+
+    # Aprobadas vigentes y archivadas, por alumno y carrera
+    aprobadas = defaultdict(list)
+    for modelo in (Inscripcion.historico, InscripcionArchivada.objects):
+        for fila in modelo.filter(alumno_id__in=datos, estado='aprobado').order_by().values(
+            'alumno_id', 'materia__carrera_id', 'materia__codigo', 'materia__nombre',
+            'materia__carga_horaria', 'periodo__anio', 'periodo__cuatrimestre', 'nota_final',
+        ):
+            aprobadas[(fila['alumno_id'], fila['materia__carrera_id'])].append(fila)
+
+    for alumno_id, alumno_datos in datos.items():
+        for carrera in carreras[alumno_id]:
+            filas = sorted(
+                aprobadas[(alumno_id, carrera['carrera_id'])],
+                key=lambda f: (f['periodo__anio'], f['periodo__cuatrimestre'], f['materia__codigo']),
+            )
+            notas = [f['nota_final'] for f in filas if f['nota_final'] is not None]
+            alumno_datos['carreras'].append({
+                'nombre': carrera['carrera__nombre'],
+                'fecha_inscripcion': carrera['fecha_inscripcion'].strftime('%d/%m/%Y'),
+                'materias_plan': materias_plan.get(carrera['carrera_id'], 0),
+                'carga_horaria': sum(f['materia__carga_horaria'] for f in filas),
+                'promedio': str(round(sum(notas) / len(notas), 2)) if notas else None,
+                'aprobadas': [
+                    {
+                        'codigo': f['materia__codigo'],
+                        'nombre': f['materia__nombre'],
+                        'periodo': _formatear_periodo(f['periodo__anio'], f['periodo__cuatrimestre']),
+                        'carga_horaria': f['materia__carga_horaria'],
+                        'nota': str(f['nota_final']) if f['nota_final'] is not None else None,
+                    }
+                    for f in filas
+                ],
+            })
+
+
+def _completar_constancia(datos, carreras):
+    periodo = PeriodoLectivo.get_actual()
+    cursando = defaultdict(list)
+    for fila in Inscripcion.objects.filter(alumno_id__in=datos, activa=True).order_by(
+        'materia__codigo'
+    ).values('alumno_id', 'materia__codigo', 'materia__nombre'):
+        cursando[fila['alumno_id']].append({
+            'codigo': fila['materia__codigo'],
+            'nombre': fila['materia__nombre'],
+        })
+
+    # La fecha de emisión forma parte del contenido: la constancia se
+    # regenera como mucho una vez por día
+    fecha_emision = timezone.localdate().strftime('%d/%m/%Y')
+    for alumno_id, alumno_datos in datos.items():
+        alumno_datos['carreras'] = [
+            {'nombre': carrera['carrera__nombre']} for carrera in carreras[alumno_id]
+        ]
+        alumno_datos['periodo'] = (
+            _formatear_periodo(periodo.anio, periodo.cuatrimestre) if periodo else '-'
+        )
+        alumno_datos['cursando'] = cursando[alumno_id]
+        alumno_datos['fecha_emision'] = fecha_emision
+
+
+def calcular_huella(tipo, datos):
+    """Hash del contenido del certificado (sin la propia huella)"""
+    contenido = {clave: valor for clave, valor in datos.items() if clave != 'huella'}
+    serializado = json.dumps(
+        [VERSION_PLANTILLA, tipo, contenido], sort_keys=True, ensure_ascii=False, default=str
+    )
+    return hashlib.sha256(serializado.encode('utf-8')).hexdigest()[:32]
+
+
+def ruta_documento(tipo, alumno_id, huella):
+    return Path(settings.DOCUMENTOS_ROOT) / tipo / f'{alumno_id}-{huella}.pdf'
+
+
+def _guardar(ruta, contenido):
+    """Escritura atómica y limpieza de las versiones anteriores del mismo alumno"""
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    descriptor, temporal = tempfile.mkstemp(dir=ruta.parent, suffix='.tmp')
+    with os.fdopen(descriptor, 'wb') as archivo:
+        archivo.write(contenido)
+    os.replace(temporal, ruta)
+
+    alumno_id = ruta.name.split('-', 1)[0]
+    for anterior in ruta.parent.glob(f'{alumno_id}-*.pdf'):
+        if anterior != ruta:
+            anterior.unlink(missing_ok=True)
+
+
+def _renderizar(tipo, datos, ruta):
+    """Future del render de ruta, compartido con los pedidos concurrentes"""
+    with _en_curso_lock:
+        futuro = _en_curso.get(ruta)
+        if futuro is not None:
+            return futuro
+        futuro = get_pool().submit(renderizar, tipo, datos)
+        _en_curso[ruta] = futuro
+    futuro.add_done_callback(partial(_render_terminado, ruta))
+    return futuro
+
+
+def _render_terminado(ruta, futuro):
+    """Guarda el PDF (lo espere alguien o no) y libera el render en curso"""
+    try:
+        if not futuro.cancelled() and futuro.exception() is None:
+            _guardar(ruta, futuro.result())
+    finally:
+        with _en_curso_lock:
+            _en_curso.pop(ruta, None)
+
+
+def obtener_documento(tipo, alumno_id, datos=None):
+    """
+    PDF vigente de un alumno, generándolo si hace falta
+    datos es el resultado de recopilar_datos para el alumno, si ya se leyó.
+    Devuelve (archivo binario abierto, huella); el llamador lo cierra.
+    Lanza DocumentoEnPreparacion si el render no termina en DOCUMENTOS_TIMEOUT.
+    Se abre acá y no se comprueba antes si existe: otro pedido puede borrar
+    la versión entre la comprobación y la apertura, pero no un archivo abierto.
+    """
+    if datos is None:
+        datos = recopilar_datos(tipo, [alumno_id])[alumno_id]
+    ruta = ruta_documento(tipo, alumno_id, datos['huella'])
+    try:
+        return open(ruta, 'rb'), datos['huella']
+    except FileNotFoundError:
+        pass
+    try:
+        contenido = _renderizar(tipo, datos, ruta).result(timeout=settings.DOCUMENTOS_TIMEOUT)
+    except FuturesTimeoutError:
+        raise DocumentoEnPreparacion(f'{tipo} del alumno {alumno_id}')
+    except BrokenProcessPool:
+        # Un proceso murió: el próximo pedido arranca un pool nuevo
+        _descartar_pool()
+        raise
+    return io.BytesIO(contenido), datos['huella']
+
+
+def generar_lote(tipo, alumno_ids, procesos=None):
+    """
+    Genera los certificados de muchos alumnos en paralelo
+    Usa un pool propio (no el de las vistas) y salta los que ya están en
+    disco. Devuelve (generados, en_cache).
+    """
+    alumno_ids = list(alumno_ids)
+    generados = en_cache = 0
+    with ProcessPoolExecutor(
+        max_workers=procesos or settings.DOCUMENTOS_PROCESOS,
+        mp_context=multiprocessing.get_context('spawn'),
+    ) as pool:
+        for inicio in range(0, len(alumno_ids), LOTE_DATOS):
+            datos = recopilar_datos(tipo, alumno_ids[inicio:inicio + LOTE_DATOS])
+            pendientes = []
+            for alumno_id, alumno_datos in datos.items():
+                ruta = ruta_documento(tipo, alumno_id, alumno_datos['huella'])
+                if ruta.exists():
+                    en_cache += 1
+                else:
+                    pendientes.append((ruta, alumno_datos))
+
+            contenidos = pool.map(
+                renderizar,
+                [tipo] * len(pendientes),
+                [alumno_datos for _, alumno_datos in pendientes],
+                chunksize=8,
+            )
+            for (ruta, _), contenido in zip(pendientes, contenidos):
+                _guardar(ruta, contenido)
+                generados += 1
+    return generados, en_cache
@@ -0,0 +1,57 @@
+"""
+Comando para generar certificados de una cohorte de alumnos
+Uso: python manage.py generar_certificados analitico --carrera ID [--anio 2024] [--procesos 4]
+
+Genera en paralelo (un proceso por núcleo indicado) los PDF de todos los
+alumnos activos de la carrera, opcionalmente filtrados por año de ingreso.
+Los certificados cuyo contenido no cambió desde la última generación se
+saltan: quedan servidos desde disco por las vistas de descarga. Solo lee
+de la base, así que las consultas van a la réplica si está configurada.
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from alumnos.documentos import TIPOS, generar_lote
+from alumnos.models import Alumno
+from gestion_academica.db_routing import usar_replica
+
+
+class Command(BaseCommand):
+    help = 'Genera en paralelo los certificados en PDF de una cohorte'
+
+    def add_arguments(self, parser):
+        parser.add_argument('tipo', choices=TIPOS,
+                            help='Tipo de certificado')
+        parser.add_argument('--carrera', type=int,
+                            help='ID de la carrera (por defecto, todas)')
+        parser.add_argument('--anio', type=int,
+                            help='Año de ingreso de la cohorte')
+        parser.add_argument('--procesos', type=int,
+                            help='Procesos del pool (por defecto, DOCUMENTOS_PROCESOS)')
+
+    def handle(self, *args, **options):
+        with usar_replica():
+            self.generar(options)
+
+    def generar(self, options):
+        alumnos = Alumno.objects.filter(activo=True)
+        if options['carrera']:
+            alumnos = alumnos.filter(
+                inscripcioncarrera__carrera_id=options['carrera'],
+                inscripcioncarrera__activa=True,
+            )
+        if options['anio']:
+            alumnos = alumnos.filter(fecha_ingreso__year=options['anio'])
+        alumno_ids = list(alumnos.order_by('pk').values_list('pk', flat=True).distinct())
+        if not alumno_ids:
+            raise CommandError('No hay alumnos que cumplan los filtros indicados.')
+
+        self.stdout.write(f'📄 {len(alumno_ids)} alumnos, certificado {options["tipo"]}')
+        inicio = time.perf_counter()
+        generados, en_cache = generar_lote(options['tipo'], alumno_ids, options['procesos'])
+        duracion = time.perf_counter() - inicio
+
+        self.stdout.write(f'   Generados: {generados}')
+        self.stdout.write(f'   Sin cambios (en disco): {en_cache}')
+        self.stdout.write(f'   Tiempo: {duracion:.2f} s')
+        self.stdout.write(self.style.SUCCESS('✅ Certificados generados.'))
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.6 on 2026-10-19 12:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alumnos', '0003_remove_alumno_carrera_inscripcioncarrera_and_more'),
+        ('carreras', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InscripcionCarreraArchivada',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('inscripcion_carrera_id', models.BigIntegerField(unique=True, verbose_name='ID de Inscripción Original')),
+                ('fecha_inscripcion', models.DateField(verbose_name='Fecha de Inscripción')),
+                ('activa', models.BooleanField(verbose_name='Inscripción Activa')),
+                ('fecha_baja', models.DateField(blank=True, null=True, verbose_name='Fecha de Baja')),
+                ('motivo_baja', models.CharField(blank=True, max_length=200, verbose_name='Motivo de Baja')),
+                ('fecha_archivo', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Archivo')),
+                ('alumno', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inscripciones_carrera_archivadas', to='alumnos.alumno', verbose_name='Alumno')),
+                ('carrera', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inscripciones_archivadas', to='carreras.carrera', verbose_name='Carrera')),
+            ],
+            options={
+                'verbose_name': 'Inscripción a Carrera Archivada',
+                'verbose_name_plural': 'Inscripciones a Carreras Archivadas',
+                'ordering': ['-fecha_inscripcion'],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.6 on 2026-10-19 12:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alumnos', '0004_inscripcion_carrera_archivada'),
+        ('carreras', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RegistroAcademico',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('materias_aprobadas', models.PositiveIntegerField(default=0, verbose_name='Materias Aprobadas')),
+                ('materias_con_nota', models.PositiveIntegerField(default=0, verbose_name='Materias Aprobadas con Nota')),
+                ('suma_notas', models.DecimalField(decimal_places=2, default=0, max_digits=8, verbose_name='Suma de Notas')),
+                ('carga_horaria', models.PositiveIntegerField(default=0, verbose_name='Carga Horaria Acumulada')),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True, verbose_name='Fecha de Actualización')),
+                ('alumno', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='registros_academicos', to='alumnos.alumno', verbose_name='Alumno')),
+                ('carrera', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='registros_academicos', to='carreras.carrera', verbose_name='Carrera')),
+            ],
+            options={
+                'verbose_name': 'Registro Académico',
+                'verbose_name_plural': 'Registros Académicos',
+                'ordering': ['carrera__nombre'],
+                'unique_together': {('alumno', 'carrera')},
+            },
+        ),
+    ]
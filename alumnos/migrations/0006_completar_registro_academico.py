@@ -0,0 +1,54 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import migrations
+from django.db.models import Count, Sum
+
+
+def completar_registros(apps, schema_editor):
+    """
+    Calcula los registros académicos a partir de las inscripciones aprobadas
+    que ya existían: sin esto el primer cambio de una calificación aprobada
+    restaría de un registro en cero
+    La agregación se repite acá con los modelos históricos para que la
+    migración no dependa del código actual de la aplicación.
+    """
+    RegistroAcademico = apps.get_model('alumnos', 'RegistroAcademico')
+    Inscripcion = apps.get_model('inscripciones', 'Inscripcion')
+    InscripcionArchivada = apps.get_model('inscripciones', 'InscripcionArchivada')
+
+    acumulados = defaultdict(lambda: {
+        'materias_aprobadas': 0, 'materias_con_nota': 0, 'suma_notas': Decimal(0), 'carga_horaria': 0,
+    })
+    for modelo in (Inscripcion, InscripcionArchivada):
+        for fila in modelo.objects.filter(estado='aprobado').order_by().values(
+            'alumno_id', 'materia__carrera_id'
+        ).annotate(
+            aprobadas=Count('id'),
+            con_nota=Count('nota_final'),
+            suma=Sum('nota_final'),
+            carga=Sum('materia__carga_horaria'),
+        ):
+            acumulado = acumulados[(fila['alumno_id'], fila['materia__carrera_id'])]
+            acumulado['materias_aprobadas'] += fila['aprobadas']
+            acumulado['materias_con_nota'] += fila['con_nota']
+            acumulado['suma_notas'] += fila['suma'] or 0
+            acumulado['carga_horaria'] += fila['carga'] or 0
+
+    RegistroAcademico.objects.all().delete()
+    RegistroAcademico.objects.bulk_create([
+        RegistroAcademico(alumno_id=alumno_id, carrera_id=carrera_id, **acumulado)
+        for (alumno_id, carrera_id), acumulado in acumulados.items()
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alumnos', '0005_registro_academico'),
+        ('inscripciones', '0004_preferencias'),
+    ]
+
+    operations = [
+        migrations.RunPython(completar_registros, migrations.RunPython.noop),
+    ]
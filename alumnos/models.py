@@ -1,8 +1,19 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Greatest
 from django.core.validators import RegexValidator
 from django.urls import reverse
+from django.utils import timezone
 from usuarios.models import Usuario
 from carreras.models import Carrera
+from carreras.catalogo import invalidar_catalogo
+from integraciones.outbox import publicar
+
+
+class SinCupoError(ValueError):
+    """La materia no tiene cupo disponible"""
+
+
+SIN_CUPO = "No hay cupo disponible"
 
 
 class Persona(models.Model):
@@ -135,6 +146,33 @@ class Alumno(Persona):
     def get_absolute_url(self):
         return reverse('alumnos:detalle', kwargs={'pk': self.pk})
     
+    def save(self, *args, **kwargs):
+        """Guarda el alumno y publica el cambio en el outbox, en la misma transacción"""
+        nuevo = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            publicar('alumno.alta' if nuevo else 'alumno.modificacion', self.pk, **self.datos_integracion())
+    
+    def delete(self, *args, **kwargs):
+        """Elimina el alumno; sus inscripciones se borran en cascada sin eventos propios"""
+        alumno_id = self.pk
+        with transaction.atomic():
+            resultado = super().delete(*args, **kwargs)
+            publicar('alumno.eliminacion', alumno_id, **self.datos_integracion())
+        return resultado
+    
+    def datos_integracion(self):
+        """Datos que se publican en el outbox (ver integraciones/outbox.py)"""
+        return {
+            'usuario': self.usuario_id,
+            'legajo': self.numero_legajo,
+            'dni': self.dni,
+            'nombre': self.nombre,
+            'apellido': self.apellido,
+            'email': self.email,
+            'activo': self.activo,
+        }
+    
     def get_materias_inscriptas(self):
         """Retorna las materias en las que está inscripto"""
         return self.inscripciones.filter(activa=True)
@@ -160,8 +198,12 @@ class Alumno(Persona):
         else:
             fecha_ref = self.fecha_ingreso
         
+        return self.anio_cursado_desde(fecha_ref, date.today())
+    
+    @staticmethod
+    def anio_cursado_desde(fecha_ref, today):
+        """Año de cursado a partir de una fecha de ingreso, sin consultar la base"""
         # Calcular años desde ingreso
-        today = date.today()
         anios_cursados = today.year - fecha_ref.year
         
         # Si aún no llegó al mes de ingreso, resta un año
@@ -194,47 +236,84 @@ class Alumno(Persona):
         if materia.anio_cursado > anio_alumno:
             return False, f"No puede inscribirse a materias de {materia.anio_cursado}° año. Actualmente está en {anio_alumno}° año"
         
+        # Verificar correlatividades
+        faltantes = self.get_correlativas_faltantes(materia)
+        if faltantes:
+            return False, f"Debe aprobar antes: {', '.join(faltantes)}"
+        
+        # Verificar superposición horaria con las materias en curso
+        from materias.horarios import superposicion_con_inscripciones
+        conflicto = superposicion_con_inscripciones(self, materia)
+        if conflicto:
+            return False, f"Se superpone en horario con {conflicto}"
+        
         # Verificar cupo disponible
         if not materia.tiene_cupo_disponible():
-            return False, "No hay cupo disponible"
+            return False, SIN_CUPO
         
         return True, "Puede inscribirse"
     
+    def get_correlativas_faltantes(self, materia):
+        """
+        Retorna los nombres de las correlativas (directas o indirectas) que
+        el alumno todavía no aprobó. Una sola consulta contra la clausura
+        precalculada, excluyendo las aprobadas vigentes y archivadas.
+        """
+        from inscripciones.models import Inscripcion, InscripcionArchivada
+        from materias.models import CorrelatividadTransitiva
+        
+        aprobadas = Inscripcion.historico.filter(alumno=self, estado='aprobado')
+        aprobadas_archivo = InscripcionArchivada.objects.filter(alumno=self, estado='aprobado')
+        return list(
+            CorrelatividadTransitiva.objects.filter(materia=materia)
+            .exclude(requisito_id__in=aprobadas.values('materia_id'))
+            .exclude(requisito_id__in=aprobadas_archivo.values('materia_id'))
+            .order_by('requisito__anio_cursado', 'requisito__nombre')
+            .values_list('requisito__nombre', flat=True)
+        )
+    
     def inscribirse_a(self, materia):
         """
         Inscribe al alumno a una materia
         Retorna la inscripción creada o reactivada
+        La fila de la materia se bloquea (SELECT ... FOR UPDATE) durante
+        toda la operación, de modo que dos inscripciones concurrentes no
+        puedan ocupar el mismo lugar de cupo.
         """
         from inscripciones.models import Inscripcion
+        from materias.models import Materia
         
-        # Verificar si existe una inscripción previa (activa o inactiva)
-        inscripcion_existente = self.inscripciones.filter(materia=materia).first()
-        
-        if inscripcion_existente:
-            # Si existe y está inactiva, reactivarla
-            if not inscripcion_existente.activa:
-                if materia.tiene_cupo_disponible():
-                    inscripcion_existente.reactivar()
-                    return inscripcion_existente
+        with transaction.atomic():
+            materia = Materia.objects.select_for_update().select_related('carrera').get(pk=materia.pk)
+            
+            # Verificar si existe una inscripción previa (activa o inactiva)
+            inscripcion_existente = self.inscripciones.filter(materia=materia).first()
+            
+            if inscripcion_existente:
+                # Si existe y está inactiva, reactivarla
+                if not inscripcion_existente.activa:
+                    if materia.tiene_cupo_disponible():
+                        inscripcion_existente.reactivar()
+                        return inscripcion_existente
+                    else:
+                        raise SinCupoError(SIN_CUPO)
                 else:
-                    raise ValueError("No hay cupo disponible")
-            else:
-                raise ValueError("Ya está inscripto en esta materia")
-        
-        # Si no existe, verificar si puede inscribirse
-        puede, mensaje = self.puede_inscribirse_a(materia)
-        if not puede:
-            raise ValueError(mensaje)
-        
-        # Crear la inscripción
-        inscripcion = Inscripcion.objects.create(
-            alumno=self,
-            materia=materia,
-            estado='inscripto',
-            activa=True
-        )
-        
-        return inscripcion
+                    raise ValueError("Ya está inscripto en esta materia")
+            
+            # Si no existe, verificar si puede inscribirse
+            puede, mensaje = self.puede_inscribirse_a(materia)
+            if not puede:
+                raise (SinCupoError if mensaje == SIN_CUPO else ValueError)(mensaje)
+            
+            # Crear la inscripción
+            inscripcion = Inscripcion.objects.create(
+                alumno=self,
+                materia=materia,
+                estado='inscripto',
+                activa=True
+            )
+            
+            return inscripcion
     
     def get_materias_disponibles(self):
         """Retorna las materias de sus carreras en las que NO está inscripto"""
@@ -251,6 +330,13 @@ class Alumno(Persona):
         inscripcion_principal = self.inscripcioncarrera.filter(activa=True).order_by('fecha_inscripcion').first()
         return inscripcion_principal.carrera if inscripcion_principal else None
     
+    async def aget_carrera_principal(self):
+        """Versión asíncrona de get_carrera_principal"""
+        inscripcion_principal = await self.inscripcioncarrera.filter(
+            activa=True
+        ).select_related('carrera').order_by('fecha_inscripcion').afirst()
+        return inscripcion_principal.carrera if inscripcion_principal else None
+    
     def get_carreras_activas(self):
         """Retorna todas las carreras activas del alumno"""
         return self.carreras.filter(
@@ -262,6 +348,28 @@ class Alumno(Persona):
         return not self.inscripciones.filter(activa=True).exists()
 
 
+class InscripcionCarreraManager(models.Manager):
+    """Manager de inscripciones a carreras con acceso al archivo"""
+    
+    CAMPOS_HISTORIAL = [
+        'alumno_id', 'carrera_id', 'carrera__nombre', 'fecha_inscripcion',
+        'activa', 'fecha_baja', 'motivo_baja',
+    ]
+    
+    def con_archivo(self, **filtros):
+        """
+        Inscripciones vigentes y archivadas que cumplen los filtros, como
+        diccionarios (values) unidos en una sola consulta
+        """
+        vigentes = self.filter(**filtros).values(
+            'id', *self.CAMPOS_HISTORIAL, archivada=models.Value(False)
+        )
+        archivadas = InscripcionCarreraArchivada.objects.filter(**filtros).values(
+            'inscripcion_carrera_id', *self.CAMPOS_HISTORIAL, archivada=models.Value(True)
+        )
+        return vigentes.order_by().union(archivadas.order_by(), all=True).order_by('-fecha_inscripcion')
+
+
 class InscripcionCarrera(models.Model):
     """
     Modelo intermedio para la relación Alumno-Carrera
@@ -303,6 +411,11 @@ class InscripcionCarrera(models.Model):
         verbose_name='Motivo de Baja'
     )
     
+    objects = InscripcionCarreraManager()
+    
+    # activa tal como se leyó de la base, para publicar altas y bajas
+    activa_original = None
+    
     class Meta:
         verbose_name = 'Inscripción a Carrera'
         verbose_name_plural = 'Inscripciones a Carreras'
@@ -312,6 +425,50 @@ class InscripcionCarrera(models.Model):
     def __str__(self):
         return f"{self.alumno.get_full_name()} - {self.carrera.nombre}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instancia = super().from_db(db, field_names, values)
+        if 'activa' in field_names:
+            instancia.activa_original = instancia.activa
+        return instancia
+    
+    def save(self, *args, **kwargs):
+        """
+        Guarda la inscripción e invalida los totales de alumnos del catálogo
+        Las altas, bajas y reactivaciones se publican en el outbox.
+        """
+        nueva = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if nueva:
+                accion = 'alta'
+            elif self.activa_original is not None and self.activa_original != self.activa:
+                accion = 'reactivar' if self.activa else 'baja'
+            else:
+                accion = None
+            if accion:
+                publicar(f'inscripcion_carrera.{accion}', self.pk, **self.datos_integracion())
+        self.activa_original = self.activa
+        transaction.on_commit(invalidar_catalogo)
+    
+    def delete(self, *args, **kwargs):
+        inscripcion_id = self.pk
+        with transaction.atomic():
+            resultado = super().delete(*args, **kwargs)
+            publicar('inscripcion_carrera.eliminacion', inscripcion_id, **self.datos_integracion())
+        transaction.on_commit(invalidar_catalogo)
+        return resultado
+    
+    def datos_integracion(self):
+        """Datos que se publican en el outbox (ver integraciones/outbox.py)"""
+        return {
+            'alumno': self.alumno_id,
+            'carrera': self.carrera_id,
+            'activa': self.activa,
+            'fecha_baja': self.fecha_baja,
+            'motivo_baja': self.motivo_baja,
+        }
+    
     def dar_de_baja(self, motivo=''):
         """Da de baja la inscripción a la carrera"""
         from django.utils import timezone
@@ -319,3 +476,182 @@ class InscripcionCarrera(models.Model):
         self.fecha_baja = timezone.now().date()
         self.motivo_baja = motivo
         self.save()
+
+
+class InscripcionCarreraArchivada(models.Model):
+    """
+    Inscripciones a carreras dadas de baja hace tiempo
+    Se mueven con el comando archivar_inscripciones para que la tabla de
+    inscripciones a carreras contenga solo datos vigentes.
+    """
+    
+    inscripcion_carrera_id = models.BigIntegerField(
+        unique=True,
+        verbose_name='ID de Inscripción Original'
+    )
+    
+    alumno = models.ForeignKey(
+        Alumno,
+        on_delete=models.CASCADE,
+        related_name='inscripciones_carrera_archivadas',
+        verbose_name='Alumno'
+    )
+    
+    carrera = models.ForeignKey(
+        Carrera,
+        on_delete=models.CASCADE,
+        related_name='inscripciones_archivadas',
+        verbose_name='Carrera'
+    )
+    
+    fecha_inscripcion = models.DateField(
+        verbose_name='Fecha de Inscripción'
+    )
+    
+    activa = models.BooleanField(
+        verbose_name='Inscripción Activa'
+    )
+    
+    fecha_baja = models.DateField(
+        null=True,
+        blank=True,
+        verbose_name='Fecha de Baja'
+    )
+    
+    motivo_baja = models.CharField(
+        max_length=200,
+        blank=True,
+        verbose_name='Motivo de Baja'
+    )
+    
+    fecha_archivo = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Fecha de Archivo'
+    )
+    
+    # Campos copiados tal cual desde InscripcionCarrera al archivar
+    CAMPOS_COPIADOS = [
+        'alumno_id', 'carrera_id', 'fecha_inscripcion', 'activa', 'fecha_baja', 'motivo_baja',
+    ]
+    
+    class Meta:
+        verbose_name = 'Inscripción a Carrera Archivada'
+        verbose_name_plural = 'Inscripciones a Carreras Archivadas'
+        ordering = ['-fecha_inscripcion']
+    
+    def __str__(self):
+        return f"{self.alumno.get_full_name()} - {self.carrera.nombre} (archivada)"
+    
+    @classmethod
+    def desde_inscripcion(cls, fila):
+        """Construye el registro archivado a partir de un dict de values()"""
+        return cls(
+            inscripcion_carrera_id=fila['id'],
+            **{campo: fila[campo] for campo in cls.CAMPOS_COPIADOS}
+        )
+
+
+class RegistroAcademico(models.Model):
+    """
+    Acumulados académicos de un alumno en una carrera
+    Se mantienen por incrementos cada vez que cambia la calificación de una
+    inscripción (ver inscripciones.registro), de modo que el detalle del
+    alumno no necesita recorrer todas sus inscripciones. El comando
+    reconstruir_registro_academico los recalcula desde cero.
+    """
+    
+    alumno = models.ForeignKey(
+        Alumno,
+        on_delete=models.CASCADE,
+        related_name='registros_academicos',
+        verbose_name='Alumno'
+    )
+    
+    carrera = models.ForeignKey(
+        Carrera,
+        on_delete=models.CASCADE,
+        related_name='registros_academicos',
+        verbose_name='Carrera'
+    )
+    
+    materias_aprobadas = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Materias Aprobadas'
+    )
+    
+    materias_con_nota = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Materias Aprobadas con Nota'
+    )
+    
+    suma_notas = models.DecimalField(
+        max_digits=8,
+        decimal_places=2,
+        default=0,
+        verbose_name='Suma de Notas'
+    )
+    
+    carga_horaria = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Carga Horaria Acumulada'
+    )
+    
+    fecha_actualizacion = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Fecha de Actualización'
+    )
+    
+    # Campos acumulables, en el orden de los aportes de inscripciones.registro
+    CAMPOS_ACUMULADOS = ['materias_aprobadas', 'materias_con_nota', 'suma_notas', 'carga_horaria']
+    
+    class Meta:
+        verbose_name = 'Registro Académico'
+        verbose_name_plural = 'Registros Académicos'
+        unique_together = ['alumno', 'carrera']
+        ordering = ['carrera__nombre']
+    
+    def __str__(self):
+        return f"{self.alumno.get_full_name()} - {self.carrera.nombre}"
+    
+    @property
+    def promedio(self):
+        """Promedio de las materias aprobadas con nota"""
+        if not self.materias_con_nota:
+            return None
+        return round(self.suma_notas / self.materias_con_nota, 2)
+    
+    def get_porcentaje_avance(self):
+        """
+        Porcentaje del plan aprobado
+        Usa la anotación materias_plan si está presente (ver AlumnoDetailView)
+        """
+        materias_plan = getattr(self, 'materias_plan', None)
+        if materias_plan is None:
+            materias_plan = self.carrera.materias.filter(activa=True).count()
+        if not materias_plan:
+            return 0
+        return min(100, round(self.materias_aprobadas * 100 / materias_plan))
+    
+    @classmethod
+    def aplicar(cls, deltas):
+        """
+        Suma los deltas {(alumno_id, carrera_id): (aprobadas, con_nota, suma, carga)}
+        Cada registro se actualiza con expresiones F, sin leer los valores
+        actuales, para que dos cambios concurrentes no se pisen. Un registro
+        desfasado (p. ej. restar de uno que no contaba la materia) queda en
+        cero en lugar de violar la restricción de los campos positivos; el
+        comando reconstruir_registro_academico lo corrige.
+        """
+        for (alumno_id, carrera_id), delta in deltas.items():
+            if not any(delta):
+                continue
+            registro, _ = cls.objects.get_or_create(alumno_id=alumno_id, carrera_id=carrera_id)
+            cls.objects.filter(pk=registro.pk).update(
+                fecha_actualizacion=timezone.now(),
+                **{
+                    campo: Greatest(
+                        models.F(campo) + valor, 0, output_field=cls._meta.get_field(campo)
+                    )
+                    for campo, valor in zip(cls.CAMPOS_ACUMULADOS, delta)
+                }
+            )
@@ -0,0 +1,209 @@
+"""
+Generación de certificados en PDF sin dependencias externas
+Escribe PDF 1.4 de texto con las fuentes base Helvetica (sin incrustar),
+suficiente para analíticos y constancias. Este módulo no importa Django:
+las funciones renderizar_* reciben datos planos y se ejecutan en los
+procesos del pool de alumnos.documentos.
+"""
+
+# Hoja A4 en puntos y márgenes
+ANCHO, ALTO = 595, 842
+MARGEN = 50
+
+FUENTES = {'normal': 'F1', 'negrita': 'F2'}
+
+
+def _escapar(texto):
+    """Texto en WinAnsi con los caracteres especiales de PDF escapados"""
+    crudo = str(texto).encode('cp1252', errors='replace').decode('latin-1')
+    return crudo.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+class DocumentoPDF:
+    """Documento de texto que fluye de arriba hacia abajo, con salto de página automático"""
+
+    def __init__(self, titulo=''):
+        self.titulo = titulo
+        self.paginas = []
+        self._nueva_pagina()
+
+    def _nueva_pagina(self):
+        self.operaciones = []
+        self.paginas.append(self.operaciones)
+        self.y = ALTO - MARGEN
+
+    def _reservar(self, alto):
+        if self.y - alto < MARGEN:
+            self._nueva_pagina()
+        self.y -= alto
+
+    def texto(self, x, y, texto, tamano=10, estilo='normal'):
+        self.operaciones.append(
+            f'BT /{FUENTES[estilo]} {tamano} Tf {x} {y} Td ({_escapar(texto)}) Tj ET'
+        )
+
+    def linea_horizontal(self, espacio=8):
+        self._reservar(espacio)
+        self.operaciones.append(f'0.5 w {MARGEN} {self.y} m {ANCHO - MARGEN} {self.y} l S')
+        self._reservar(espacio)
+
+    def parrafo(self, texto, tamano=10, estilo='normal', centrado=False):
+        """Escribe texto cortado en líneas que entran en el ancho útil"""
+        # Ancho medio de un carácter en Helvetica: ~0,5 del tamaño
+        por_linea = int((ANCHO - 2 * MARGEN) / (tamano * 0.5))
+        lineas, actual = [], ''
+        for palabra in str(texto).split():
+            if actual and len(actual) + 1 + len(palabra) > por_linea:
+                lineas.append(actual)
+                actual = palabra
+            else:
+                actual = f'{actual} {palabra}' if actual else palabra
+        lineas.append(actual)
+        for linea in lineas:
+            self._reservar(tamano * 1.4)
+            x = MARGEN
+            if centrado:
+                x = max(MARGEN, int((ANCHO - len(linea) * tamano * 0.5) / 2))
+            self.texto(x, self.y, linea, tamano, estilo)
+
+    def espacio(self, alto=10):
+        self._reservar(alto)
+
+    def fila(self, columnas, anchos, tamano=9, estilo='normal'):
+        """Fila de tabla; anchos en puntos, uno por columna"""
+        self._reservar(tamano * 1.5)
+        x = MARGEN
+        for valor, ancho in zip(columnas, anchos):
+            maximo = int(ancho / (tamano * 0.5))
+            valor = str(valor)
+            if len(valor) > maximo:
+                valor = valor[:maximo - 1] + '…'
+            self.texto(x, self.y, valor, tamano, estilo)
+            x += ancho
+
+    def pie(self, texto):
+        """Texto al pie de todas las páginas, con el número de página"""
+        total = len(self.paginas)
+        for numero, operaciones in enumerate(self.paginas, start=1):
+            operaciones.append(
+                f'BT /F1 8 Tf {MARGEN} 30 Td ({_escapar(f"{texto} - Página {numero} de {total}")}) Tj ET'
+            )
+
+    def a_bytes(self):
+        """Serializa el documento (objetos, tabla xref y trailer)"""
+        objetos = [
+            b'<< /Type /Catalog /Pages 2 0 R >>',
+            None,  # Pages: se completa al conocer las páginas
+            b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>',
+            b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>',
+            f'<< /Title ({_escapar(self.titulo)}) /Producer (Sistema Academico) >>'.encode('latin-1'),
+        ]
+        hijos = []
+        for operaciones in self.paginas:
+            contenido = '\n'.join(operaciones).encode('latin-1')
+            objetos.append(
+                b'<< /Length %d >>\nstream\n' % len(contenido) + contenido + b'\nendstream'
+            )
+            objetos.append(
+                f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {ANCHO} {ALTO}] '
+                f'/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> '
+                f'/Contents {len(objetos)} 0 R >>'.encode('latin-1')
+            )
+            hijos.append(f'{len(objetos)} 0 R')
+        objetos[1] = f'<< /Type /Pages /Kids [{" ".join(hijos)}] /Count {len(hijos)} >>'.encode('latin-1')
+
+        salida = bytearray(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+        posiciones = []
+        for numero, objeto in enumerate(objetos, start=1):
+            posiciones.append(len(salida))
+            salida += b'%d 0 obj\n' % numero + objeto + b'\nendobj\n'
+        inicio_xref = len(salida)
+        salida += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objetos) + 1)
+        for posicion in posiciones:
+            salida += b'%010d 00000 n \n' % posicion
+        salida += (
+            b'trailer\n<< /Size %d /Root 1 0 R /Info 5 0 R >>\nstartxref\n%d\n%%%%EOF\n'
+            % (len(objetos) + 1, inicio_xref)
+        )
+        return bytes(salida)
+
+
+def _encabezado(documento, datos, titulo):
+    documento.parrafo(datos['institucion'], 14, 'negrita', centrado=True)
+    documento.espacio(6)
+    documento.parrafo(titulo, 12, 'negrita', centrado=True)
+    documento.linea_horizontal()
+    alumno = datos['alumno']
+    documento.fila(
+        [f"Alumno: {alumno['apellido']}, {alumno['nombre']}", f"DNI: {alumno['dni']}",
+         f"Legajo: {alumno['numero_legajo']}"],
+        [255, 120, 120], tamano=10,
+    )
+    documento.espacio(6)
+
+
+def renderizar_analitico(datos):
+    """Certificado analítico: materias aprobadas y promedio por carrera"""
+    documento = DocumentoPDF(f"Analítico - {datos['alumno']['numero_legajo']}")
+    _encabezado(documento, datos, 'CERTIFICADO ANALÍTICO')
+    anchos = [55, 215, 85, 75, 65]
+    for carrera in datos['carreras']:
+        documento.espacio(8)
+        documento.parrafo(carrera['nombre'], 11, 'negrita')
+        documento.parrafo(f"Fecha de inscripción: {carrera['fecha_inscripcion']}", 9)
+        documento.espacio(4)
+        documento.fila(['Código', 'Materia', 'Período', 'Carga hs', 'Nota'], anchos, estilo='negrita')
+        for materia in carrera['aprobadas']:
+            documento.fila(
+                [materia['codigo'], materia['nombre'], materia['periodo'],
+                 materia['carga_horaria'], materia['nota'] or '-'],
+                anchos,
+            )
+        if not carrera['aprobadas']:
+            documento.parrafo('Sin materias aprobadas.', 9)
+        documento.espacio(4)
+        documento.parrafo(
+            f"Materias aprobadas: {len(carrera['aprobadas'])} de {carrera['materias_plan']}"
+            f" - Promedio: {carrera['promedio'] or '-'}"
+            f" - Carga horaria acumulada: {carrera['carga_horaria']} hs",
+            9, 'negrita',
+        )
+    documento.pie(f"Código de verificación {datos['huella']}")
+    return documento.a_bytes()
+
+
+def renderizar_constancia(datos):
+    """Constancia de alumno regular en el período lectivo actual"""
+    documento = DocumentoPDF(f"Constancia - {datos['alumno']['numero_legajo']}")
+    _encabezado(documento, datos, 'CONSTANCIA DE ALUMNO REGULAR')
+    alumno = datos['alumno']
+    carreras = ', '.join(carrera['nombre'] for carrera in datos['carreras']) or '-'
+    documento.espacio(10)
+    documento.parrafo(
+        f"Se deja constancia de que {alumno['nombre']} {alumno['apellido']}, DNI {alumno['dni']}, "
+        f"legajo {alumno['numero_legajo']}, es alumno/a regular de {carreras} "
+        f"en el período lectivo {datos['periodo']}.",
+        11,
+    )
+    if datos['cursando']:
+        documento.espacio(10)
+        documento.parrafo('Materias en curso:', 10, 'negrita')
+        for materia in datos['cursando']:
+            documento.parrafo(f"{materia['codigo']} - {materia['nombre']}", 10)
+    documento.espacio(16)
+    documento.parrafo(
+        f"Se extiende la presente a pedido del interesado/a el {datos['fecha_emision']}.", 11
+    )
+    documento.pie(f"Código de verificación {datos['huella']}")
+    return documento.a_bytes()
+
+
+RENDERIZADORES = {
+    'analitico': renderizar_analitico,
+    'constancia': renderizar_constancia,
+}
+
+
+def renderizar(tipo, datos):
+    """Punto de entrada para los procesos del pool"""
+    return RENDERIZADORES[tipo](datos)
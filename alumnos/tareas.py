@@ -0,0 +1,11 @@
+"""
+Tareas en segundo plano de alumnos (ver trabajos/cola.py)
+"""
+from trabajos.cola import tarea
+from .documentos import generar_lote
+
+
+@tarea()
+def generar_certificados(tipo, alumno_ids, procesos=None):
+    """Genera los certificados de una lista de alumnos (ver generar_certificados)"""
+    generar_lote(tipo, alumno_ids, procesos)
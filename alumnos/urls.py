@@ -9,4 +9,6 @@ urlpatterns = [
     path('<int:pk>/', views.AlumnoDetailView.as_view(), name='detalle'),
     path('<int:pk>/editar/', views.AlumnoUpdateView.as_view(), name='editar'),
     path('<int:pk>/eliminar/', views.AlumnoDeleteView.as_view(), name='eliminar'),
+    path('<int:pk>/analitico/', views.CertificadoAlumnoView.as_view(tipo='analitico'), name='analitico'),
+    path('<int:pk>/constancia/', views.CertificadoAlumnoView.as_view(tipo='constancia'), name='constancia'),
 ]
@@ -1,11 +1,16 @@
-from django.shortcuts import render, redirect
+from django.shortcuts import render, redirect, get_object_or_404
+from django.views import View
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib import messages
 from django.urls import reverse_lazy
-from django.db.models import Q
+from django.db.models import Count, Q
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
 from .models import Alumno
+from .documentos import DocumentoEnPreparacion, obtener_documento, recopilar_datos
+from inscripciones.models import Inscripcion
 from usuarios.views import AdminRequiredMixin
+from gestion_academica.db_routing import LecturaReplicaMixin
 
 
 class PreceptorRequiredMixin(LoginRequiredMixin):
@@ -20,7 +25,7 @@ class PreceptorRequiredMixin(LoginRequiredMixin):
         return super().dispatch(request, *args, **kwargs)
 
 
-class AlumnoListView(PreceptorRequiredMixin, ListView):
+class AlumnoListView(PreceptorRequiredMixin, LecturaReplicaMixin, ListView):
     """Vista para listar alumnos (acceso para preceptor y administrador)"""
     model = Alumno
     template_name = 'alumnos/lista.html'
@@ -67,11 +72,65 @@ class AlumnoListView(PreceptorRequiredMixin, ListView):
         return context
 
 
-class AlumnoDetailView(PreceptorRequiredMixin, DetailView):
+class AlumnoDetailView(PreceptorRequiredMixin, LecturaReplicaMixin, DetailView):
     """Vista de detalle de alumno (acceso para preceptor y administrador)"""
     model = Alumno
     template_name = 'alumnos/detalle.html'
     context_object_name = 'alumno'
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # Inscripciones de todos los períodos, incluidas las archivadas
+        context['historial'] = Inscripcion.historico.con_archivo(alumno=self.object)
+        # Acumulados precalculados por carrera, con el tamaño del plan para el avance
+        context['registros_academicos'] = self.object.registros_academicos.select_related(
+            'carrera'
+        ).annotate(
+            materias_plan=Count('carrera__materias', filter=Q(carrera__materias__activa=True))
+        )
+        return context
+
+
+class CertificadoAlumnoView(LoginRequiredMixin, LecturaReplicaMixin, View):
+    """
+    Descarga de un certificado en PDF (el propio alumno, preceptor o administrador)
+    El PDF se genera una sola vez por contenido y luego se sirve desde disco;
+    la huella del contenido se usa como ETag. Si el render tarda más de
+    DOCUMENTOS_TIMEOUT responde 503 con Retry-After: el PDF se termina de
+    generar igual y el reintento lo sirve desde disco.
+    """
+    tipo = None
+    reintentar_en = 10  # segundos
+    
+    def get(self, request, pk):
+        alumno = get_object_or_404(Alumno, pk=pk)
+        es_propio = request.user.rol == 'alumno' and alumno.usuario_id == request.user.pk
+        if not es_propio and request.user.rol not in ['preceptor', 'administrador']:
+            messages.error(request, 'No tienes permisos para acceder a esta sección.')
+            return redirect('home')
+        
+        # La huella sale de los datos: una revalidación no renderiza el PDF
+        datos = recopilar_datos(self.tipo, [alumno.pk])[alumno.pk]
+        etag = f'"{datos["huella"]}"'
+        if request.headers.get('If-None-Match') == etag:
+            return HttpResponseNotModified(headers={'ETag': etag})
+        try:
+            archivo, _ = obtener_documento(self.tipo, alumno.pk, datos)
+        except DocumentoEnPreparacion:
+            response = HttpResponse(
+                'El certificado se está generando. Intenta nuevamente en unos segundos.',
+                status=503, content_type='text/plain; charset=utf-8',
+            )
+            response['Retry-After'] = str(self.reintentar_en)
+            return response
+        response = FileResponse(
+            archivo,
+            content_type='application/pdf',
+            filename=f'{self.tipo}-{alumno.numero_legajo}.pdf',
+        )
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
 
 
 class AlumnoCreateView(AdminRequiredMixin, CreateView):
@@ -0,0 +1,161 @@
+"""
+Recursos de la API de solo lectura
+Cada recurso declara sus campos públicos con la ruta ORM de la que salen:
+la consulta pide solo esas columnas con values_list(), sin instanciar
+modelos, y los filtros aceptados con la conversión de su valor.
+"""
+from django.db.models import Count, Max
+
+from carreras.models import Carrera
+from alumnos.models import Alumno
+from inscripciones.models import Inscripcion
+from materias.models import Materia
+
+
+def booleano(valor):
+    if valor in ('true', '1'):
+        return True
+    if valor in ('false', '0'):
+        return False
+    raise ValueError(f'"{valor}" no es un booleano (true/false)')
+
+
+class Recurso:
+    """Queryset, campos y filtros de un recurso de la API"""
+    modelo = None
+    # nombre público -> ruta ORM; 'id' se incluye siempre
+    campos = {}
+    campos_por_defecto = ()
+    # parámetro -> (lookup, conversión del valor)
+    filtros = {}
+    # Sin token: datos que ya muestran las páginas públicas
+    publico = False
+
+    def get_queryset(self, parametros):
+        return self.modelo._default_manager.all()
+
+    def version(self):
+        """Versión de los datos más barata que la consulta completa, o None"""
+        return None
+
+
+def version_tabla(queryset):
+    """
+    Cantidad de filas y última modificación (auto_now) en una consulta
+    agregada: un alta o una edición cambian el máximo y una baja, la
+    cantidad. Sale de la base y no de la versión del catálogo en caché:
+    con caché locmem y varios procesos, uno que no vio la invalidación
+    respondería 304 con datos viejos.
+    """
+    datos = queryset.aggregate(total=Count('pk'), ultima=Max('fecha_actualizacion'))
+    return f"{datos['total']}-{datos['ultima'].timestamp() if datos['ultima'] else 0}"
+
+
+class CarrerasRecurso(Recurso):
+    modelo = Carrera
+    campos = {
+        'id': 'id',
+        'codigo': 'codigo',
+        'nombre': 'nombre',
+        'descripcion': 'descripcion',
+        'duracion_anios': 'duracion_anios',
+        'titulo_otorgado': 'titulo_otorgado',
+        'modalidad': 'modalidad',
+        'activa': 'activa',
+    }
+    campos_por_defecto = ('id', 'codigo', 'nombre', 'modalidad', 'activa')
+    filtros = {
+        'activa': ('activa', booleano),
+        'modalidad': ('modalidad', str),
+        'codigo': ('codigo', str),
+    }
+    publico = True
+
+    def version(self):
+        return version_tabla(Carrera.objects.all())
+
+
+class MateriasRecurso(Recurso):
+    modelo = Materia
+    campos = {
+        'id': 'id',
+        'codigo': 'codigo',
+        'nombre': 'nombre',
+        'descripcion': 'descripcion',
+        'carrera': 'carrera_id',
+        'carrera_codigo': 'carrera__codigo',
+        'anio_cursado': 'anio_cursado',
+        'cuatrimestre': 'cuatrimestre',
+        'carga_horaria': 'carga_horaria',
+        'cupo_maximo': 'cupo_maximo',
+        'docente': 'docente_id',
+        'activa': 'activa',
+    }
+    campos_por_defecto = ('id', 'codigo', 'nombre', 'carrera', 'anio_cursado', 'cuatrimestre', 'activa')
+    filtros = {
+        'carrera': ('carrera_id', int),
+        'activa': ('activa', booleano),
+        'anio_cursado': ('anio_cursado', int),
+        'cuatrimestre': ('cuatrimestre', int),
+    }
+    publico = True
+
+    def version(self):
+        # carrera_codigo sale de la carrera
+        return f'{version_tabla(Materia.objects.all())}:{version_tabla(Carrera.objects.all())}'
+
+
+class AlumnosRecurso(Recurso):
+    modelo = Alumno
+    campos = {
+        'id': 'id',
+        'legajo': 'numero_legajo',
+        'dni': 'dni',
+        'nombre': 'nombre',
+        'apellido': 'apellido',
+        'email': 'email',
+        'telefono': 'telefono',
+        'fecha_nacimiento': 'fecha_nacimiento',
+        'fecha_ingreso': 'fecha_ingreso',
+        'activo': 'activo',
+        'usuario': 'usuario_id',
+    }
+    campos_por_defecto = ('id', 'legajo', 'nombre', 'apellido', 'activo')
+    filtros = {
+        'activo': ('activo', booleano),
+        'legajo': ('numero_legajo', str),
+        'dni': ('dni', str),
+    }
+
+
+class InscripcionesRecurso(Recurso):
+    modelo = Inscripcion
+    campos = {
+        'id': 'id',
+        'alumno': 'alumno_id',
+        'alumno_legajo': 'alumno__numero_legajo',
+        'materia': 'materia_id',
+        'materia_codigo': 'materia__codigo',
+        'periodo': 'periodo_id',
+        'comision': 'comision_id',
+        'estado': 'estado',
+        'activa': 'activa',
+        'nota_final': 'nota_final',
+        'fecha_inscripcion': 'fecha_inscripcion',
+        'fecha_baja': 'fecha_baja',
+        'motivo_baja': 'motivo_baja',
+    }
+    campos_por_defecto = ('id', 'alumno', 'materia', 'periodo', 'estado', 'activa', 'nota_final')
+    filtros = {
+        'alumno': ('alumno_id', int),
+        'materia': ('materia_id', int),
+        'periodo': ('periodo_id', int),
+        'estado': ('estado', str),
+        'activa': ('activa', booleano),
+    }
+
+    def get_queryset(self, parametros):
+        """Período actual, salvo que se filtre por otro período"""
+        if 'periodo' in parametros:
+            return Inscripcion.historico.all()
+        return Inscripcion.objects.all()
@@ -0,0 +1,16 @@
+from django.urls import path
+from . import views
+
+app_name = 'api'
+
+urlpatterns = [
+    # Versión 1: los cambios incompatibles van en una nueva versión
+    path('v1/carreras/', views.CarrerasApiView.as_view(), name='carreras'),
+    path('v1/carreras/<int:pk>/', views.CarrerasApiView.as_view(), name='carrera'),
+    path('v1/materias/', views.MateriasApiView.as_view(), name='materias'),
+    path('v1/materias/<int:pk>/', views.MateriasApiView.as_view(), name='materia'),
+    path('v1/alumnos/', views.AlumnosApiView.as_view(), name='alumnos'),
+    path('v1/alumnos/<int:pk>/', views.AlumnosApiView.as_view(), name='alumno'),
+    path('v1/inscripciones/', views.InscripcionesApiView.as_view(), name='inscripciones'),
+    path('v1/inscripciones/<int:pk>/', views.InscripcionesApiView.as_view(), name='inscripcion'),
+]
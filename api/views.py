@@ -0,0 +1,191 @@
+"""
+API JSON de solo lectura (v1) para otros sistemas
+Reemplaza el scraping de las páginas HTML. Todas las listas aceptan:
+
+- campos=id,nombre,...  columnas a devolver (por defecto, las básicas del
+  recurso); la consulta pide solo esas columnas
+- despues=<id> y limite=<n>  paginación por clave: los resultados vienen
+  ordenados por id y 'siguiente' trae la URL de la próxima página, así que
+  el costo de cada página no crece con el desplazamiento
+- ids=1,2,3  varios registros por id en un solo request
+- formato=filas  {"campos": [...], "filas": [[...], ...]} en lugar de un
+  objeto por registro, sin repetir los nombres de los campos
+- los filtros de cada recurso (ver api/recursos.py)
+
+Las respuestas llevan ETag y responden 304 a If-None-Match. Carreras y
+materias calculan el ETag con una consulta agregada (cantidad y última
+modificación), sin leer las filas; el resto, con el contenido. Alumnos e inscripciones requieren
+'Authorization: Bearer <token>' con uno de settings.API_TOKENS.
+"""
+import hashlib
+import hmac
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.views.generic import View
+
+from gestion_academica.db_routing import usar_replica
+from .recursos import AlumnosRecurso, CarrerasRecurso, InscripcionesRecurso, MateriasRecurso
+
+
+class ErrorApi(Exception):
+    def __init__(self, mensaje, estado=400):
+        super().__init__(mensaje)
+        self.estado = estado
+
+
+def respuesta_json(datos, estado=200):
+    cuerpo = json.dumps(datos, cls=DjangoJSONEncoder, ensure_ascii=False, separators=(',', ':'))
+    return HttpResponse(cuerpo, status=estado, content_type='application/json; charset=utf-8')
+
+
+def token_valido(request):
+    autorizacion = request.headers.get('Authorization', '')
+    return any(
+        hmac.compare_digest(autorizacion, f'Bearer {token}')
+        for token in settings.API_TOKENS if token
+    )
+
+
+def lista_enteros(valor, parametro):
+    try:
+        return [int(parte) for parte in valor.split(',') if parte]
+    except ValueError:
+        raise ErrorApi(f'{parametro} debe ser una lista de enteros separados por coma')
+
+
+class RecursoApiView(View):
+    """Lista (paginada o por ids) y detalle de un recurso"""
+    recurso = None
+    http_method_names = ['get', 'head', 'options']
+
+    def get(self, request, pk=None):
+        recurso = self.recurso
+        if not recurso.publico and not token_valido(request):
+            return respuesta_json({'error': 'Se requiere un token válido'}, estado=401)
+        try:
+            consulta = self.preparar(request.GET, pk)
+        except ErrorApi as e:
+            return respuesta_json({'error': str(e)}, estado=e.estado)
+
+        etag = None
+        with usar_replica():
+            version = recurso.version()
+        if version is not None:
+            # El ETag sale de la versión y la URL: un 304 no lee las filas
+            huella = hashlib.sha1(f'{version}:{request.get_full_path()}'.encode()).hexdigest()
+            etag = f'"{huella}"'
+            no_modificado = get_conditional_response(request, etag=etag)
+            if no_modificado is not None:
+                return self.finalizar(no_modificado, etag)
+
+        try:
+            with usar_replica():
+                datos = self.ejecutar(request, consulta)
+        except ErrorApi as e:
+            return respuesta_json({'error': str(e)}, estado=e.estado)
+        response = respuesta_json(datos)
+
+        if etag is None:
+            etag = f'"{hashlib.sha1(response.content).hexdigest()}"'
+            no_modificado = get_conditional_response(request, etag=etag)
+            if no_modificado is not None:
+                response = no_modificado
+        return self.finalizar(response, etag)
+
+    def finalizar(self, response, etag):
+        response['ETag'] = etag
+        response['Cache-Control'] = 'public, no-cache' if self.recurso.publico else 'private, no-cache'
+        patch_vary_headers(response, ('Authorization',))
+        return response
+
+    def preparar(self, parametros, pk):
+        """Valida los parámetros y arma campos, filtros y paginación"""
+        recurso = self.recurso
+        campos = ['id']
+        pedidos = parametros.get('campos')
+        for campo in (pedidos.split(',') if pedidos else recurso.campos_por_defecto):
+            campo = campo.strip()
+            if campo not in recurso.campos:
+                raise ErrorApi(f'Campo desconocido "{campo}"; disponibles: {", ".join(recurso.campos)}')
+            if campo not in campos:
+                campos.append(campo)
+
+        filtros = {}
+        for parametro, (lookup, convertir) in recurso.filtros.items():
+            if parametro in parametros:
+                try:
+                    filtros[lookup] = convertir(parametros[parametro])
+                except ValueError as e:
+                    raise ErrorApi(f'Valor inválido para {parametro}: {e}')
+
+        maximo = settings.API_LIMITE_MAXIMO
+        ids = None
+        if pk is not None:
+            ids = [pk]
+        elif 'ids' in parametros:
+            ids = lista_enteros(parametros['ids'], 'ids')
+            if len(ids) > maximo:
+                raise ErrorApi(f'Se pueden pedir hasta {maximo} ids por request')
+        try:
+            limite = int(parametros.get('limite', settings.API_LIMITE))
+            despues = int(parametros.get('despues', 0))
+        except ValueError:
+            raise ErrorApi('limite y despues deben ser enteros')
+        if not 1 <= limite <= maximo:
+            raise ErrorApi(f'limite debe estar entre 1 y {maximo}')
+
+        return {
+            'campos': campos,
+            'filtros': filtros,
+            'ids': ids,
+            'limite': limite,
+            'despues': despues,
+            'detalle': pk is not None,
+            'filas': parametros.get('formato') == 'filas',
+            'queryset': recurso.get_queryset(parametros),
+        }
+
+    def ejecutar(self, request, consulta):
+        campos = consulta['campos']
+        queryset = consulta['queryset'].filter(**consulta['filtros']).order_by('pk')
+        rutas = [self.recurso.campos[campo] for campo in campos]
+
+        siguiente = None
+        if consulta['ids'] is not None:
+            filas = list(queryset.filter(pk__in=consulta['ids']).values_list(*rutas))
+        else:
+            limite = consulta['limite']
+            filas = list(queryset.filter(pk__gt=consulta['despues']).values_list(*rutas)[:limite + 1])
+            if len(filas) > limite:
+                filas = filas[:limite]
+                parametros = request.GET.copy()
+                parametros['despues'] = filas[-1][0]
+                siguiente = f'{request.path}?{parametros.urlencode(safe=",")}'
+
+        if consulta['detalle']:
+            if not filas:
+                raise ErrorApi('No encontrado', estado=404)
+            return dict(zip(campos, filas[0]))
+        if consulta['filas']:
+            return {'campos': campos, 'filas': filas, 'siguiente': siguiente}
+        return {'resultados': [dict(zip(campos, fila)) for fila in filas], 'siguiente': siguiente}
+
+
+class CarrerasApiView(RecursoApiView):
+    recurso = CarrerasRecurso()
+
+
+class MateriasApiView(RecursoApiView):
+    recurso = MateriasRecurso()
+
+
+class AlumnosApiView(RecursoApiView):
+    recurso = AlumnosRecurso()
+
+
+class InscripcionesApiView(RecursoApiView):
+    recurso = InscripcionesRecurso()
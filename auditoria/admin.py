@@ -0,0 +1,21 @@
+from django.contrib import admin
+from .models import EventoAuditoria
+
+
+@admin.register(EventoAuditoria)
+class EventoAuditoriaAdmin(admin.ModelAdmin):
+    """Solo lectura: el registro de auditoría no se edita a mano"""
+    list_display = ['fecha', 'entidad', 'entidad_id', 'accion', 'actor', 'ip']
+    list_filter = ['entidad', 'accion']
+    search_fields = ['=entidad_id', 'actor']
+    date_hierarchy = 'fecha'
+    show_full_result_count = False
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def has_delete_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,151 @@
+"""
+Registro de auditoría con buffer por request
+registrar() y registrar_muchos() no escriben en la base: arman los eventos
+(con el usuario y la IP del request actual) y los encolan con on_commit,
+así que un cambio revertido no deja eventos. Dentro de un request los
+eventos confirmados se acumulan y AuditoriaMiddleware los inserta con un
+único bulk_create al terminar; fuera de un request (comandos, worker) se
+insertan al confirmarse cada transacción, salvo dentro de auditar().
+
+    registrar('usuario', usuario.pk, 'rol', antes='alumno', despues='docente')
+"""
+import contextvars
+import logging
+from contextlib import contextmanager
+from functools import partial
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from usuarios.limites import ip_cliente
+from .models import EventoAuditoria
+
+
+logger = logging.getLogger(__name__)
+
+_contexto = contextvars.ContextVar('auditoria', default=None)
+
+
+class _Contexto:
+    """Eventos pendientes de un request (o de un bloque auditar())"""
+    __slots__ = ('request', 'actor', 'eventos')
+
+    def __init__(self, request=None, actor=''):
+        self.request = request
+        self.actor = actor
+        self.eventos = []
+
+    def origen(self):
+        """Campos actor_id, actor e ip de los eventos"""
+        request = self.request
+        if request is None:
+            return {'actor_id': None, 'actor': self.actor, 'ip': None}
+        usuario = getattr(request, 'user', None)
+        autenticado = usuario is not None and usuario.is_authenticated
+        return {
+            'actor_id': usuario.pk if autenticado else None,
+            'actor': usuario.get_username() if autenticado else '',
+            'ip': ip_cliente(request) or None,
+        }
+
+
+def registrar(entidad, entidad_id, accion, **datos):
+    """Registra un evento de la entidad; se escribe si la transacción se confirma"""
+    registrar_muchos(entidad, [(entidad_id, accion, datos)])
+
+
+def registrar_muchos(entidad, eventos):
+    """Registra varios eventos (entidad_id, accion, datos) de una misma entidad"""
+    if not settings.AUDITORIA_ACTIVA:
+        return
+    contexto = _contexto.get()
+    origen = contexto.origen() if contexto else {'actor_id': None, 'actor': '', 'ip': None}
+    fecha = timezone.now()
+    pendientes = [
+        EventoAuditoria(
+            fecha=fecha, entidad=entidad, entidad_id=entidad_id, accion=accion,
+            datos=datos, **origen
+        )
+        for entidad_id, accion, datos in eventos
+    ]
+    if pendientes:
+        transaction.on_commit(partial(_encolar, pendientes))
+
+
+def _encolar(eventos):
+    """Callback de on_commit: acumula en el contexto actual o escribe ya"""
+    contexto = _contexto.get()
+    if contexto is None:
+        volcar(eventos)
+        return
+    contexto.eventos.extend(eventos)
+    if len(contexto.eventos) >= settings.AUDITORIA_MAX_BUFFER:
+        volcar(contexto.eventos)
+        contexto.eventos = []
+
+
+def volcar(eventos):
+    """
+    Inserta los eventos con un único bulk_create
+    Un error se registra en el log y no se propaga: la respuesta ya está
+    armada y el cambio auditado ya se confirmó.
+    """
+    if not eventos:
+        return
+    try:
+        EventoAuditoria.objects.bulk_create(eventos, batch_size=500)
+    except Exception:
+        logger.exception('No se pudieron guardar %s eventos de auditoría', len(eventos))
+
+
+@contextmanager
+def auditar(request=None, actor=''):
+    """
+    Acumula los eventos del bloque y los escribe juntos al salir
+    Para comandos y trabajos que hacen muchos cambios sueltos; actor
+    identifica el proceso cuando no hay request.
+    """
+    contexto = _Contexto(request, actor)
+    token = _contexto.set(contexto)
+    try:
+        yield contexto
+    finally:
+        _contexto.reset(token)
+        volcar(contexto.eventos)
+
+
+class AuditoriaMiddleware:
+    """
+    Escribe al final del request los eventos de auditoría que generó
+    Debe ir después de AuthenticationMiddleware (el actor es request.user);
+    el usuario recién se consulta si el request registra algún evento.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        with auditar(request):
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        # Las vistas sincrónicas corren en un hilo con una copia del contexto,
+        # que comparte este mismo _Contexto: sus eventos llegan al buffer
+        contexto = _Contexto(request, '')
+        token = _contexto.set(contexto)
+        try:
+            return await self.get_response(request)
+        finally:
+            _contexto.reset(token)
+            if contexto.eventos:
+                await sync_to_async(volcar)(contexto.eventos)
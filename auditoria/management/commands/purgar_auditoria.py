@@ -0,0 +1,78 @@
+"""
+Comando para aplicar la retención del registro de auditoría
+Uso: python manage.py purgar_auditoria --dias 730 --exportar auditoria-2024.jsonl.gz
+
+Borra los eventos anteriores al corte (por defecto AUDITORIA_RETENCION_DIAS)
+en lotes chicos, recorriendo el índice por fecha, para no bloquear la tabla
+mientras se siguen registrando eventos. Con --exportar, cada lote se agrega
+antes de borrarlo a un archivo JSON lines (comprimido si termina en .gz):
+así se rota el registro a almacenamiento externo. Si el proceso se
+interrumpe, volver a ejecutarlo continúa desde donde quedó.
+"""
+import gzip
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+
+from auditoria.models import EventoAuditoria
+
+
+CAMPOS = ['id', 'fecha', 'entidad', 'entidad_id', 'accion', 'datos', 'actor_id', 'actor', 'ip']
+
+
+class Command(BaseCommand):
+    help = 'Borra (y opcionalmente exporta) los eventos de auditoría anteriores a la retención'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, default=settings.AUDITORIA_RETENCION_DIAS,
+                            help=f'Antigüedad mínima, en días (por defecto {settings.AUDITORIA_RETENCION_DIAS})')
+        parser.add_argument('--lote', type=int, default=5000,
+                            help='Eventos borrados por transacción')
+        parser.add_argument('--exportar', metavar='ARCHIVO',
+                            help='Agrega los eventos borrados a un archivo JSON lines (.gz para comprimir)')
+        parser.add_argument('--simular', action='store_true',
+                            help='Solo informa cuántos eventos se borrarían')
+
+    def handle(self, *args, **options):
+        corte = timezone.now() - timedelta(days=options['dias'])
+        antiguos = EventoAuditoria.objects.filter(fecha__lt=corte)
+
+        self.stdout.write(f'Eventos de auditoría anteriores al {corte:%d/%m/%Y}')
+        if options['simular']:
+            self.stdout.write(f'   {antiguos.count()} a borrar')
+            return
+
+        archivo = None
+        if options['exportar']:
+            abrir = gzip.open if options['exportar'].endswith('.gz') else open
+            try:
+                archivo = abrir(options['exportar'], 'at', encoding='utf-8')
+            except OSError as e:
+                raise CommandError(f'No se pudo abrir el archivo: {e}')
+
+        total = 0
+        try:
+            while True:
+                with transaction.atomic():
+                    filas = list(antiguos.order_by('fecha').values(*CAMPOS)[:options['lote']])
+                    if not filas:
+                        break
+                    if archivo is not None:
+                        archivo.writelines(
+                            json.dumps(fila, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+                            for fila in filas
+                        )
+                        archivo.flush()
+                    # Sin relaciones ni señales: Django lo resuelve con un solo DELETE
+                    EventoAuditoria.objects.filter(pk__in=[fila['id'] for fila in filas]).delete()
+                total += len(filas)
+        finally:
+            if archivo is not None:
+                archivo.close()
+
+        self.stdout.write(self.style.SUCCESS(f'✅ {total} eventos borrados'))
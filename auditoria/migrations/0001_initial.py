@@ -0,0 +1,36 @@
+# Generated by Django 5.2.6 on 2026-10-19 13:10
+
+import django.core.serializers.json
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventoAuditoria',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Fecha')),
+                ('entidad', models.CharField(choices=[('inscripcion', 'Inscripción'), ('usuario', 'Usuario')], max_length=20, verbose_name='Entidad')),
+                ('entidad_id', models.PositiveBigIntegerField(verbose_name='ID de la Entidad')),
+                ('accion', models.CharField(max_length=30, verbose_name='Acción')),
+                ('datos', models.JSONField(blank=True, default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='Datos')),
+                ('actor_id', models.PositiveBigIntegerField(blank=True, null=True, verbose_name='ID del Actor')),
+                ('actor', models.CharField(blank=True, max_length=150, verbose_name='Actor')),
+                ('ip', models.GenericIPAddressField(blank=True, null=True, verbose_name='IP')),
+            ],
+            options={
+                'verbose_name': 'Evento de Auditoría',
+                'verbose_name_plural': 'Eventos de Auditoría',
+                'ordering': ['-fecha'],
+                'indexes': [models.Index(fields=['entidad', 'entidad_id', 'fecha'], name='auditoria_entidad_idx'), models.Index(fields=['fecha'], name='auditoria_fecha_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,74 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils import timezone
+
+
+class EventoAuditoria(models.Model):
+    """
+    Evento del registro de auditoría (solo se agregan filas)
+    Se escriben en lote con auditoria.eventos; el actor se guarda por id y
+    nombre de usuario, sin clave foránea, para que el registro sobreviva a
+    la baja del usuario. La retención la aplica el comando purgar_auditoria.
+    """
+    
+    ENTIDADES_CHOICES = [
+        ('inscripcion', 'Inscripción'),
+        ('usuario', 'Usuario'),
+    ]
+    
+    fecha = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Fecha'
+    )
+    
+    entidad = models.CharField(
+        max_length=20,
+        choices=ENTIDADES_CHOICES,
+        verbose_name='Entidad'
+    )
+    
+    entidad_id = models.PositiveBigIntegerField(
+        verbose_name='ID de la Entidad'
+    )
+    
+    accion = models.CharField(
+        max_length=30,
+        verbose_name='Acción'
+    )
+    
+    datos = models.JSONField(
+        default=dict,
+        blank=True,
+        encoder=DjangoJSONEncoder,
+        verbose_name='Datos'
+    )
+    
+    actor_id = models.PositiveBigIntegerField(
+        null=True,
+        blank=True,
+        verbose_name='ID del Actor'
+    )
+    
+    actor = models.CharField(
+        max_length=150,
+        blank=True,
+        verbose_name='Actor'
+    )
+    
+    ip = models.GenericIPAddressField(
+        null=True,
+        blank=True,
+        verbose_name='IP'
+    )
+    
+    class Meta:
+        verbose_name = 'Evento de Auditoría'
+        verbose_name_plural = 'Eventos de Auditoría'
+        ordering = ['-fecha']
+        indexes = [
+            models.Index(fields=['entidad', 'entidad_id', 'fecha'], name='auditoria_entidad_idx'),
+            models.Index(fields=['fecha'], name='auditoria_fecha_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_entidad_display()} #{self.entidad_id}: {self.accion}"
@@ -0,0 +1,60 @@
+"""
+Versionado del catálogo académico (carreras y materias)
+Los fragmentos de templates cacheados incluyen la versión en su clave, de
+modo que cualquier cambio del catálogo los invalida sin tener que
+borrarlos uno por uno.
+"""
+import time
+
+from django.core.cache import caches
+
+
+CATALOGO_VERSION_KEY = 'catalogo:version'
+CARRERA_VERSION_KEY = 'catalogo:carrera:{}:version'
+
+
+def _version_inicial():
+    """
+    Versión basada en el reloj: si la clave se pierde (reinicio o desalojo
+    del caché) nunca vuelve a coincidir con fragmentos viejos
+    """
+    return time.time_ns()
+
+
+def _obtener_version(key):
+    cache = caches['catalog']
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _version_inicial(), None)
+        version = cache.get(key)
+    return version
+
+
+def _incrementar_version(key):
+    cache = caches['catalog']
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _version_inicial(), None)
+
+
+def get_catalogo_version():
+    """Retorna la versión actual del catálogo completo"""
+    return _obtener_version(CATALOGO_VERSION_KEY)
+
+
+def get_carrera_version(carrera_id):
+    """Retorna la versión de una carrera (sus materias y cupos)"""
+    return _obtener_version(CARRERA_VERSION_KEY.format(carrera_id))
+
+
+def invalidar_catalogo(carrera_id=None):
+    """Invalida los fragmentos del catálogo y, si se indica, los de una carrera"""
+    _incrementar_version(CATALOGO_VERSION_KEY)
+    if carrera_id is not None:
+        invalidar_carrera(carrera_id)
+
+
+def invalidar_carrera(carrera_id):
+    """Invalida solo los fragmentos de una carrera (por ejemplo, al cambiar un cupo)"""
+    _incrementar_version(CARRERA_VERSION_KEY.format(carrera_id))
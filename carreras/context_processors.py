@@ -0,0 +1,24 @@
+"""
+Context processors del catálogo académico
+"""
+from django.conf import settings
+
+from gestion_academica.db_routing import leyendo_replica
+from .catalogo import get_catalogo_version
+
+
+def catalogo(request):
+    """
+    Expone la versión del catálogo y el timeout de los fragmentos cacheados
+    La versión se pasa como callable para que solo se consulte el caché en
+    los templates que efectivamente la usan. Los fragmentos renderizados
+    desde la réplica viven como mucho la ventana de fijación al primario,
+    para que un retraso de replicación no quede cacheado.
+    """
+    timeout = settings.TEMPLATE_FRAGMENT_TIMEOUT
+    if leyendo_replica():
+        timeout = min(timeout, settings.DB_REPLICA_PIN_SEGUNDOS)
+    return {
+        'catalogo_version': get_catalogo_version,
+        'fragmentos_timeout': timeout,
+    }
@@ -0,0 +1,134 @@
+"""
+Comando para medir el tiempo de render de los templates más pesados
+Uso: python manage.py benchmark_templates --iteraciones 200
+
+Compara tres configuraciones para cada template y rol:
+  - sin caché: loaders de archivos, sin caché de fragmentos
+  - loader cacheado: templates compilados una sola vez
+  - loader + fragmentos: loader cacheado y fragmentos {% cache %} calientes
+"""
+import copy
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.contrib.sessions.backends.base import SessionBase
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.template.loader import render_to_string
+from django.test import RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.views.generic import TemplateView
+
+from carreras.models import Carrera
+from carreras.forms import CarreraForm
+from carreras.views import CarreraListView
+from materias.views import MateriasPorCarreraView
+from usuarios.models import Usuario
+
+
+LOADERS_SIN_CACHE = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
+CACHE_DESACTIVADO = {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}
+CACHE_LOCAL = {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+
+
+class Command(BaseCommand):
+    help = 'Mide el tiempo de render por template con y sin caché'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iteraciones', type=int, default=100,
+                            help='Renders por template y configuración (por defecto 100)')
+
+    def handle(self, *args, **options):
+        carrera = Carrera.objects.filter(activa=True).first()
+        if not carrera:
+            raise CommandError('Se necesita al menos una carrera activa cargada.')
+
+        self.factory = RequestFactory()
+        iteraciones = options['iteraciones']
+
+        casos = [
+            ('base.html', None, self.render_base),
+            ('base.html', 'preceptor', self.render_base),
+            ('home.html', 'administrador', self.vista(TemplateView.as_view(template_name='home.html'), '/')),
+            ('home.html', 'alumno', self.vista(TemplateView.as_view(template_name='home.html'), '/')),
+            ('carreras/lista.html', 'administrador', self.vista(CarreraListView.as_view(), '/carreras/')),
+            ('carreras/lista.html', 'invitado', self.vista(CarreraListView.as_view(), '/carreras/')),
+            ('carreras/form.html', 'administrador', self.render_form_carrera),
+            ('materias/por_carrera.html', 'invitado', self.vista(
+                MateriasPorCarreraView.as_view(), f'/materias/por-carrera/{carrera.pk}/',
+                carrera_id=carrera.pk,
+            )),
+        ]
+
+        configuraciones = [
+            ('sin caché', self.templates(cacheado=False), CACHE_DESACTIVADO),
+            ('loader cacheado', self.templates(cacheado=True), CACHE_DESACTIVADO),
+            ('loader + fragmentos', self.templates(cacheado=True), CACHE_LOCAL),
+        ]
+
+        self.stdout.write(self.style.SUCCESS('=' * 78))
+        self.stdout.write(self.style.SUCCESS(f'   BENCHMARK DE TEMPLATES - {iteraciones} renders por caso'))
+        self.stdout.write(self.style.SUCCESS('=' * 78))
+
+        for template, rol, render in casos:
+            self.stdout.write(f'\n   {template} ({rol or "anónimo"})')
+            for nombre, templates, cache in configuraciones:
+                cache_por_alias = {alias: dict(cache, LOCATION=alias) for alias in settings.CACHES}
+                with override_settings(TEMPLATES=templates, CACHES=cache_por_alias):
+                    for alias in cache_por_alias:
+                        caches[alias].clear()
+                    render(rol)  # Calentar loader y fragmentos
+                    tiempos = []
+                    with CaptureQueriesContext(connection) as consultas:
+                        for _ in range(iteraciones):
+                            inicio = time.perf_counter()
+                            render(rol)
+                            tiempos.append((time.perf_counter() - inicio) * 1000)
+                self.stdout.write(
+                    f'      {nombre:<22} media {statistics.mean(tiempos):7.2f} ms   '
+                    f'p95 {sorted(tiempos)[int(len(tiempos) * 0.95) - 1]:7.2f} ms   '
+                    f'consultas/render {len(consultas) / iteraciones:5.1f}'
+                )
+
+    def templates(self, cacheado):
+        """Copia de TEMPLATES con o sin el loader cacheado"""
+        templates = copy.deepcopy(settings.TEMPLATES)
+        templates[0]['APP_DIRS'] = False
+        loaders = LOADERS_SIN_CACHE
+        if cacheado:
+            loaders = [('django.template.loaders.cached.Loader', LOADERS_SIN_CACHE)]
+        templates[0]['OPTIONS']['loaders'] = loaders
+        return templates
+
+    def request(self, path, rol, method='get'):
+        """Arma un request con un usuario (no persistido) del rol indicado"""
+        request = getattr(self.factory, method)(path)
+        if rol is None:
+            request.user = AnonymousUser()
+        else:
+            request.user = Usuario(username=f'bench_{rol}', first_name='Bench', last_name=rol, rol=rol,
+                                   debe_cambiar_password=False)
+        request.session = SessionBase()
+        request._messages = FallbackStorage(request)
+        return request
+
+    def render_base(self, rol):
+        return render_to_string('base.html', request=self.request('/', rol))
+
+    def render_form_carrera(self, rol):
+        context = {'form': CarreraForm(), 'titulo': 'Crear Carrera', 'accion': 'Crear'}
+        return render_to_string('carreras/form.html', context, request=self.request('/carreras/crear/', rol))
+
+    def vista(self, view, path, **kwargs):
+        """Retorna una función que ejecuta la vista y renderiza su respuesta"""
+        def render(rol):
+            return view(self.request(path, rol), **kwargs).render()
+        return render
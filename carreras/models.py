@@ -1,6 +1,7 @@
-from django.db import models
+from django.db import models, transaction
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.urls import reverse
+from .catalogo import invalidar_catalogo
 
 
 class Carrera(models.Model):
@@ -74,6 +75,18 @@ class Carrera(models.Model):
     def get_absolute_url(self):
         return reverse('carreras:detalle', kwargs={'pk': self.pk})
     
+    def save(self, *args, **kwargs):
+        """Guarda la carrera e invalida los fragmentos cacheados del catálogo"""
+        super().save(*args, **kwargs)
+        carrera_id = self.pk
+        transaction.on_commit(lambda: invalidar_catalogo(carrera_id))
+    
+    def delete(self, *args, **kwargs):
+        carrera_id = self.pk
+        resultado = super().delete(*args, **kwargs)
+        transaction.on_commit(lambda: invalidar_catalogo(carrera_id))
+        return resultado
+    
     def get_materias_count(self):
         """Retorna la cantidad de materias de la carrera"""
         return self.materias.filter(activa=True).count()
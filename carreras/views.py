@@ -4,12 +4,14 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib import messages
 from django.urls import reverse_lazy
 from django.db.models import Count, Q
+from django.utils import timezone
 from .models import Carrera
 from .forms import CarreraForm, FiltroCarreraForm
 from usuarios.views import AdminRequiredMixin
+from gestion_academica.db_routing import LecturaReplicaMixin
 
 
-class CarreraListView(ListView):
+class CarreraListView(LecturaReplicaMixin, ListView):
     """Vista para listar carreras con filtros avanzados"""
     model = Carrera
     template_name = 'carreras/lista.html'
@@ -68,7 +70,7 @@ class CarreraListView(ListView):
         return context
 
 
-class CarreraDetailView(LoginRequiredMixin, DetailView):
+class CarreraDetailView(LoginRequiredMixin, LecturaReplicaMixin, DetailView):
     """Vista de detalle de carrera con materias y estadísticas"""
     model = Carrera
     template_name = 'carreras/detalle.html'
@@ -153,7 +155,7 @@ class CarreraDeleteView(AdminRequiredMixin, DeleteView):
             messages.warning(request, 
                 f'La carrera "{self.object.nombre}" tiene materias activas. Éstas serán desactivadas.')
             # Desactivar las materias en lugar de eliminarlas
-            self.object.materias.update(activa=False)
+            self.object.materias.update(activa=False, fecha_actualizacion=timezone.now())
         
         messages.success(request, f'Carrera "{self.object.nombre}" eliminada exitosamente.')
         return super().delete(request, *args, **kwargs)
@@ -171,16 +173,18 @@ class CarreraDeleteView(AdminRequiredMixin, DeleteView):
 
 
 # Vistas auxiliares
-def carreras_activas_json(request):
+async def carreras_activas_json(request):
     """Vista para obtener carreras activas en formato JSON (para AJAX)"""
-    from django.http import JsonResponse
+    from django.http import JsonResponse, HttpResponseNotAllowed
     
     if request.method == 'GET':
         carreras = Carrera.objects.filter(activa=True).values('id', 'nombre', 'codigo')
-        return JsonResponse(list(carreras), safe=False)
+        return JsonResponse([carrera async for carrera in carreras], safe=False)
+    
+    return HttpResponseNotAllowed(['GET'])
 
 
-class CarrerasPorModalidadView(ListView):
+class CarrerasPorModalidadView(LecturaReplicaMixin, ListView):
     """Vista para mostrar carreras agrupadas por modalidad"""
     model = Carrera
     template_name = 'carreras/por_modalidad.html'
@@ -251,7 +255,7 @@ class CarreraDeleteView(AdminRequiredMixin, DeleteView):
         return response
 
 
-class OfertaAcademicaView(ListView):
+class OfertaAcademicaView(LecturaReplicaMixin, ListView):
     """Vista de oferta académica para alumnos"""
     model = Carrera
     template_name = 'carreras/oferta.html'
@@ -5,6 +5,10 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+
+Las vistas asíncronas (por ejemplo el stream SSE de cupos en
+materias:stream_cupos) requieren servir el proyecto con un servidor ASGI:
+    uvicorn gestion_academica.asgi:application
 """
 
 import os
@@ -0,0 +1,107 @@
+"""
+Backend de caché instrumentado
+Envuelve cualquier backend de Django y cuenta aciertos y fallos por alias
+"""
+import threading
+
+from django.core.cache.backends.base import BaseCache, DEFAULT_TIMEOUT
+from django.utils.module_loading import import_string
+
+
+_FALTANTE = object()
+
+_lock = threading.Lock()
+_estadisticas = {}
+
+
+def _registrar(alias, aciertos=0, fallos=0):
+    with _lock:
+        contador = _estadisticas.setdefault(alias, {'aciertos': 0, 'fallos': 0})
+        contador['aciertos'] += aciertos
+        contador['fallos'] += fallos
+
+
+def get_estadisticas():
+    """
+    Retorna aciertos, fallos y ratio de aciertos por alias
+    Los contadores son por proceso.
+    """
+    with _lock:
+        copia = {alias: dict(contador) for alias, contador in _estadisticas.items()}
+    for contador in copia.values():
+        total = contador['aciertos'] + contador['fallos']
+        contador['ratio'] = round(contador['aciertos'] / total, 4) if total else None
+    return copia
+
+
+def reiniciar_estadisticas():
+    """Pone en cero los contadores de todos los alias"""
+    with _lock:
+        _estadisticas.clear()
+
+
+class CacheInstrumentado(BaseCache):
+    """
+    Proxy sobre el backend real indicado en OPTIONS['BACKEND_REAL']
+    Las lecturas (get, get_many, has_key) se registran como aciertos o
+    fallos del alias OPTIONS['ALIAS']; el resto de operaciones se delega
+    sin cambios.
+    """
+
+    def __init__(self, location, params):
+        params = dict(params)
+        opciones = dict(params.get('OPTIONS', {}))
+        self.alias = opciones.pop('ALIAS')
+        backend_real = import_string(opciones.pop('BACKEND_REAL'))
+        params['OPTIONS'] = opciones
+        super().__init__(params)
+        self._cache = backend_real(location, params)
+
+    def get(self, key, default=None, version=None):
+        valor = self._cache.get(key, _FALTANTE, version=version)
+        if valor is _FALTANTE:
+            _registrar(self.alias, fallos=1)
+            return default
+        _registrar(self.alias, aciertos=1)
+        return valor
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        encontrados = self._cache.get_many(keys, version=version)
+        _registrar(self.alias, aciertos=len(encontrados), fallos=len(keys) - len(encontrados))
+        return encontrados
+
+    def has_key(self, key, version=None):
+        existe = self._cache.has_key(key, version=version)
+        _registrar(self.alias, aciertos=int(existe), fallos=int(not existe))
+        return existe
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        return self._cache.add(key, value, timeout=timeout, version=version)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        return self._cache.set(key, value, timeout=timeout, version=version)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        return self._cache.set_many(data, timeout=timeout, version=version)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self._cache.touch(key, timeout=timeout, version=version)
+
+    def delete(self, key, version=None):
+        return self._cache.delete(key, version=version)
+
+    def delete_many(self, keys, version=None):
+        return self._cache.delete_many(keys, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        return self._cache.incr(key, delta=delta, version=version)
+
+    def decr(self, key, delta=1, version=None):
+        return self._cache.decr(key, delta=delta, version=version)
+
+    def clear(self):
+        return self._cache.clear()
+
+    def close(self, **kwargs):
+        return self._cache.close(**kwargs)
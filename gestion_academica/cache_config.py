@@ -0,0 +1,94 @@
+"""
+Configuración de cachés a partir de variables de entorno
+
+Define los cachés con nombre del proyecto:
+    default    - uso general (fragmentos de navegación, etc.)
+    catalog    - catálogo académico (carreras, materias, versiones)
+    sessions   - sesiones, si SESSION_ENGINE usa caché
+    ratelimit  - contadores de límite de intentos
+
+Variables (leídas con decouple, igual que el resto de settings):
+    CACHE_BACKEND            locmem | file | redis | dummy (por defecto locmem)
+    CACHE_<ALIAS>_BACKEND    reemplaza el backend para un alias puntual
+    CACHE_TIMEOUT            timeout por defecto en segundos (300)
+    CACHE_<ALIAS>_TIMEOUT    timeout para un alias puntual
+    CACHE_FILE_DIR           directorio base del backend file
+    CACHE_REDIS_URL          URL de un servidor compatible con Redis
+                             (redis-server, Valkey, KeyDB) corriendo localmente
+    CACHE_INSTRUMENTAR       registra aciertos y fallos por alias (True)
+"""
+from importlib.util import find_spec
+
+from decouple import config
+from django.core.exceptions import ImproperlyConfigured
+
+
+CACHE_ALIASES = ['default', 'catalog', 'sessions', 'ratelimit']
+
+BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'redis': 'django.core.cache.backends.redis.RedisCache',
+    'dummy': 'django.core.cache.backends.dummy.DummyCache',
+}
+
+TIMEOUTS_POR_DEFECTO = {
+    'default': 300,
+    'catalog': 3600,
+    'sessions': 1800,
+    'ratelimit': 3600,
+}
+
+
+def _configurar_alias(alias, base_dir):
+    """Arma la entrada de CACHES para un alias"""
+    prefijo = f'CACHE_{alias.upper()}'
+    tipo = config(f'{prefijo}_BACKEND', default=config('CACHE_BACKEND', default='locmem'))
+    if tipo not in BACKENDS:
+        raise ValueError(f'{prefijo}_BACKEND inválido: "{tipo}". Opciones: {", ".join(BACKENDS)}')
+
+    cache = {
+        'BACKEND': BACKENDS[tipo],
+        'TIMEOUT': config(f'{prefijo}_TIMEOUT', default=TIMEOUTS_POR_DEFECTO[alias], cast=int),
+        'KEY_PREFIX': alias,
+    }
+
+    if tipo == 'locmem':
+        # Cada alias necesita su propio almacenamiento en memoria
+        cache['LOCATION'] = f'gestion-academica-{alias}'
+    elif tipo == 'file':
+        directorio = config('CACHE_FILE_DIR', default=str(base_dir / 'var' / 'cache'))
+        cache['LOCATION'] = f'{directorio}/{alias}'
+    elif tipo == 'redis':
+        # RedisCache importa el cliente recién al primer uso; se avisa al arrancar
+        if find_spec('redis') is None:
+            raise ImproperlyConfigured(
+                f'{prefijo}_BACKEND=redis requiere el paquete redis (pip install -r requirements.txt)'
+            )
+        cache['LOCATION'] = config('CACHE_REDIS_URL', default='redis://127.0.0.1:6379/0')
+
+    return cache
+
+
+def _instrumentar(alias, cache):
+    """Envuelve el backend real con el contador de aciertos y fallos"""
+    return {
+        'BACKEND': 'gestion_academica.cache_backends.CacheInstrumentado',
+        'LOCATION': cache.pop('LOCATION', ''),
+        'TIMEOUT': cache.pop('TIMEOUT'),
+        'KEY_PREFIX': cache.pop('KEY_PREFIX'),
+        'OPTIONS': {
+            'ALIAS': alias,
+            'BACKEND_REAL': cache.pop('BACKEND'),
+        },
+    }
+
+
+def construir_caches(base_dir):
+    """Retorna el diccionario CACHES para settings"""
+    instrumentar = config('CACHE_INSTRUMENTAR', default=True, cast=bool)
+    caches = {}
+    for alias in CACHE_ALIASES:
+        cache = _configurar_alias(alias, base_dir)
+        caches[alias] = _instrumentar(alias, cache) if instrumentar else cache
+    return caches
@@ -0,0 +1,151 @@
+"""
+Configuración de base de datos a partir de variables de entorno
+
+Perfil SQLite de producción (SQLITE_PERFIL=produccion, por defecto):
+aplica PRAGMAs en cada conexión nueva para soportar escrituras
+concurrentes sin errores "database is locked":
+    journal_mode=WAL        lectores y escritor no se bloquean entre sí
+    synchronous=NORMAL      fsync solo en checkpoints (seguro con WAL)
+    busy_timeout            espera al lock en lugar de fallar en el acto
+    mmap_size / cache_size  lecturas servidas desde memoria
+    temp_store=MEMORY       tablas temporales y ordenamientos en RAM
+Además las transacciones empiezan con BEGIN IMMEDIATE, de modo que la
+lectura de cupo y la escritura de la inscripción toman el lock de
+escritura desde el inicio y no quedan en deadlock.
+
+Variables:
+    SQLITE_PATH             ruta del archivo (db.sqlite3 en la raíz)
+    SQLITE_PERFIL           produccion | basico
+    SQLITE_BUSY_TIMEOUT     milisegundos (5000)
+    SQLITE_MMAP_SIZE        bytes (134217728)
+    SQLITE_CACHE_SIZE       páginas, negativo = KiB (-20000)
+    DB_CONN_MAX_AGE         segundos de reutilización de conexiones (60)
+
+PostgreSQL (DB_ENGINE=django.db.backends.postgresql, requiere
+psycopg[binary,pool]):
+    DB_NAME, DB_USER, DB_PASSWORD, DB_HOST, DB_PORT
+    DB_POOL                 pool de conexiones nativo de Django 5 (True)
+    DB_POOL_MIN_SIZE        conexiones abiertas mínimas (2)
+    DB_POOL_MAX_SIZE        conexiones abiertas máximas (10)
+    DB_POOL_TIMEOUT         segundos de espera por una conexión libre (10)
+    DB_TEST_NAME            base que crea `manage.py test`
+
+Réplica de lectura (alias 'replica', ver gestion_academica/db_routing.py):
+    SQLITE_REPLICA_PATH     segundo archivo SQLite que emula la réplica
+                            (en tests usa otro archivo aparte,
+                            SQLITE_REPLICA_TEST_PATH)
+    DB_REPLICA_HOST         host de la réplica PostgreSQL; el resto de los
+                            datos de conexión se toman del primario salvo
+                            DB_REPLICA_PORT / DB_REPLICA_NAME
+"""
+from decouple import config
+
+
+def pragmas_sqlite_produccion():
+    """Lista de PRAGMAs del perfil de producción"""
+    return [
+        'PRAGMA journal_mode=WAL',
+        'PRAGMA synchronous=NORMAL',
+        f'PRAGMA busy_timeout={config("SQLITE_BUSY_TIMEOUT", default=5000, cast=int)}',
+        f'PRAGMA mmap_size={config("SQLITE_MMAP_SIZE", default=134217728, cast=int)}',
+        f'PRAGMA cache_size={config("SQLITE_CACHE_SIZE", default=-20000, cast=int)}',
+        'PRAGMA temp_store=MEMORY',
+    ]
+
+
+def configurar_sqlite(base_dir):
+    """Arma la entrada de DATABASES para SQLite según el perfil elegido"""
+    perfil = config('SQLITE_PERFIL', default='produccion')
+    if perfil not in ('produccion', 'basico'):
+        raise ValueError(f'SQLITE_PERFIL inválido: "{perfil}". Opciones: produccion, basico')
+
+    database = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': config('SQLITE_PATH', default=str(base_dir / 'db.sqlite3')),
+        'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=60, cast=int),
+        'CONN_HEALTH_CHECKS': True,
+    }
+
+    if perfil == 'produccion':
+        busy_timeout = config('SQLITE_BUSY_TIMEOUT', default=5000, cast=int)
+        database['OPTIONS'] = {
+            'init_command': ';'.join(pragmas_sqlite_produccion()),
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': busy_timeout / 1000,
+        }
+
+    return database
+
+
+def configurar_postgresql():
+    """Arma la entrada de DATABASES para PostgreSQL"""
+    database = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': config('DB_NAME', default='gestion_academica'),
+        'USER': config('DB_USER', default=''),
+        'PASSWORD': config('DB_PASSWORD', default=''),
+        'HOST': config('DB_HOST', default='localhost'),
+        'PORT': config('DB_PORT', default='5432'),
+        'CONN_HEALTH_CHECKS': True,
+        'TEST': {
+            'NAME': config('DB_TEST_NAME', default='test_gestion_academica'),
+        },
+    }
+
+    if config('DB_POOL', default=True, cast=bool):
+        # El pool reemplaza a las conexiones persistentes (CONN_MAX_AGE debe ser 0)
+        database['CONN_MAX_AGE'] = 0
+        database['OPTIONS'] = {
+            'pool': {
+                'min_size': config('DB_POOL_MIN_SIZE', default=2, cast=int),
+                'max_size': config('DB_POOL_MAX_SIZE', default=10, cast=int),
+                'timeout': config('DB_POOL_TIMEOUT', default=10, cast=int),
+            },
+        }
+    else:
+        database['CONN_MAX_AGE'] = config('DB_CONN_MAX_AGE', default=60, cast=int)
+
+    return database
+
+
+def configurar_replica(default, base_dir):
+    """Arma la entrada de la réplica a partir del primario, o None si no hay"""
+    replica = dict(default)
+    if default['ENGINE'] == 'django.db.backends.sqlite3':
+        ruta = config('SQLITE_REPLICA_PATH', default='')
+        if not ruta:
+            return None
+        replica['NAME'] = ruta
+        replica['TEST'] = {
+            'NAME': config('SQLITE_REPLICA_TEST_PATH', default=str(base_dir / 'test_replica.sqlite3')),
+        }
+        return replica
+
+    host = config('DB_REPLICA_HOST', default='')
+    if not host:
+        return None
+    replica['HOST'] = host
+    replica['PORT'] = config('DB_REPLICA_PORT', default=default['PORT'])
+    replica['NAME'] = config('DB_REPLICA_NAME', default=default['NAME'])
+    # En tests una réplica real no recibe los datos: usar el primario
+    replica['TEST'] = {'MIRROR': 'default'}
+    return replica
+
+
+def construir_databases(base_dir):
+    """Retorna el diccionario DATABASES para settings"""
+    engine = config('DB_ENGINE', default='django.db.backends.sqlite3')
+    if engine == 'django.db.backends.postgresql':
+        default = configurar_postgresql()
+    elif engine == 'django.db.backends.sqlite3':
+        default = configurar_sqlite(base_dir)
+    else:
+        raise ValueError(f'DB_ENGINE no soportado: "{engine}"')
+
+    databases = {
+        'default': default,
+    }
+    replica = configurar_replica(default, base_dir)
+    if replica:
+        databases['replica'] = replica
+    return databases
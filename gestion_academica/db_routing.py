@@ -0,0 +1,128 @@
+"""
+Ruteo de lecturas a la réplica de base de datos
+
+Las vistas de listado y de reportes marcadas con LecturaReplicaMixin
+(listados, detalle de carrera y de alumno, certificados), la API y los
+comandos de solo lectura que usan usar_replica() (generar_certificados)
+leen desde el alias 'replica'; todo lo demás (y toda escritura) va a
+'default'. Si no hay réplica configurada no cambia nada.
+
+Después de una escritura (cualquier request que no sea GET/HEAD/OPTIONS)
+el usuario queda fijado al primario durante DB_REPLICA_PIN_SEGUNDOS, de
+modo que, por ejemplo, MisInscripcionesView muestre la inscripción
+recién creada aunque la réplica tenga retraso.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+
+REPLICA_ALIAS = 'replica'
+COOKIE_PRIMARIO = 'db_primario'
+METODOS_LECTURA = ('GET', 'HEAD', 'OPTIONS')
+
+_lectura_replica = ContextVar('lectura_replica', default=False)
+
+
+def replica_configurada():
+    """Verifica si existe el alias de réplica en DATABASES"""
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+@contextmanager
+def usar_replica():
+    """Envía a la réplica las lecturas ejecutadas dentro del bloque"""
+    token = _lectura_replica.set(True)
+    try:
+        yield
+    finally:
+        _lectura_replica.reset(token)
+
+
+def leyendo_replica():
+    """Verifica si el código actual está leyendo desde la réplica"""
+    return _lectura_replica.get() and replica_configurada()
+
+
+def primario_fijado(request):
+    """Verifica si el usuario escribió hace poco y debe leer del primario"""
+    return COOKIE_PRIMARIO in request.COOKIES
+
+
+class ReplicaRouter:
+    """
+    Router de Django: lecturas a la réplica solo dentro de usar_replica(),
+    escrituras siempre al primario
+    """
+
+    def db_for_read(self, model, **hints):
+        if leyendo_replica():
+            return REPLICA_ALIAS
+        return None
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Primario y réplica contienen los mismos datos
+        return True
+
+
+class PrimaryPinMiddleware:
+    """
+    Middleware que fija al primario a quien acaba de escribir
+    Usa una cookie de corta duración para no tocar la sesión.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        self.pin_segundos = settings.DB_REPLICA_PIN_SEGUNDOS
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return self.fijar(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.fijar(request, await self.get_response(request))
+
+    def fijar(self, request, response):
+        if request.method not in METODOS_LECTURA and replica_configurada():
+            response.set_cookie(
+                COOKIE_PRIMARIO, '1',
+                max_age=self.pin_segundos,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
+
+
+class LecturaReplicaMixin:
+    """
+    Mixin para vistas de solo lectura que pueden leer desde la réplica
+    Debe ir después de los mixins de permisos, para que la verificación
+    de rol se haga antes de cambiar de base.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if (request.method not in METODOS_LECTURA
+                or not replica_configurada()
+                or primario_fijado(request)):
+            return super().dispatch(request, *args, **kwargs)
+
+        with usar_replica():
+            response = super().dispatch(request, *args, **kwargs)
+            # Las TemplateResponse se renderizan tarde: forzar el render
+            # dentro del bloque para que las consultas del template
+            # también vayan a la réplica
+            if hasattr(response, 'render') and not getattr(response, 'is_rendered', True):
+                response.render()
+        return response
@@ -0,0 +1,68 @@
+"""
+Política de hashing de contraseñas a partir de variables de entorno
+
+El primer hasher de PASSWORD_HASHERS es el que se usa para toda contraseña
+nueva; los demás solo verifican hashes existentes, que Django vuelve a
+calcular con el preferido en el siguiente login correcto. Así se puede
+cambiar de política sin invalidar ninguna contraseña.
+
+Las contraseñas iniciales (el DNI, que el usuario debe cambiar en el primer
+ingreso) se guardan con 'pbkdf2_inicial', un PBKDF2 de pocas iteraciones:
+crear una cohorte entera no cuesta segundos de CPU por alumno, y el hash se
+reemplaza por el preferido en cuanto el usuario inicia sesión.
+
+Variables (leídas con decouple, igual que el resto de settings):
+    PASSWORD_HASHER                 argon2 | scrypt | pbkdf2 (por defecto scrypt)
+                                    argon2 requiere argon2-cffi (pip install django[argon2])
+    SCRYPT_WORK_FACTOR              N de scrypt, potencia de 2 (2**14)
+    SCRYPT_BLOCK_SIZE               r de scrypt (8)
+    ARGON2_TIME_COST                pasadas de Argon2id (2)
+    ARGON2_MEMORY_COST              memoria de Argon2id en KiB (19456)
+    ARGON2_PARALLELISM              hilos de Argon2id por hash (1)
+    CONTRASENA_INICIAL_ITERACIONES  iteraciones de 'pbkdf2_inicial' (1000)
+"""
+from importlib.util import find_spec
+
+from decouple import config
+
+
+HASHERS = {
+    'argon2': 'usuarios.hashers.Argon2AjustadoHasher',
+    'scrypt': 'usuarios.hashers.ScryptAjustadoHasher',
+    'pbkdf2': 'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+}
+
+# Solo verifican hashes guardados con políticas anteriores
+HASHERS_HEREDADOS = [
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'usuarios.hashers.ContrasenaInicialHasher',
+]
+
+
+def construir_hashers():
+    """Arma PASSWORD_HASHERS con el hasher de la política primero"""
+    politica = config('PASSWORD_HASHER', default='scrypt')
+    if politica not in HASHERS:
+        raise ValueError(f'PASSWORD_HASHER inválido: "{politica}". Opciones: {", ".join(HASHERS)}')
+
+    argon2_disponible = find_spec('argon2') is not None
+    if politica == 'argon2' and not argon2_disponible:
+        raise ValueError('PASSWORD_HASHER=argon2 requiere instalar argon2-cffi')
+
+    hashers = [HASHERS[politica]]
+    for nombre, ruta in HASHERS.items():
+        if nombre != politica and (nombre != 'argon2' or argon2_disponible):
+            hashers.append(ruta)
+    return hashers + HASHERS_HEREDADOS
+
+
+def parametros_hashers():
+    """Parámetros de costo de los hashers de usuarios/hashers.py"""
+    return {
+        'scrypt_work_factor': config('SCRYPT_WORK_FACTOR', default=2 ** 14, cast=int),
+        'scrypt_block_size': config('SCRYPT_BLOCK_SIZE', default=8, cast=int),
+        'argon2_time_cost': config('ARGON2_TIME_COST', default=2, cast=int),
+        'argon2_memory_cost': config('ARGON2_MEMORY_COST', default=19456, cast=int),
+        'argon2_parallelism': config('ARGON2_PARALLELISM', default=1, cast=int),
+        'inicial_iteraciones': config('CONTRASENA_INICIAL_ITERACIONES', default=1000, cast=int),
+    }
@@ -0,0 +1,368 @@
+"""
+Métricas de la aplicación en formato de exposición de Prometheus
+Los contadores e histogramas se acumulan en memoria en cada proceso. La
+vista /metrics los publica junto con valores que se calculan al momento
+de la lectura (trabajos en cola, sesiones activas).
+
+Con varios procesos (workers de gunicorn) cada uno tiene sus propios
+valores. Con METRICAS_DIRECTORIO configurado, cada proceso guarda su
+instantánea en <directorio>/<pid>.json (como mucho cada
+METRICAS_INTERVALO segundos y al terminar) y /metrics suma las de todos.
+Igual que con prometheus_client, el directorio debe vaciarse al iniciar el
+servidor, no mientras corre: los archivos de workers reemplazados siguen
+sumando para que los contadores no retrocedan.
+
+Métricas:
+    gestion_request_duracion_segundos{vista,estado}     histograma
+    gestion_request_consultas{vista}                    histograma
+    gestion_cache_aciertos_total{alias}                 contador
+    gestion_cache_fallos_total{alias}                   contador
+    gestion_limites_rechazados_total{limite}            contador
+    gestion_inscripciones_total{origen}                 contador (rate() = inscripciones/s)
+    gestion_inscripciones_rechazadas_total{motivo,etapa} contador
+    gestion_trabajos_en_cola{tarea,estado}              gauge (emails: tarea usuarios.tareas.enviar_email)
+    gestion_sesiones_activas                            gauge (solo sesiones en base de datos)
+"""
+import atexit
+import hmac
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import ExitStack
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils import timezone
+
+
+LIMITES_DURACION = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+LIMITES_CONSULTAS = (1, 2, 5, 10, 20, 50, 100, 200)
+
+_lock = threading.Lock()
+_registro = {}
+
+
+class Contador:
+    """Contador monótono con etiquetas"""
+    tipo = 'counter'
+
+    def __init__(self, nombre, ayuda, etiquetas=()):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self.valores = {}
+        _registro[nombre] = self
+
+    def _clave(self, etiquetas):
+        return tuple(str(etiquetas[nombre]) for nombre in self.etiquetas)
+
+    def inc(self, cantidad=1, **etiquetas):
+        clave = self._clave(etiquetas)
+        with _lock:
+            self.valores[clave] = self.valores.get(clave, 0) + cantidad
+
+    def establecer(self, valor, **etiquetas):
+        """Copia un total que ya lleva otro módulo (p. ej. las estadísticas de caché)"""
+        with _lock:
+            self.valores[self._clave(etiquetas)] = valor
+
+    def instantanea(self):
+        return [[list(clave), valor] for clave, valor in self.valores.items()]
+
+    @staticmethod
+    def combinar(destino, clave, valor):
+        destino[clave] = destino.get(clave, 0) + valor
+
+    def lineas(self, valores):
+        for clave, valor in sorted(valores.items()):
+            yield f'{self.nombre}{_etiquetas(self.etiquetas, clave)} {_numero(valor)}'
+
+
+class Histograma:
+    """Histograma acumulativo con límites fijos"""
+    tipo = 'histogram'
+
+    def __init__(self, nombre, ayuda, etiquetas=(), limites=LIMITES_DURACION):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self.limites = tuple(limites)
+        self.valores = {}
+        _registro[nombre] = self
+
+    def observar(self, valor, **etiquetas):
+        clave = tuple(str(etiquetas[nombre]) for nombre in self.etiquetas)
+        with _lock:
+            serie = self.valores.get(clave)
+            if serie is None:
+                # [cantidad por límite..., suma, total]
+                serie = self.valores[clave] = [0] * len(self.limites) + [0, 0]
+            for indice, limite in enumerate(self.limites):
+                if valor <= limite:
+                    serie[indice] += 1
+                    break
+            serie[-2] += valor
+            serie[-1] += 1
+
+    def instantanea(self):
+        return [[list(clave), list(serie)] for clave, serie in self.valores.items()]
+
+    @staticmethod
+    def combinar(destino, clave, serie):
+        actual = destino.get(clave)
+        destino[clave] = list(serie) if actual is None else [a + b for a, b in zip(actual, serie)]
+
+    def lineas(self, valores):
+        for clave, serie in sorted(valores.items()):
+            acumulado = 0
+            for limite, cantidad in zip(self.limites, serie):
+                acumulado += cantidad
+                yield (f'{self.nombre}_bucket'
+                       f'{_etiquetas(self.etiquetas + ("le",), clave + (_numero(limite),))} {acumulado}')
+            yield f'{self.nombre}_bucket{_etiquetas(self.etiquetas + ("le",), clave + ("+Inf",))} {serie[-1]}'
+            yield f'{self.nombre}_sum{_etiquetas(self.etiquetas, clave)} {_numero(serie[-2])}'
+            yield f'{self.nombre}_count{_etiquetas(self.etiquetas, clave)} {serie[-1]}'
+
+
+def _numero(valor):
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+def _escapar(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _etiquetas(nombres, valores):
+    if not nombres:
+        return ''
+    return '{' + ','.join(f'{nombre}="{_escapar(valor)}"' for nombre, valor in zip(nombres, valores)) + '}'
+
+
+REQUEST_DURACION = Histograma(
+    'gestion_request_duracion_segundos', 'Duración de los requests por vista y estado HTTP',
+    etiquetas=('vista', 'estado'),
+)
+REQUEST_CONSULTAS = Histograma(
+    'gestion_request_consultas', 'Consultas SQL por request', etiquetas=('vista',),
+    limites=LIMITES_CONSULTAS,
+)
+CACHE_ACIERTOS = Contador('gestion_cache_aciertos_total', 'Lecturas de caché con acierto', ('alias',))
+CACHE_FALLOS = Contador('gestion_cache_fallos_total', 'Lecturas de caché sin acierto', ('alias',))
+LIMITES_RECHAZADOS = Contador(
+    'gestion_limites_rechazados_total', 'Requests rechazados por límite de intentos', ('limite',)
+)
+INSCRIPCIONES = Contador('gestion_inscripciones_total', 'Inscripciones a materias creadas', ('origen',))
+INSCRIPCIONES_RECHAZADAS = Contador(
+    'gestion_inscripciones_rechazadas_total', 'Intentos de inscripción rechazados',
+    ('motivo', 'etapa'),
+)
+
+
+def _copiar_totales_externos():
+    """Trae los totales que llevan otros módulos del proceso"""
+    from gestion_academica.cache_backends import get_estadisticas
+    from usuarios.limites import get_rechazos
+
+    for alias, contador in get_estadisticas().items():
+        CACHE_ACIERTOS.establecer(contador['aciertos'], alias=alias)
+        CACHE_FALLOS.establecer(contador['fallos'], alias=alias)
+    for limite, cantidad in get_rechazos().items():
+        LIMITES_RECHAZADOS.establecer(cantidad, limite=limite)
+
+
+def instantanea():
+    """Valores del proceso actual, serializables en JSON"""
+    _copiar_totales_externos()
+    with _lock:
+        return {nombre: metrica.instantanea() for nombre, metrica in _registro.items()}
+
+
+# ----------------------------------------------------------------------
+# Modo multiproceso
+# ----------------------------------------------------------------------
+
+_ultima_escritura = 0.0
+
+
+def _directorio():
+    directorio = settings.METRICAS_DIRECTORIO
+    return Path(directorio) if directorio else None
+
+
+def guardar_instantanea(forzar=False):
+    """Escribe la instantánea del proceso (si está activo el modo multiproceso)"""
+    global _ultima_escritura
+    directorio = _directorio()
+    if directorio is None:
+        return
+    ahora = time.monotonic()
+    if not forzar and ahora - _ultima_escritura < settings.METRICAS_INTERVALO:
+        return
+    _ultima_escritura = ahora
+    directorio.mkdir(parents=True, exist_ok=True)
+    descriptor, temporal = tempfile.mkstemp(dir=directorio, suffix='.tmp')
+    with os.fdopen(descriptor, 'w') as archivo:
+        json.dump(instantanea(), archivo)
+    os.replace(temporal, directorio / f'{os.getpid()}.json')
+
+
+atexit.register(lambda: guardar_instantanea(forzar=True))
+
+
+def _combinar_procesos():
+    """Suma las instantáneas de todos los procesos: {nombre: {clave: valor}}"""
+    directorio = _directorio()
+    if directorio is None:
+        fuentes = [instantanea()]
+    else:
+        guardar_instantanea(forzar=True)
+        fuentes = []
+        for ruta in directorio.glob('*.json'):
+            try:
+                fuentes.append(json.loads(ruta.read_text()))
+            except (OSError, ValueError):
+                # Archivo reemplazado o a medio escribir por otro proceso
+                continue
+
+    combinado = {nombre: {} for nombre in _registro}
+    for fuente in fuentes:
+        for nombre, series in fuente.items():
+            metrica = _registro.get(nombre)
+            if metrica is None:
+                continue
+            for clave, valor in series:
+                metrica.combinar(combinado[nombre], tuple(clave), valor)
+    return combinado
+
+
+# ----------------------------------------------------------------------
+# Valores calculados al leer
+# ----------------------------------------------------------------------
+
+def _gauges():
+    """(nombre, ayuda, etiquetas, [(valores, numero)]) leídos de la base"""
+    from django.db.models import Count, Max
+    from integraciones.models import CursorConsumidor, EventoSalida
+    from trabajos.models import Trabajo
+
+    cola = Trabajo.objects.filter(estado__in=['pendiente', 'en_curso']).values(
+        'tarea', 'estado'
+    ).annotate(total=Count('id')).order_by('tarea', 'estado')
+    gauges = [(
+        'gestion_trabajos_en_cola', 'Trabajos pendientes o en curso por tarea',
+        ('tarea', 'estado'), [((fila['tarea'], fila['estado']), fila['total']) for fila in cola],
+    )]
+
+    # Aproximado: ids salteados por transacciones revertidas también cuentan
+    ultimo = EventoSalida.objects.aggregate(ultimo=Max('id'))['ultimo'] or 0
+    gauges.append((
+        'gestion_eventos_salida_pendientes', 'Eventos del outbox sin entregar por consumidor',
+        ('consumidor',), [
+            ((nombre,), max(ultimo - ultimo_id, 0))
+            for nombre, ultimo_id in CursorConsumidor.objects.values_list('nombre', 'ultimo_id')
+        ],
+    ))
+
+    if settings.SESSION_ENGINE in (
+        'django.contrib.sessions.backends.db', 'django.contrib.sessions.backends.cached_db'
+    ):
+        from django.contrib.sessions.models import Session
+        activas = Session.objects.filter(expire_date__gt=timezone.now()).count()
+        gauges.append(('gestion_sesiones_activas', 'Sesiones sin vencer', (), [((), activas)]))
+    return gauges
+
+
+def exponer():
+    """Texto en formato de exposición de Prometheus (0.0.4)"""
+    lineas = []
+    for nombre, valores in _combinar_procesos().items():
+        metrica = _registro[nombre]
+        lineas.append(f'# HELP {nombre} {metrica.ayuda}')
+        lineas.append(f'# TYPE {nombre} {metrica.tipo}')
+        lineas.extend(metrica.lineas(valores))
+    for nombre, ayuda, etiquetas, series in _gauges():
+        lineas.append(f'# HELP {nombre} {ayuda}')
+        lineas.append(f'# TYPE {nombre} gauge')
+        for valores, numero in series:
+            lineas.append(f'{nombre}{_etiquetas(etiquetas, valores)} {numero}')
+    return '\n'.join(lineas) + '\n'
+
+
+def metricas_view(request):
+    """
+    /metrics para el scraper de Prometheus
+    Sin sesión: se permite a las IPs de METRICAS_IPS o con
+    'Authorization: Bearer <METRICAS_TOKEN>'.
+    """
+    token = settings.METRICAS_TOKEN
+    autorizacion = request.headers.get('Authorization', '')
+    permitido = request.META.get('REMOTE_ADDR') in settings.METRICAS_IPS or (
+        token and hmac.compare_digest(autorizacion, f'Bearer {token}')
+    )
+    if not permitido:
+        return HttpResponseForbidden()
+    return HttpResponse(exponer(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+class ContadorConsultas(ExitStack):
+    """Cuenta las consultas SQL ejecutadas dentro del bloque, en todas las bases"""
+
+    def __init__(self):
+        super().__init__()
+        self.total = 0
+
+    def __enter__(self):
+        super().__enter__()
+        for conexion in connections.all():
+            self.enter_context(conexion.execute_wrapper(self.contar))
+        return self
+
+    def contar(self, execute, sql, params, many, context):
+        self.total += 1
+        return execute(sql, params, many, context)
+
+
+class MetricasMiddleware:
+    """
+    Mide duración y consultas SQL de cada request
+    Va primero en MIDDLEWARE para incluir el costo del resto de la pila.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        contador = ContadorConsultas()
+        inicio = time.perf_counter()
+        with contador:
+            response = self.get_response(request)
+        return self.registrar(request, response, time.perf_counter() - inicio, contador.total)
+
+    async def __acall__(self, request):
+        # Las conexiones son por contexto: las vistas sincrónicas y los
+        # sync_to_async del request usan las mismas que envolvemos acá
+        contador = ContadorConsultas()
+        inicio = time.perf_counter()
+        with contador:
+            response = await self.get_response(request)
+        return self.registrar(request, response, time.perf_counter() - inicio, contador.total)
+
+    def registrar(self, request, response, duracion, consultas):
+        coincidencia = getattr(request, 'resolver_match', None)
+        vista = (coincidencia.view_name or coincidencia._func_path) if coincidencia else '[sin vista]'
+        REQUEST_DURACION.observar(duracion, vista=vista, estado=response.status_code)
+        REQUEST_CONSULTAS.observar(consultas, vista=vista)
+        guardar_instantanea()
+        return response
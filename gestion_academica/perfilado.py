@@ -0,0 +1,249 @@
+"""
+Perfilado por muestreo de requests (opt-in)
+Con PERFILADO_ACTIVO=True, PerfiladoMiddleware perfila una fracción de los
+requests (PERFILADO_FRACCION) y todos los de administradores que envíen la
+cabecera PERFILADO_CABECERA. Mientras el request corre, un único hilo
+muestreador lee la pila del hilo que lo atiende cada PERFILADO_INTERVALO_MS
+(sys._current_frames, sin instrumentar cada llamada: el costo no depende de
+cuántas funciones ejecute la vista).
+
+Las pilas se acumulan por nombre de vista y se exportan en formato
+"collapsed" (flamegraph.pl, speedscope, inferno) o como JSON de speedscope
+desde usuarios:estadisticas_perfiles. Los datos son por proceso.
+
+En vistas async las muestras son del hilo del event loop, que puede estar
+atendiendo otros requests al mismo tiempo.
+"""
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+
+# Pilas distintas que se guardan por vista; el resto se suma a OTRAS
+MAX_PILAS_POR_VISTA = 5000
+OTRAS = (('[otras pilas]', '', 0),)
+
+_lock = threading.Lock()
+_perfiles = {}
+
+
+def _nombre_archivo(ruta):
+    """Ruta corta: relativa al proyecto o a site-packages"""
+    base = str(settings.BASE_DIR) + os.sep
+    if ruta.startswith(base):
+        return ruta[len(base):]
+    _, separador, resto = ruta.rpartition('site-packages' + os.sep)
+    return resto if separador else os.path.basename(ruta)
+
+
+_marcos = {}
+
+
+def _marco(codigo):
+    """(función, archivo, línea) de un code object, con memo"""
+    marco = _marcos.get(codigo)
+    if marco is None:
+        marco = _marcos[codigo] = (
+            getattr(codigo, 'co_qualname', codigo.co_name),
+            _nombre_archivo(codigo.co_filename),
+            codigo.co_firstlineno,
+        )
+    return marco
+
+
+def _pila(frame):
+    """Pila desde la raíz hasta el frame actual"""
+    pila = []
+    while frame is not None:
+        pila.append(_marco(frame.f_code))
+        frame = frame.f_back
+    pila.reverse()
+    return tuple(pila)
+
+
+class Muestreador:
+    """
+    Hilo que toma muestras de los hilos registrados
+    Se crea al primer uso y duerme mientras no haya requests perfilados.
+    """
+
+    def __init__(self, intervalo):
+        self.intervalo = intervalo
+        self._activos = {}
+        self._lock = threading.Lock()
+        self._hay_activos = threading.Event()
+        self._hilo = threading.Thread(target=self._ejecutar, name='perfilado', daemon=True)
+        self._hilo.start()
+
+    def iniciar(self, hilo_id):
+        muestras = Counter()
+        with self._lock:
+            self._activos[hilo_id] = muestras
+            self._hay_activos.set()
+        return muestras
+
+    def detener(self, hilo_id):
+        with self._lock:
+            muestras = self._activos.pop(hilo_id, Counter())
+            if not self._activos:
+                self._hay_activos.clear()
+        return muestras
+
+    def _ejecutar(self):
+        propio = threading.get_ident()
+        while True:
+            self._hay_activos.wait()
+            time.sleep(self.intervalo)
+            frames = sys._current_frames()
+            with self._lock:
+                for hilo_id, muestras in self._activos.items():
+                    frame = frames.get(hilo_id)
+                    if frame is not None and hilo_id != propio:
+                        muestras[_pila(frame)] += 1
+
+
+_muestreador = None
+_muestreador_lock = threading.Lock()
+
+
+def get_muestreador():
+    global _muestreador
+    with _muestreador_lock:
+        if _muestreador is None:
+            _muestreador = Muestreador(settings.PERFILADO_INTERVALO_MS / 1000)
+        return _muestreador
+
+
+def registrar_perfil(vista, muestras, duracion_ms):
+    """Suma las muestras de un request al perfil acumulado de su vista"""
+    with _lock:
+        perfil = _perfiles.setdefault(vista, {
+            'requests': 0, 'muestras': 0, 'duracion_ms': 0.0, 'pilas': Counter(),
+        })
+        perfil['requests'] += 1
+        perfil['muestras'] += sum(muestras.values())
+        perfil['duracion_ms'] += duracion_ms
+        pilas = perfil['pilas']
+        for pila, cantidad in muestras.items():
+            if pila in pilas or len(pilas) < MAX_PILAS_POR_VISTA:
+                pilas[pila] += cantidad
+            else:
+                pilas[OTRAS] += cantidad
+
+
+def get_resumen():
+    """Requests, muestras y duración media por vista"""
+    with _lock:
+        return {
+            vista: {
+                'requests': perfil['requests'],
+                'muestras': perfil['muestras'],
+                'duracion_media_ms': round(perfil['duracion_ms'] / perfil['requests'], 2),
+            }
+            for vista, perfil in _perfiles.items()
+        }
+
+
+def _pilas(vista=None):
+    with _lock:
+        return {
+            nombre: Counter(perfil['pilas'])
+            for nombre, perfil in _perfiles.items()
+            if vista is None or nombre == vista
+        }
+
+
+def exportar_collapsed(vista=None):
+    """Una línea 'vista;marco;marco;... cantidad' por pila"""
+    lineas = []
+    for nombre, pilas in sorted(_pilas(vista).items()):
+        for pila, cantidad in pilas.most_common():
+            marcos = ';'.join(f'{funcion} ({archivo}:{linea})' for funcion, archivo, linea in pila)
+            lineas.append(f'{nombre};{marcos} {cantidad}')
+    return '\n'.join(lineas) + '\n'
+
+
+def exportar_speedscope(vista=None):
+    """Perfiles 'sampled' de speedscope, uno por vista, con marcos compartidos"""
+    intervalo = settings.PERFILADO_INTERVALO_MS
+    marcos = {}
+    perfiles = []
+    for nombre, pilas in sorted(_pilas(vista).items()):
+        muestras, pesos = [], []
+        for pila, cantidad in pilas.most_common():
+            muestras.append([marcos.setdefault(marco, len(marcos)) for marco in pila])
+            pesos.append(cantidad * intervalo)
+        perfiles.append({
+            'type': 'sampled',
+            'name': nombre,
+            'unit': 'milliseconds',
+            'startValue': 0,
+            'endValue': sum(pesos),
+            'samples': muestras,
+            'weights': pesos,
+        })
+    return {
+        '$schema': 'https://www.speedscope.app/file-format-schema.json',
+        'name': 'gestion_academica',
+        'exporter': 'gestion_academica.perfilado',
+        'shared': {'frames': [
+            {'name': funcion, 'file': archivo, 'line': linea}
+            for (funcion, archivo, linea) in marcos
+        ]},
+        'profiles': perfiles,
+    }
+
+
+def reiniciar_perfiles():
+    with _lock:
+        _perfiles.clear()
+
+
+class PerfiladoMiddleware:
+    """
+    Perfila por muestreo los requests elegidos
+    Debe ir después de AuthenticationMiddleware: la cabecera solo se acepta
+    de administradores. Si PERFILADO_ACTIVO es False Django lo descarta al
+    arrancar y no agrega ningún costo. Es solo sincrónico (muestrea el hilo
+    del request): activo bajo ASGI, las vistas async pasan a ocupar un hilo.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PERFILADO_ACTIVO:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.fraccion = settings.PERFILADO_FRACCION
+        self.cabecera = settings.PERFILADO_CABECERA
+
+    def debe_perfilar(self, request):
+        if self.fraccion and random.random() < self.fraccion:
+            return True
+        return (
+            self.cabecera in request.headers
+            and request.user.is_authenticated
+            and request.user.es_administrador()
+        )
+
+    def __call__(self, request):
+        if not self.debe_perfilar(request):
+            return self.get_response(request)
+
+        muestreador = get_muestreador()
+        hilo_id = threading.get_ident()
+        inicio = time.perf_counter()
+        muestreador.iniciar(hilo_id)
+        try:
+            response = self.get_response(request)
+        finally:
+            muestras = muestreador.detener(hilo_id)
+            duracion_ms = (time.perf_counter() - inicio) * 1000
+            coincidencia = getattr(request, 'resolver_match', None)
+            vista = (coincidencia.view_name or coincidencia._func_path) if coincidencia else '[sin vista]'
+            registrar_perfil(vista, muestras, duracion_ms)
+        return response
@@ -13,6 +13,10 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 from pathlib import Path
 from decouple import config, Csv
 
+from .cache_config import construir_caches
+from .database_config import construir_databases
+from .hasher_config import construir_hashers, parametros_hashers
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -44,16 +48,24 @@ INSTALLED_APPS = [
     'carreras',
     'materias',
     'inscripciones',
+    'trabajos',
+    'auditoria',
+    'integraciones',
+    'api',
 ]
 
 MIDDLEWARE = [
+    'gestion_academica.metricas.MetricasMiddleware',  # Duración y consultas por request (/metrics)
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    'gestion_academica.db_routing.PrimaryPinMiddleware',  # Leer del primario después de escribir
+    'usuarios.middleware.SesionSelectivaMiddleware',  # SessionMiddleware con rutas sin sesión
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'auditoria.eventos.AuditoriaMiddleware',  # Escribe en lote los eventos de auditoría del request
     'usuarios.middleware.SessionTimeoutMiddleware',  # Middleware de timeout
     'usuarios.middleware.ForcePasswordChangeMiddleware',  # Forzar cambio de contraseña
+    'gestion_academica.perfilado.PerfiladoMiddleware',  # Perfilado por muestreo (PERFILADO_ACTIVO)
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -73,25 +85,53 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'carreras.context_processors.catalogo',
             ],
         },
     },
 ]
 
+# Tiempo de vida (segundos) de los fragmentos cacheados con {% cache %}
+TEMPLATE_FRAGMENT_TIMEOUT = config('TEMPLATE_FRAGMENT_TIMEOUT', default=600, cast=int)
+
 WSGI_APPLICATION = 'gestion_academica.wsgi.application'
 
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+# Ver gestion_academica/database_config.py para el perfil SQLite de producción
+
+DATABASES = construir_databases(BASE_DIR)
+
+# Lecturas de listados y reportes a la réplica (si está configurada)
+DATABASE_ROUTERS = ['gestion_academica.db_routing.ReplicaRouter']
+
+# Segundos que un usuario lee del primario después de escribir
+DB_REPLICA_PIN_SEGUNDOS = config('DB_REPLICA_PIN_SEGUNDOS', default=15, cast=int)
+
+
+# Cache
+# Ver gestion_academica/cache_config.py para las variables disponibles
+
+CACHES = construir_caches(BASE_DIR)
+
+# Límites de intentos con ventana deslizante (ver usuarios/limites.py),
+# guardados en el caché 'ratelimit': nombre -> (máximo de intentos, ventana en segundos)
+LIMITES_INTENTOS_ACTIVOS = config('LIMITES_INTENTOS_ACTIVOS', default=True, cast=bool)
+LIMITES_INTENTOS = {
+    'login_ip': (config('LIMITE_LOGIN_IP', default=30, cast=int), 300),
+    'login_usuario': (config('LIMITE_LOGIN_USUARIO', default=5, cast=int), 300),
+    'recuperar_ip': (config('LIMITE_RECUPERAR_IP', default=10, cast=int), 3600),
+    'recuperar_email': (config('LIMITE_RECUPERAR_EMAIL', default=3, cast=int), 3600),
 }
 
 
+# Hashing de contraseñas
+# Ver gestion_academica/hasher_config.py para la política y los parámetros de costo
+PASSWORD_HASHERS = construir_hashers()
+HASHER_PARAMETROS = parametros_hashers()
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -136,6 +176,51 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = 'media/'
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Certificados en PDF (ver alumnos/documentos.py): se guardan por huella de contenido
+DOCUMENTOS_ROOT = config('DOCUMENTOS_ROOT', default=str(MEDIA_ROOT / 'documentos'))
+DOCUMENTOS_PROCESOS = config('DOCUMENTOS_PROCESOS', default=2, cast=int)
+DOCUMENTOS_TIMEOUT = config('DOCUMENTOS_TIMEOUT', default=30, cast=int)
+DOCUMENTOS_INSTITUCION = config('DOCUMENTOS_INSTITUCION', default='Sistema de Gestión Académica')
+
+# Cola de trabajos en segundo plano (ver trabajos/cola.py y manage.py run_worker)
+# Con TRABAJOS_SINCRONICO=True los trabajos se ejecutan en el mismo proceso
+# al confirmarse la transacción, sin necesidad de levantar un worker (por
+# defecto en desarrollo). Sin él, si un trabajo espera más de
+# TRABAJOS_ALERTA_ESPERA segundos se advierte en el log: no hay worker
+TRABAJOS_SINCRONICO = config('TRABAJOS_SINCRONICO', default=DEBUG, cast=bool)
+TRABAJOS_ALERTA_ESPERA = config('TRABAJOS_ALERTA_ESPERA', default=300, cast=int)
+TRABAJOS_CONCURRENCIA = config('TRABAJOS_CONCURRENCIA', default=4, cast=int)
+TRABAJOS_ALQUILER = config('TRABAJOS_ALQUILER', default=60, cast=int)
+
+# Perfilado por muestreo (ver gestion_academica/perfilado.py); desactivado por defecto
+PERFILADO_ACTIVO = config('PERFILADO_ACTIVO', default=False, cast=bool)
+PERFILADO_FRACCION = config('PERFILADO_FRACCION', default=0.0, cast=float)  # 0.01 = 1% de los requests
+PERFILADO_INTERVALO_MS = config('PERFILADO_INTERVALO_MS', default=5, cast=int)
+PERFILADO_CABECERA = config('PERFILADO_CABECERA', default='X-Perfilar')  # solo administradores
+
+# Métricas en formato Prometheus (ver gestion_academica/metricas.py)
+# Con varios procesos (gunicorn) definir METRICAS_DIRECTORIO y vaciarlo al iniciar el servidor
+METRICAS_DIRECTORIO = config('METRICAS_DIRECTORIO', default='')
+METRICAS_INTERVALO = config('METRICAS_INTERVALO', default=1.0, cast=float)  # segundos entre escrituras
+METRICAS_IPS = config('METRICAS_IPS', default='127.0.0.1,::1', cast=Csv())
+METRICAS_TOKEN = config('METRICAS_TOKEN', default='')
+
+# Registro de auditoría (ver auditoria/eventos.py y manage.py purgar_auditoria)
+AUDITORIA_ACTIVA = config('AUDITORIA_ACTIVA', default=True, cast=bool)
+AUDITORIA_MAX_BUFFER = config('AUDITORIA_MAX_BUFFER', default=500, cast=int)  # eventos por request antes de escribir
+AUDITORIA_RETENCION_DIAS = config('AUDITORIA_RETENCION_DIAS', default=730, cast=int)
+
+# Outbox de eventos para otros sistemas (ver integraciones/outbox.py y manage.py consumir_eventos)
+INTEGRACIONES_OUTBOX_ACTIVO = config('INTEGRACIONES_OUTBOX_ACTIVO', default=True, cast=bool)
+INTEGRACIONES_ESPERA_HUECOS = config('INTEGRACIONES_ESPERA_HUECOS', default=300, cast=int)  # segundos
+INTEGRACIONES_WEBHOOK_SECRETO = config('INTEGRACIONES_WEBHOOK_SECRETO', default='')
+INTEGRACIONES_RETENCION_DIAS = config('INTEGRACIONES_RETENCION_DIAS', default=30, cast=int)
+
+# API JSON de solo lectura en /api/v1/ (ver api/views.py)
+API_TOKENS = config('API_TOKENS', default='', cast=Csv())  # Authorization: Bearer <token>
+API_LIMITE = config('API_LIMITE', default=100, cast=int)  # registros por página
+API_LIMITE_MAXIMO = config('API_LIMITE_MAXIMO', default=1000, cast=int)
+
 # Login/Logout URLs
 LOGIN_URL = 'usuarios:login'
 LOGIN_REDIRECT_URL = '/'
@@ -156,9 +241,22 @@ SESSION_EXPIRE_AT_BROWSER_CLOSE = True  # La sesión expira al cerrar el navegad
 SESSION_COOKIE_SECURE = False  # Cambiar a True en producción con HTTPS
 SESSION_COOKIE_HTTPONLY = True  # Previene acceso a cookies desde JavaScript
 SESSION_COOKIE_SAMESITE = 'Lax'  # Protección CSRF
+# Motor de sesiones: 'django.contrib.sessions.backends.cached_db' usa el caché "sessions"
+# sin perder la copia en base de datos (necesaria para cerrar sesiones al restablecer contraseña)
+SESSION_ENGINE = config('SESSION_ENGINE', default='django.contrib.sessions.backends.db')
+SESSION_CACHE_ALIAS = 'sessions'
+
+# Prefijos de ruta que no leen ni guardan la sesión (ver usuarios/middleware.py):
+# estáticos, endpoints AJAX públicos y la API (autenticada por token)
+RUTAS_SIN_SESION = config(
+    'RUTAS_SIN_SESION',
+    default='/static/,/media/,/favicon.ico,/metrics,/api/,/carreras/api/,/materias/ajax/,/materias/stream/',
+    cast=Csv(),
+)
 
 # Configuración de Email con Gmail SMTP
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+# En desarrollo: EMAIL_BACKEND=django.core.mail.backends.console.EmailBackend
+EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.smtp.EmailBackend')
 EMAIL_HOST = config('EMAIL_HOST', default='smtp.gmail.com')
 EMAIL_PORT = config('EMAIL_PORT', default=587, cast=int)
 EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=True, cast=bool)
@@ -0,0 +1,250 @@
+"""
+Tests de la configuración de base de datos y del ruteo a la réplica
+Los de configurar_postgresql y los del router corren con cualquier motor;
+los del pool, solo con la configuración de PostgreSQL, y los que leen de
+una réplica real, con dos archivos SQLite (primario y réplica):
+    DB_ENGINE=django.db.backends.postgresql python manage.py test gestion_academica
+    SQLITE_REPLICA_PATH=db_replica.sqlite3 python manage.py test gestion_academica
+"""
+import os
+import threading
+import time
+import unittest
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.http import HttpResponse
+from django.template import engines
+from django.template.response import TemplateResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase
+from django.views import View
+
+from carreras.models import Carrera
+from materias.models import Materia
+from .database_config import configurar_postgresql
+from .db_routing import (
+    COOKIE_PRIMARIO, REPLICA_ALIAS, LecturaReplicaMixin, PrimaryPinMiddleware, ReplicaRouter,
+    leyendo_replica, usar_replica,
+)
+
+
+class ConfigurarPostgresqlTests(SimpleTestCase):
+    """Entrada de DATABASES armada desde las variables DB_*"""
+
+    def configurar(self, **variables):
+        with mock.patch.dict(os.environ, variables):
+            return configurar_postgresql()
+
+    def test_pool_por_defecto(self):
+        database = self.configurar(DB_POOL_MIN_SIZE='3', DB_POOL_MAX_SIZE='12', DB_POOL_TIMEOUT='5')
+        self.assertEqual(database['ENGINE'], 'django.db.backends.postgresql')
+        # El pool de Django no admite conexiones persistentes
+        self.assertEqual(database['CONN_MAX_AGE'], 0)
+        self.assertEqual(database['OPTIONS']['pool'], {'min_size': 3, 'max_size': 12, 'timeout': 5})
+
+    def test_sin_pool_usa_conexiones_persistentes(self):
+        database = self.configurar(DB_POOL='False', DB_CONN_MAX_AGE='120')
+        self.assertEqual(database['CONN_MAX_AGE'], 120)
+        self.assertNotIn('OPTIONS', database)
+
+    def test_nombre_de_la_base_de_tests(self):
+        database = self.configurar(DB_TEST_NAME='ci_gestion')
+        self.assertEqual(database['TEST']['NAME'], 'ci_gestion')
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'Requiere DB_ENGINE=django.db.backends.postgresql')
+class PoolPostgresqlTests(TransactionTestCase):
+    """El pool configurado atiende a varios hilos a la vez"""
+
+    espera = 0.3  # segundos de cada consulta
+
+    def setUp(self):
+        self.opciones = connection.settings_dict.get('OPTIONS', {}).get('pool')
+        if not self.opciones:
+            self.skipTest('DB_POOL=False')
+
+    def test_pool_activo(self):
+        self.assertEqual(connection.settings_dict['CONN_MAX_AGE'], 0)
+        self.assertIsNotNone(connection.pool)
+
+    def test_hilos_concurrentes(self):
+        cantidad = self.opciones['max_size'] if isinstance(self.opciones, dict) else 4
+        errores = []
+        barrera = threading.Barrier(cantidad)
+
+        def consultar():
+            try:
+                barrera.wait()
+                with connection.cursor() as cursor:
+                    cursor.execute('SELECT pg_sleep(%s)', [self.espera])
+            except Exception as e:
+                errores.append(e)
+            finally:
+                connection.close()
+
+        hilos = [threading.Thread(target=consultar) for _ in range(cantidad)]
+        inicio = time.perf_counter()
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        duracion = time.perf_counter() - inicio
+
+        self.assertEqual(errores, [])
+        # En paralelo tardan poco más que una consulta, no la suma de todas
+        self.assertLess(duracion, self.espera * cantidad / 2)
+
+
+# Primario y réplica en dos archivos SQLite (SQLITE_REPLICA_PATH)
+REPLICA_SQLITE = REPLICA_ALIAS in settings.DATABASES and connection.vendor == 'sqlite'
+
+
+def con_replica(configurada=True):
+    """Simula (o no) el alias de réplica en DATABASES"""
+    return mock.patch('gestion_academica.db_routing.replica_configurada', return_value=configurada)
+
+
+class ReplicaRouterTests(SimpleTestCase):
+    """Lecturas a la réplica solo dentro de usar_replica(); escrituras al primario"""
+
+    router = ReplicaRouter()
+
+    def test_lectura_fuera_del_bloque(self):
+        with con_replica():
+            self.assertIsNone(self.router.db_for_read(Carrera))
+
+    def test_lectura_dentro_del_bloque(self):
+        with con_replica(), usar_replica():
+            self.assertEqual(self.router.db_for_read(Carrera), REPLICA_ALIAS)
+        with con_replica(), usar_replica():
+            with usar_replica():
+                pass
+            # Al salir de un bloque anidado se sigue leyendo de la réplica
+            self.assertEqual(self.router.db_for_read(Carrera), REPLICA_ALIAS)
+
+    def test_sin_replica_configurada(self):
+        with con_replica(False), usar_replica():
+            self.assertIsNone(self.router.db_for_read(Carrera))
+
+    def test_escritura_siempre_al_primario(self):
+        with con_replica(), usar_replica():
+            self.assertEqual(self.router.db_for_write(Carrera), 'default')
+
+    def test_relacion_entre_primario_y_replica(self):
+        carrera = Carrera(pk=1)
+        carrera._state.db = REPLICA_ALIAS
+        materia = Materia()
+        materia._state.db = 'default'
+        self.assertTrue(self.router.allow_relation(carrera, materia))
+        # El descriptor de la FK consulta al router y no rechaza la asignación
+        materia.carrera = carrera
+        self.assertEqual(materia.carrera_id, 1)
+
+
+class PrimaryPinMiddlewareTests(SimpleTestCase):
+    """Quien escribe queda fijado al primario con una cookie de corta duración"""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.middleware = PrimaryPinMiddleware(lambda request: HttpResponse())
+
+    def test_escritura_fija_al_primario(self):
+        with con_replica():
+            response = self.middleware(self.factory.post('/'))
+        cookie = response.cookies[COOKIE_PRIMARIO]
+        self.assertEqual(cookie['max-age'], settings.DB_REPLICA_PIN_SEGUNDOS)
+        self.assertTrue(cookie['httponly'])
+
+    def test_lectura_no_fija(self):
+        with con_replica():
+            response = self.middleware(self.factory.get('/'))
+        self.assertNotIn(COOKIE_PRIMARIO, response.cookies)
+
+    def test_sin_replica_no_fija(self):
+        with con_replica(False):
+            response = self.middleware(self.factory.post('/'))
+        self.assertNotIn(COOKIE_PRIMARIO, response.cookies)
+
+
+class VistaReplica(LecturaReplicaMixin, View):
+    """Informa si la vista y su template leyeron de la réplica"""
+
+    def get(self, request):
+        plantilla = engines['django'].from_string('{{ en_template }}')
+        return TemplateResponse(request, plantilla, {
+            'en_vista': leyendo_replica(), 'en_template': leyendo_replica,
+        })
+
+    def post(self, request):
+        return HttpResponse(str(leyendo_replica()))
+
+
+class LecturaReplicaMixinTests(SimpleTestCase):
+    """Qué requests de una vista marcada leen de la réplica"""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.vista = VistaReplica.as_view()
+
+    def test_get_lee_de_la_replica_incluido_el_template(self):
+        with con_replica():
+            response = self.vista(self.factory.get('/'))
+        self.assertTrue(response.context_data['en_vista'])
+        # La TemplateResponse se renderiza dentro del bloque
+        self.assertEqual(response.content, b'True')
+
+    def test_usuario_fijado_lee_del_primario(self):
+        request = self.factory.get('/')
+        request.COOKIES[COOKIE_PRIMARIO] = '1'
+        with con_replica():
+            response = self.vista(request)
+        self.assertFalse(response.context_data['en_vista'])
+
+    def test_escritura_lee_del_primario(self):
+        with con_replica():
+            response = self.vista(self.factory.post('/'))
+        self.assertEqual(response.content, b'False')
+
+
+@unittest.skipUnless(REPLICA_SQLITE, 'Requiere SQLITE_REPLICA_PATH (primario y réplica en dos archivos SQLite)')
+class ReplicaSqliteTests(TestCase):
+    """
+    Primario y réplica en archivos separados y sin replicación: lo escrito
+    en el primario no aparece en la réplica, así se ve de dónde lee cada vista
+    """
+
+    databases = {'default', REPLICA_ALIAS} if REPLICA_SQLITE else {'default'}
+
+    def setUp(self):
+        self.carrera = Carrera.objects.create(
+            nombre='Solo en el primario', codigo='PRIM', duracion_anios=1, titulo_otorgado='-'
+        )
+        self.usuario = get_user_model().objects.create_user(
+            username='replica', password='clave-de-prueba', rol='administrador',
+            debe_cambiar_password=False,
+        )
+
+    def test_consultas_dentro_del_bloque_van_a_la_replica(self):
+        self.assertTrue(Carrera.objects.filter(pk=self.carrera.pk).exists())
+        with usar_replica():
+            self.assertFalse(Carrera.objects.filter(pk=self.carrera.pk).exists())
+
+    def test_listado_lee_de_la_replica(self):
+        # force_login no pasa por el middleware: el usuario no queda fijado
+        self.client.force_login(self.usuario)
+        response = self.client.get('/carreras/')
+        self.assertNotIn(self.carrera, response.context['carreras'])
+
+    def test_despues_de_escribir_lee_del_primario(self):
+        # El login escribe (sesión, last_login) y fija al usuario al primario
+        response = self.client.post('/usuarios/login/', {
+            'username': self.usuario.username, 'password': 'clave-de-prueba',
+        })
+        self.assertIn(COOKIE_PRIMARIO, response.cookies)
+        self.assertEqual(self.client.get(f'/carreras/{self.carrera.pk}/').status_code, 200)
+
+        # Vencida la cookie, el detalle vuelve a leer de la réplica
+        del self.client.cookies[COOKIE_PRIMARIO]
+        self.assertEqual(self.client.get(f'/carreras/{self.carrera.pk}/').status_code, 404)
@@ -20,14 +20,18 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.views.generic import TemplateView
 
+from .metricas import metricas_view
+
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metrics', metricas_view, name='metricas'),
     path('', TemplateView.as_view(template_name='home.html'), name='home'),
     path('usuarios/', include('usuarios.urls')),
     path('carreras/', include('carreras.urls')),
     path('materias/', include('materias.urls')),
     path('alumnos/', include('alumnos.urls')),
     path('inscripciones/', include('inscripciones.urls')),
+    path('api/', include('api.urls')),
 ]
 
 # Servir archivos media en desarrollo
@@ -1,3 +1,15 @@
 from django.contrib import admin
+from .models import PeriodoLectivo, Preferencia
 
-# Register your models here.
+
+@admin.register(PeriodoLectivo)
+class PeriodoLectivoAdmin(admin.ModelAdmin):
+    list_display = ['__str__', 'fecha_inicio', 'fecha_fin', 'modo_asignacion', 'actual', 'cerrado']
+    list_filter = ['actual', 'cerrado', 'anio']
+
+
+@admin.register(Preferencia)
+class PreferenciaAdmin(admin.ModelAdmin):
+    list_display = ['alumno', 'materia', 'orden', 'estado', 'periodo']
+    list_filter = ['estado', 'periodo']
+    search_fields = ['alumno__apellido', 'alumno__numero_legajo', 'materia__nombre']
@@ -0,0 +1,287 @@
+"""
+Asignación por lote de inscripciones a partir de preferencias
+En los períodos con modo de asignación 'preferencias' los alumnos cargan
+sus materias ordenadas durante una ventana y, al cerrarla, el comando
+asignar_inscripciones reparte los cupos en una sola pasada en memoria:
+- se ordena a los alumnos por sorteo (con semilla) o por prioridad
+  (año de cursado, legajo o promedio), desempatando siempre por sorteo
+- por rondas, cada alumno recibe su siguiente preferencia que tenga cupo
+  y cumpla las mismas reglas de puede_inscribirse_a
+- las inscripciones se escriben con bulk_create en una transacción
+"""
+import random
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, Q
+
+from alumnos.models import Alumno, InscripcionCarrera
+from auditoria.eventos import registrar_muchos
+from carreras.catalogo import invalidar_carrera
+from gestion_academica.metricas import INSCRIPCIONES
+from integraciones.outbox import publicar_muchos
+from materias.cupos import notificar_cambio_cupo
+from materias.horarios import pares_superpuestos
+from materias.models import (
+    Comision, CorrelatividadTransitiva, Horario, INSCRIPCIONES_VIGENTES,
+    Materia, anotacion_cupo_total,
+)
+from .models import Inscripcion, InscripcionArchivada, Preferencia
+
+
+CRITERIOS = ['sorteo', 'anio', 'legajo', 'promedio']
+
+
+class AsignadorPreferencias:
+    """
+    Reparte los cupos de un período entre las preferencias cargadas
+    Todas las lecturas se hacen al principio con consultas masivas; la
+    asignación no toca la base hasta guardar.
+    """
+
+    def __init__(self, periodo, criterio='sorteo', semilla=None, maximo=None):
+        if criterio not in CRITERIOS:
+            raise ValueError(f'Criterio desconocido: {criterio}')
+        self.periodo = periodo
+        self.criterio = criterio
+        self.semilla = semilla
+        self.maximo = maximo
+        self.asignaciones = []
+        self.rechazos = defaultdict(int)
+
+    # ------------------------------------------------------------------
+    # Carga de datos
+    # ------------------------------------------------------------------
+
+    def cargar(self):
+        """Lee de la base todo lo necesario para asignar"""
+        self.preferencias = defaultdict(list)
+        for fila in Preferencia.objects.filter(
+            periodo=self.periodo, estado='pendiente'
+        ).order_by('alumno_id', 'orden').values('id', 'alumno_id', 'materia_id'):
+            self.preferencias[fila['alumno_id']].append((fila['id'], fila['materia_id']))
+
+        alumno_ids = list(self.preferencias)
+        materia_ids = {m for prefs in self.preferencias.values() for _, m in prefs}
+
+        self.alumnos = {
+            fila['id']: fila for fila in Alumno.objects.filter(pk__in=alumno_ids).values(
+                'id', 'activo', 'numero_legajo', 'fecha_ingreso'
+            )
+        }
+
+        # Carreras activas de cada alumno con la fecha de inscripción, para el año de cursado
+        hoy = date.today()
+        self.anio_por_carrera = defaultdict(dict)
+        for fila in InscripcionCarrera.objects.filter(
+            alumno_id__in=alumno_ids, activa=True
+        ).values('alumno_id', 'carrera_id', 'fecha_inscripcion'):
+            self.anio_por_carrera[fila['alumno_id']][fila['carrera_id']] = (
+                Alumno.anio_cursado_desde(fila['fecha_inscripcion'], hoy)
+            )
+
+        self.materias = {
+            fila['id']: fila for fila in Materia.objects.filter(pk__in=materia_ids).annotate(
+                inscriptos=Count('inscripciones', filter=INSCRIPCIONES_VIGENTES),
+                cupo_total=anotacion_cupo_total(),
+            ).values('id', 'carrera_id', 'anio_cursado', 'activa', 'inscriptos', 'cupo_total')
+        }
+        self.libres = {
+            materia_id: fila['cupo_total'] - fila['inscriptos']
+            for materia_id, fila in self.materias.items()
+        }
+
+        # Inscripciones del período actual: activas (cursando) e inactivas (se reactivan)
+        self.cursando = defaultdict(set)
+        self.inactivas = {}
+        for fila in Inscripcion.objects.filter(alumno_id__in=alumno_ids).values(
+            'id', 'alumno_id', 'materia_id', 'activa'
+        ):
+            if fila['activa']:
+                self.cursando[fila['alumno_id']].add(fila['materia_id'])
+            else:
+                self.inactivas[(fila['alumno_id'], fila['materia_id'])] = fila['id']
+
+        # Materias aprobadas (vigentes y archivadas) con su nota, para
+        # correlatividades y promedio
+        self.aprobadas = defaultdict(set)
+        self.notas = defaultdict(list)
+        for modelo in (Inscripcion.historico, InscripcionArchivada.objects):
+            for alumno_id, materia_id, nota in modelo.filter(
+                alumno_id__in=alumno_ids, estado='aprobado'
+            ).values_list('alumno_id', 'materia_id', 'nota_final'):
+                self.aprobadas[alumno_id].add(materia_id)
+                if nota is not None:
+                    self.notas[alumno_id].append(nota)
+
+        self.requisitos = defaultdict(set)
+        for materia_id, requisito_id in CorrelatividadTransitiva.objects.filter(
+            materia_id__in=materia_ids
+        ).values_list('materia_id', 'requisito_id'):
+            self.requisitos[materia_id].add(requisito_id)
+
+        # Superposiciones entre las materias pedidas y las que ya se cursan
+        materias_horario = materia_ids.union(*self.cursando.values())
+        self.conflictos = defaultdict(set)
+        for materia_a, materia_b in pares_superpuestos(
+            Horario.objects.filter(materia_id__in=materias_horario).values(
+                'materia_id', 'materia__cuatrimestre', 'dia', 'hora_inicio', 'hora_fin'
+            )
+        ):
+            self.conflictos[materia_a].add(materia_b)
+            self.conflictos[materia_b].add(materia_a)
+
+        # Ocupación de las comisiones para repartir como el motor en línea
+        self.comisiones = defaultdict(list)
+        for fila in Comision.objects.filter(materia_id__in=materia_ids, activa=True).annotate(
+            inscriptos=Count('inscripciones', filter=Q(
+                inscripciones__activa=True, inscripciones__periodo__actual=True
+            ))
+        ).order_by('pk').values('id', 'materia_id', 'cupo_maximo', 'inscriptos'):
+            self.comisiones[fila['materia_id']].append(fila)
+
+    # ------------------------------------------------------------------
+    # Asignación
+    # ------------------------------------------------------------------
+
+    def ordenar_alumnos(self):
+        """Orden de prioridad de los alumnos; el sorteo con semilla desempata"""
+        alumno_ids = sorted(self.alumnos)
+        sorteo = random.Random(self.semilla)
+        sorteo.shuffle(alumno_ids)
+        posicion = {alumno_id: i for i, alumno_id in enumerate(alumno_ids)}
+
+        if self.criterio == 'sorteo':
+            return alumno_ids
+        if self.criterio == 'anio':
+            hoy = date.today()
+            clave = lambda a: -Alumno.anio_cursado_desde(self.alumnos[a]['fecha_ingreso'], hoy)
+        elif self.criterio == 'legajo':
+            clave = lambda a: self.alumnos[a]['numero_legajo']
+        else:
+            def clave(a):
+                notas = self.notas.get(a)
+                return -(sum(notas) / len(notas)) if notas else Decimal(0)
+        return sorted(alumno_ids, key=lambda a: (clave(a), posicion[a]))
+
+    def _motivo_rechazo(self, alumno_id, materia_id):
+        """Mismas reglas que Alumno.puede_inscribirse_a, evaluadas en memoria"""
+        materia = self.materias.get(materia_id)
+        if materia is None or not materia['activa']:
+            return 'materia_inactiva'
+        if not self.alumnos[alumno_id]['activo']:
+            return 'alumno_inactivo'
+        anio_alumno = self.anio_por_carrera[alumno_id].get(materia['carrera_id'])
+        if anio_alumno is None:
+            return 'fuera_de_carrera'
+        cursando = self.cursando[alumno_id]
+        if materia_id in cursando:
+            return 'ya_inscripto'
+        if materia['anio_cursado'] > anio_alumno:
+            return 'anio'
+        if self.requisitos[materia_id] - self.aprobadas[alumno_id]:
+            return 'correlativas'
+        if self.conflictos[materia_id] & cursando:
+            return 'horario'
+        if self.libres[materia_id] <= 0:
+            return 'sin_cupo'
+        return None
+
+    def _elegir_comision(self, materia_id):
+        """Comisión menos ocupada con lugar, igual que Materia.elegir_comision"""
+        libres = [c for c in self.comisiones.get(materia_id, ()) if c['inscriptos'] < c['cupo_maximo']]
+        if not libres:
+            return None
+        comision = min(libres, key=lambda c: (c['inscriptos'] / c['cupo_maximo'], c['inscriptos'], c['id']))
+        comision['inscriptos'] += 1
+        return comision['id']
+
+    def asignar(self):
+        """
+        Rondas de asignación: en cada ronda, cada alumno (en orden de
+        prioridad) recibe su siguiente preferencia posible
+        """
+        orden = self.ordenar_alumnos()
+        pendientes = {a: list(self.preferencias[a]) for a in orden}
+        asignadas = defaultdict(int)
+        self.resultado = {}
+
+        while any(pendientes.values()):
+            for alumno_id in orden:
+                if self.maximo and asignadas[alumno_id] >= self.maximo:
+                    for preferencia_id, _ in pendientes[alumno_id]:
+                        self.rechazos['maximo'] += 1
+                        self.resultado[preferencia_id] = 'sin_asignar'
+                    pendientes[alumno_id] = []
+                while pendientes[alumno_id]:
+                    preferencia_id, materia_id = pendientes[alumno_id].pop(0)
+                    motivo = self._motivo_rechazo(alumno_id, materia_id)
+                    if motivo:
+                        self.rechazos[motivo] += 1
+                        self.resultado[preferencia_id] = 'sin_asignar'
+                        continue
+                    self.libres[materia_id] -= 1
+                    self.cursando[alumno_id].add(materia_id)
+                    asignadas[alumno_id] += 1
+                    self.resultado[preferencia_id] = 'asignada'
+                    self.asignaciones.append(
+                        (alumno_id, materia_id, self._elegir_comision(materia_id))
+                    )
+                    break
+        return self.asignaciones
+
+    # ------------------------------------------------------------------
+    # Escritura
+    # ------------------------------------------------------------------
+
+    def guardar(self):
+        """Escribe las inscripciones y el estado de las preferencias en una transacción"""
+        nuevas = []
+        reactivadas = []
+        for alumno_id, materia_id, comision_id in self.asignaciones:
+            inscripcion_id = self.inactivas.get((alumno_id, materia_id))
+            if inscripcion_id:
+                reactivadas.append(Inscripcion(
+                    pk=inscripcion_id, alumno_id=alumno_id, materia_id=materia_id, periodo=self.periodo,
+                    activa=True, estado='inscripto',
+                    fecha_baja=None, motivo_baja='', comision_id=comision_id,
+                ))
+            else:
+                nuevas.append(Inscripcion(
+                    alumno_id=alumno_id, materia_id=materia_id, periodo=self.periodo,
+                    comision_id=comision_id, estado='inscripto', activa=True,
+                ))
+
+        preferencias = [
+            Preferencia(pk=preferencia_id, estado=estado)
+            for preferencia_id, estado in self.resultado.items()
+        ]
+
+        with transaction.atomic():
+            Inscripcion.objects.bulk_create(nuevas, batch_size=500)
+            Inscripcion.historico.bulk_update(
+                reactivadas,
+                ['activa', 'estado', 'fecha_baja', 'motivo_baja', 'comision'],
+                batch_size=500,
+            )
+            Preferencia.objects.bulk_update(preferencias, ['estado'], batch_size=500)
+            registrar_muchos('inscripcion', [
+                (i.pk, 'alta', {'alumno': i.alumno_id, 'materia': i.materia_id,
+                                'comision': i.comision_id, 'origen': 'asignacion'})
+                for i in nuevas
+            ] + [(i.pk, 'reactivar', {'estado': i.estado, 'origen': 'asignacion'}) for i in reactivadas])
+            publicar_muchos(
+                [('inscripcion.alta', i.pk, i.datos_integracion()) for i in nuevas]
+                + [('inscripcion.reactivar', i.pk, i.datos_integracion()) for i in reactivadas]
+            )
+
+            # bulk_create no pasa por save(): se avisa una vez por materia y carrera
+            materia_ids = {materia_id for _, materia_id, _ in self.asignaciones}
+            carrera_ids = {self.materias[m]['carrera_id'] for m in materia_ids}
+            transaction.on_commit(lambda: [invalidar_carrera(c) for c in carrera_ids])
+            transaction.on_commit(lambda: [notificar_cambio_cupo(m) for m in materia_ids])
+            transaction.on_commit(lambda: INSCRIPCIONES.inc(len(nuevas), origen='asignacion'))
+
+        return len(nuevas), len(reactivadas)
@@ -38,3 +38,44 @@ class InscripcionForm(forms.ModelForm):
         self.fields['alumno'].empty_label = '---------'
         self.fields['materia'].label = 'Materia'
         self.fields['materia'].empty_label = 'Selecciona un alumno primero'
+
+
+class PreferenciasForm(forms.Form):
+    """
+    Formulario de preferencias: un campo de orden por materia disponible
+    Las materias sin orden no se solicitan
+    """
+    
+    def __init__(self, materias, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.materias = list(materias)
+        for materia in self.materias:
+            self.fields[f'materia_{materia.pk}'] = forms.IntegerField(
+                required=False,
+                min_value=1,
+                max_value=len(self.materias),
+                label=materia.nombre,
+                widget=forms.NumberInput(attrs={
+                    'class': 'form-control form-control-sm',
+                    'style': 'width: 5rem;',
+                })
+            )
+    
+    def campos_por_materia(self):
+        """Pares (materia, campo) para recorrer en el template"""
+        return [(materia, self[f'materia_{materia.pk}']) for materia in self.materias]
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        elegidas = [
+            (orden, materia.pk) for materia in self.materias
+            if (orden := cleaned_data.get(f'materia_{materia.pk}'))
+        ]
+        ordenes = [orden for orden, _ in elegidas]
+        if len(ordenes) != len(set(ordenes)):
+            raise forms.ValidationError('Cada materia debe tener un número de orden distinto.')
+        # Se renumeran de 1 en adelante respetando el orden indicado
+        cleaned_data['preferencias'] = [
+            materia_id for _, materia_id in sorted(elegidas)
+        ]
+        return cleaned_data
@@ -0,0 +1,82 @@
+"""
+Comando para archivar inscripciones dadas de baja
+Uso: python manage.py archivar_inscripciones --dias 365 --lote 1000
+
+Mueve a las tablas de archivo las inscripciones a materias en estado
+'baja' y las inscripciones a carreras inactivas cuya fecha de baja sea
+anterior al corte. Cada lote se copia y se borra en su propia transacción;
+si el proceso se interrumpe, volver a ejecutarlo continúa desde donde quedó.
+Los registros archivados se consultan con el método con_archivo() de los
+managers de Inscripcion e InscripcionCarrera.
+"""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from alumnos.models import InscripcionCarrera, InscripcionCarreraArchivada
+from inscripciones.models import Inscripcion, InscripcionArchivada
+
+
+class Command(BaseCommand):
+    help = 'Mueve al archivo las inscripciones dadas de baja antes de un corte'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, default=365,
+                            help='Antigüedad mínima de la baja, en días')
+        parser.add_argument('--lote', type=int, default=1000,
+                            help='Registros movidos por transacción')
+        parser.add_argument('--simular', action='store_true',
+                            help='Solo informa cuántos registros se archivarían')
+
+    def handle(self, *args, **options):
+        corte = timezone.now() - timedelta(days=options['dias'])
+
+        tablas = [
+            (
+                'Inscripciones a materias',
+                Inscripcion.historico.filter(
+                    activa=False, estado='baja', fecha_baja__lt=corte
+                ),
+                InscripcionArchivada,
+            ),
+            (
+                'Inscripciones a carreras',
+                InscripcionCarrera.objects.filter(
+                    activa=False, fecha_baja__lt=corte.date()
+                ),
+                InscripcionCarreraArchivada,
+            ),
+        ]
+
+        self.stdout.write(f'Archivando bajas anteriores al {corte:%d/%m/%Y}')
+        for nombre, queryset, modelo_archivo in tablas:
+            if options['simular']:
+                self.stdout.write(f'   {nombre}: {queryset.count()} a archivar')
+                continue
+            total = self._archivar(queryset, modelo_archivo, options['lote'])
+            self.stdout.write(
+                self.style.SUCCESS(f'✅ {nombre}: {total} archivadas')
+            )
+
+    def _archivar(self, queryset, modelo_archivo, tamanio):
+        """Mueve los registros del queryset al archivo, de a un lote por vez"""
+        total = 0
+        while True:
+            with transaction.atomic():
+                filas = list(
+                    queryset.order_by('pk')
+                    .values('id', *modelo_archivo.CAMPOS_COPIADOS)[:tamanio]
+                )
+                if not filas:
+                    return total
+                modelo_archivo.objects.bulk_create(
+                    [modelo_archivo.desde_inscripcion(fila) for fila in filas],
+                    ignore_conflicts=True
+                )
+                # Borrado directo por pk: las bajas no ocupan cupo, no hay
+                # nada que notificar
+                queryset.model._base_manager.filter(
+                    pk__in=[fila['id'] for fila in filas]
+                ).delete()
+            total += len(filas)
@@ -0,0 +1,72 @@
+"""
+Comando para asignar las inscripciones de un período por preferencias
+Uso: python manage.py asignar_inscripciones --criterio sorteo --semilla 2025
+
+Se ejecuta una vez cerrada la ventana de preferencias del período actual.
+Con la misma semilla el resultado es reproducible, lo que permite auditar
+el sorteo. Con --simular se muestra el resultado sin escribir nada.
+"""
+import secrets
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from inscripciones.asignacion import AsignadorPreferencias, CRITERIOS
+from inscripciones.models import PeriodoLectivo
+
+
+class Command(BaseCommand):
+    help = 'Asigna por lote las inscripciones del período actual según las preferencias cargadas'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--criterio', choices=CRITERIOS, default='sorteo',
+                            help='Prioridad entre alumnos (el sorteo desempata)')
+        parser.add_argument('--semilla', type=int,
+                            help='Semilla del sorteo (por defecto, una al azar que se informa)')
+        parser.add_argument('--maximo', type=int,
+                            help='Máximo de materias asignadas por alumno')
+        parser.add_argument('--simular', action='store_true',
+                            help='Calcula la asignación sin guardarla')
+        parser.add_argument('--forzar', action='store_true',
+                            help='Ejecuta aunque la ventana de preferencias siga abierta')
+
+    def handle(self, *args, **options):
+        periodo = PeriodoLectivo.get_actual()
+        if periodo is None:
+            raise CommandError('No hay un período lectivo actual definido')
+        if not periodo.asigna_por_preferencias():
+            raise CommandError(f'El período {periodo} asigna por orden de llegada')
+        if periodo.fin_preferencias > timezone.now() and not options['forzar']:
+            raise CommandError('La ventana de preferencias sigue abierta (use --forzar)')
+
+        semilla = options['semilla']
+        if semilla is None:
+            semilla = secrets.randbits(32)
+
+        asignador = AsignadorPreferencias(
+            periodo, criterio=options['criterio'], semilla=semilla, maximo=options['maximo']
+        )
+
+        inicio = time.perf_counter()
+        asignador.cargar()
+        carga = time.perf_counter() - inicio
+        asignaciones = asignador.asignar()
+        calculo = time.perf_counter() - inicio - carga
+
+        self.stdout.write(f'Período:      {periodo}')
+        self.stdout.write(f'Criterio:     {options["criterio"]} (semilla {semilla})')
+        self.stdout.write(f'Alumnos:      {len(asignador.alumnos)}')
+        self.stdout.write(f'Preferencias: {len(asignador.resultado)}')
+        self.stdout.write(f'Asignadas:    {len(asignaciones)}')
+        for motivo, cantidad in sorted(asignador.rechazos.items()):
+            self.stdout.write(f'   sin asignar por {motivo}: {cantidad}')
+        self.stdout.write(f'Carga: {carga * 1000:.0f} ms, cálculo: {calculo * 1000:.0f} ms')
+
+        if options['simular']:
+            self.stdout.write(self.style.WARNING('Simulación: no se guardó ningún cambio.'))
+            return
+
+        nuevas, reactivadas = asignador.guardar()
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {nuevas} inscripciones creadas y {reactivadas} reactivadas.'
+        ))
@@ -0,0 +1,122 @@
+"""
+Comando para medir la contención de escritura en SQLite
+Uso: python manage.py benchmark_sqlite --procesos 8 --inscripciones 200
+
+Simula el día de inscripción: varios procesos (como workers de gunicorn)
+verifican el cupo y crean inscripciones sobre el mismo archivo SQLite.
+Compara la configuración por defecto de Django (rollback journal,
+transacciones diferidas) con el perfil de producción del proyecto.
+Trabaja sobre archivos temporales, nunca sobre la base del proyecto.
+"""
+import sqlite3
+import statistics
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from gestion_academica.database_config import pragmas_sqlite_produccion
+
+
+CUPO_MAXIMO = 1000000  # El benchmark mide contención, no el límite de cupo
+MATERIAS = 10
+
+
+def conectar(ruta, perfil):
+    """Abre una conexión con la misma configuración que usaría Django"""
+    if perfil == 'produccion':
+        conexion = sqlite3.connect(ruta, timeout=5, isolation_level=None)
+        for pragma in pragmas_sqlite_produccion():
+            conexion.execute(pragma)
+        return conexion, 'BEGIN IMMEDIATE'
+    # Configuración por defecto de Django: transacciones diferidas
+    return sqlite3.connect(ruta, timeout=5, isolation_level=None), 'BEGIN'
+
+
+def preparar_base(ruta, perfil):
+    conexion, _ = conectar(ruta, perfil)
+    conexion.executescript('''
+        CREATE TABLE inscripcion (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            alumno_id INTEGER NOT NULL,
+            materia_id INTEGER NOT NULL,
+            activa BOOLEAN NOT NULL
+        );
+        CREATE INDEX inscripcion_materia ON inscripcion (materia_id, activa);
+    ''')
+    conexion.close()
+
+
+def inscribir(ruta, perfil, proceso, cantidad):
+    """Worker: verifica cupo e inscribe 'cantidad' veces en transacciones separadas"""
+    conexion, begin = conectar(ruta, perfil)
+    latencias = []
+    errores = 0
+    for i in range(cantidad):
+        materia_id = (proceso + i) % MATERIAS
+        inicio = time.perf_counter()
+        try:
+            conexion.execute(begin)
+            inscriptos = conexion.execute(
+                'SELECT COUNT(*) FROM inscripcion WHERE materia_id = ? AND activa = 1', (materia_id,)
+            ).fetchone()[0]
+            if inscriptos < CUPO_MAXIMO:
+                conexion.execute(
+                    'INSERT INTO inscripcion (alumno_id, materia_id, activa) VALUES (?, ?, 1)',
+                    (proceso * cantidad + i, materia_id),
+                )
+            conexion.execute('COMMIT')
+            latencias.append(time.perf_counter() - inicio)
+        except sqlite3.OperationalError:
+            errores += 1
+            if conexion.in_transaction:
+                conexion.execute('ROLLBACK')
+    conexion.close()
+    return latencias, errores
+
+
+class Command(BaseCommand):
+    help = 'Compara la contención de escritura de SQLite con y sin el perfil de producción'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--procesos', type=int, default=8,
+                            help='Procesos escribiendo en paralelo (por defecto 8)')
+        parser.add_argument('--inscripciones', type=int, default=200,
+                            help='Inscripciones por proceso (por defecto 200)')
+
+    def handle(self, *args, **options):
+        procesos = options['procesos']
+        cantidad = options['inscripciones']
+
+        self.stdout.write(self.style.SUCCESS('=' * 70))
+        self.stdout.write(self.style.SUCCESS(
+            f'   BENCHMARK SQLITE - {procesos} procesos x {cantidad} inscripciones'
+        ))
+        self.stdout.write(self.style.SUCCESS('=' * 70))
+
+        for perfil in ('django por defecto', 'produccion'):
+            with tempfile.TemporaryDirectory() as directorio:
+                ruta = str(Path(directorio) / 'benchmark.sqlite3')
+                preparar_base(ruta, perfil)
+
+                inicio = time.perf_counter()
+                with ProcessPoolExecutor(max_workers=procesos) as pool:
+                    resultados = list(pool.map(
+                        inscribir, [ruta] * procesos, [perfil] * procesos,
+                        range(procesos), [cantidad] * procesos,
+                    ))
+                duracion = time.perf_counter() - inicio
+
+            latencias = sorted(l for resultado in resultados for l in resultado[0])
+            errores = sum(resultado[1] for resultado in resultados)
+            total = procesos * cantidad
+            p95 = latencias[int(len(latencias) * 0.95) - 1] * 1000 if latencias else 0
+            media = statistics.mean(latencias) * 1000 if latencias else 0
+
+            self.stdout.write(
+                f'   {perfil:<20} {len(latencias) / duracion:8.1f} insc/s   '
+                f'media {media:7.2f} ms   p95 {p95:7.2f} ms   '
+                f'"database is locked" {errores}/{total}'
+            )
@@ -0,0 +1,71 @@
+"""
+Comando para cerrar un período lectivo y archivar sus inscripciones
+Uso: python manage.py cerrar_periodo 2025 --cuatrimestre 2 --lote 1000
+
+Marca el período como cerrado y mueve sus inscripciones a la tabla de
+archivo en lotes, cada uno en su propia transacción, para no bloquear la
+base durante todo el proceso. Si se interrumpe, volver a ejecutarlo
+continúa desde donde quedó.
+"""
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from inscripciones.models import Inscripcion, InscripcionArchivada, PeriodoLectivo
+
+
+class Command(BaseCommand):
+    help = 'Cierra un período lectivo y mueve sus inscripciones al archivo'
+
+    def add_arguments(self, parser):
+        parser.add_argument('anio', type=int,
+                            help='Año del período a cerrar')
+        parser.add_argument('--cuatrimestre', type=int, default=0,
+                            help='Cuatrimestre del período (0 = ciclo anual)')
+        parser.add_argument('--lote', type=int, default=1000,
+                            help='Inscripciones movidas por transacción')
+
+    def handle(self, *args, **options):
+        try:
+            periodo = PeriodoLectivo.objects.get(
+                anio=options['anio'], cuatrimestre=options['cuatrimestre']
+            )
+        except PeriodoLectivo.DoesNotExist:
+            raise CommandError('No existe el período lectivo indicado')
+
+        if not periodo.cerrado:
+            try:
+                periodo.cerrar()
+            except ValidationError as e:
+                raise CommandError(e.messages[0])
+            self.stdout.write(f'Período {periodo} cerrado.')
+
+        total = 0
+        while True:
+            movidas = self._archivar_lote(periodo, options['lote'])
+            if not movidas:
+                break
+            total += movidas
+            self.stdout.write(f'   {total} inscripciones archivadas...')
+
+        self.stdout.write(
+            self.style.SUCCESS(f'✅ {total} inscripciones de {periodo} archivadas.')
+        )
+
+    def _archivar_lote(self, periodo, tamanio):
+        """Copia un lote al archivo y lo borra de la tabla de inscripciones"""
+        with transaction.atomic():
+            filas = list(
+                Inscripcion.historico.por_periodo(periodo)
+                .order_by('pk')
+                .values('id', *InscripcionArchivada.CAMPOS_COPIADOS)[:tamanio]
+            )
+            if not filas:
+                return 0
+            InscripcionArchivada.objects.bulk_create(
+                [InscripcionArchivada.desde_inscripcion(fila) for fila in filas],
+                ignore_conflicts=True
+            )
+            # Borrado directo por pk: el período está cerrado, no hay cupos
+            # ni fragmentos que notificar
+            Inscripcion.historico.filter(pk__in=[fila['id'] for fila in filas]).delete()
+            return len(filas)
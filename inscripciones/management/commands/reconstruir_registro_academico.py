@@ -0,0 +1,39 @@
+"""
+Comando para reconstruir el registro académico de los alumnos
+Uso: python manage.py reconstruir_registro_academico [--alumno ID] [--lote 500]
+
+Los acumulados (materias aprobadas, promedio, carga horaria) se mantienen
+solos cuando cambian las calificaciones desde la aplicación; este comando
+los recalcula desde las inscripciones vigentes y archivadas, por ejemplo
+después de cargas masivas, restauraciones o la primera puesta en marcha.
+"""
+from django.core.management.base import BaseCommand
+from alumnos.models import Alumno
+from inscripciones.registro import reconstruir_registros
+
+
+class Command(BaseCommand):
+    help = 'Recalcula los registros académicos desde las inscripciones aprobadas'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--alumno', type=int, action='append',
+                            help='ID del alumno (se puede repetir; por defecto, todos)')
+        parser.add_argument('--lote', type=int, default=500,
+                            help='Alumnos recalculados por transacción')
+
+    def handle(self, *args, **options):
+        if options['alumno']:
+            lotes = [options['alumno']]
+        else:
+            alumno_ids = list(Alumno.objects.order_by('pk').values_list('pk', flat=True))
+            lotes = [
+                alumno_ids[i:i + options['lote']]
+                for i in range(0, len(alumno_ids), options['lote'])
+            ]
+
+        total = 0
+        for lote in lotes:
+            total += reconstruir_registros(lote)
+            self.stdout.write(f'   {total} registros escritos')
+
+        self.stdout.write(self.style.SUCCESS('✅ Registro académico reconstruido.'))
@@ -0,0 +1,104 @@
+# Generated by Django 5.2.6 on 2026-10-19
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def crear_periodo_inicial(apps, schema_editor):
+    """
+    Crea el ciclo lectivo del año en curso como período actual y le asigna
+    todas las inscripciones existentes
+    """
+    PeriodoLectivo = apps.get_model('inscripciones', 'PeriodoLectivo')
+    Inscripcion = apps.get_model('inscripciones', 'Inscripcion')
+    anio = timezone.localdate().year
+    periodo, _ = PeriodoLectivo.objects.get_or_create(
+        anio=anio,
+        cuatrimestre=0,
+        defaults={
+            'fecha_inicio': f'{anio}-03-01',
+            'fecha_fin': f'{anio}-12-31',
+            'actual': True,
+        }
+    )
+    Inscripcion.objects.filter(periodo__isnull=True).update(periodo=periodo)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alumnos', '0003_remove_alumno_carrera_inscripcioncarrera_and_more'),
+        ('inscripciones', '0001_initial'),
+        ('materias', '0002_materia_docente'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PeriodoLectivo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('anio', models.PositiveIntegerField(verbose_name='Año')),
+                ('cuatrimestre', models.IntegerField(choices=[(1, 'Primer Cuatrimestre'), (2, 'Segundo Cuatrimestre'), (0, 'Ciclo Anual')], default=0, verbose_name='Cuatrimestre')),
+                ('fecha_inicio', models.DateField(verbose_name='Fecha de Inicio')),
+                ('fecha_fin', models.DateField(verbose_name='Fecha de Fin')),
+                ('actual', models.BooleanField(default=False, verbose_name='Período Actual')),
+                ('cerrado', models.BooleanField(default=False, verbose_name='Cerrado')),
+                ('fecha_cierre', models.DateTimeField(blank=True, null=True, verbose_name='Fecha de Cierre')),
+            ],
+            options={
+                'verbose_name': 'Período Lectivo',
+                'verbose_name_plural': 'Períodos Lectivos',
+                'ordering': ['-anio', '-cuatrimestre'],
+                'unique_together': {('anio', 'cuatrimestre')},
+                'constraints': [models.UniqueConstraint(condition=models.Q(('actual', True)), fields=('actual',), name='periodo_lectivo_actual_unico')],
+            },
+        ),
+        migrations.AddField(
+            model_name='inscripcion',
+            name='periodo',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='inscripciones', to='inscripciones.periodolectivo', verbose_name='Período Lectivo'),
+        ),
+        migrations.RunPython(crear_periodo_inicial, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='inscripcion',
+            name='periodo',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='inscripciones', to='inscripciones.periodolectivo', verbose_name='Período Lectivo'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='inscripcion',
+            unique_together={('periodo', 'alumno', 'materia')},
+        ),
+        migrations.AddIndex(
+            model_name='inscripcion',
+            index=models.Index(fields=['periodo', 'materia', 'activa'], name='insc_periodo_materia_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inscripcion',
+            index=models.Index(fields=['periodo', '-fecha_inscripcion'], name='insc_periodo_fecha_idx'),
+        ),
+        migrations.CreateModel(
+            name='InscripcionArchivada',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('inscripcion_id', models.BigIntegerField(unique=True, verbose_name='ID de Inscripción Original')),
+                ('fecha_inscripcion', models.DateTimeField(verbose_name='Fecha de Inscripción')),
+                ('estado', models.CharField(choices=[('inscripto', 'Inscripto'), ('cursando', 'Cursando'), ('aprobado', 'Aprobado'), ('desaprobado', 'Desaprobado'), ('abandono', 'Abandono'), ('baja', 'Baja')], max_length=15, verbose_name='Estado')),
+                ('activa', models.BooleanField(verbose_name='Inscripción Activa')),
+                ('nota_final', models.DecimalField(blank=True, decimal_places=2, max_digits=4, null=True, verbose_name='Nota Final')),
+                ('observaciones', models.TextField(blank=True, verbose_name='Observaciones')),
+                ('fecha_baja', models.DateTimeField(blank=True, null=True, verbose_name='Fecha de Baja')),
+                ('motivo_baja', models.CharField(blank=True, max_length=100, verbose_name='Motivo de Baja')),
+                ('fecha_archivo', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Archivo')),
+                ('alumno', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inscripciones_archivadas', to='alumnos.alumno', verbose_name='Alumno')),
+                ('materia', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inscripciones_archivadas', to='materias.materia', verbose_name='Materia')),
+                ('periodo', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='inscripciones_archivadas', to='inscripciones.periodolectivo', verbose_name='Período Lectivo')),
+            ],
+            options={
+                'verbose_name': 'Inscripción Archivada',
+                'verbose_name_plural': 'Inscripciones Archivadas',
+                'ordering': ['-fecha_inscripcion'],
+                'indexes': [models.Index(fields=['periodo', 'alumno'], name='insc_arch_periodo_alumno_idx')],
+            },
+        ),
+    ]
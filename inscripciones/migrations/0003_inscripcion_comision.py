@@ -0,0 +1,20 @@
+# Generated by Django 5.2.6 on 2026-10-19 12:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inscripciones', '0002_periodo_lectivo'),
+        ('materias', '0005_comision'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inscripcion',
+            name='comision',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='inscripciones', to='materias.comision', verbose_name='Comisión'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.6 on 2026-10-19 12:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alumnos', '0004_inscripcion_carrera_archivada'),
+        ('inscripciones', '0003_inscripcion_comision'),
+        ('materias', '0005_comision'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='periodolectivo',
+            name='fin_preferencias',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Fin de Carga de Preferencias'),
+        ),
+        migrations.AddField(
+            model_name='periodolectivo',
+            name='inicio_preferencias',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Inicio de Carga de Preferencias'),
+        ),
+        migrations.AddField(
+            model_name='periodolectivo',
+            name='modo_asignacion',
+            field=models.CharField(choices=[('orden_llegada', 'Por orden de llegada'), ('preferencias', 'Por preferencias (sorteo o prioridad)')], default='orden_llegada', max_length=15, verbose_name='Modo de Asignación'),
+        ),
+        migrations.CreateModel(
+            name='Preferencia',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('orden', models.PositiveSmallIntegerField(verbose_name='Orden de Preferencia')),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('asignada', 'Asignada'), ('sin_asignar', 'Sin Asignar')], default='pendiente', max_length=15, verbose_name='Estado')),
+                ('fecha', models.DateTimeField(auto_now=True, verbose_name='Fecha')),
+                ('alumno', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='preferencias', to='alumnos.alumno', verbose_name='Alumno')),
+                ('materia', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='preferencias', to='materias.materia', verbose_name='Materia')),
+                ('periodo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='preferencias', to='inscripciones.periodolectivo', verbose_name='Período Lectivo')),
+            ],
+            options={
+                'verbose_name': 'Preferencia',
+                'verbose_name_plural': 'Preferencias',
+                'ordering': ['alumno', 'orden'],
+                'unique_together': {('periodo', 'alumno', 'materia'), ('periodo', 'alumno', 'orden')},
+            },
+        ),
+    ]
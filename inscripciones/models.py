@@ -1,16 +1,222 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Q
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.urls import reverse
+from django.utils import timezone
 from alumnos.models import Alumno
-from materias.models import Materia
+from auditoria.eventos import registrar as registrar_auditoria
+from integraciones.outbox import publicar
+from materias.models import Comision, Materia
+from materias.cupos import notificar_cambio_cupo
+from carreras.catalogo import invalidar_carrera
+from gestion_academica.metricas import INSCRIPCIONES
+from .registro import registrar_calificaciones
+
+
+PERIODO_ACTUAL_KEY = 'inscripciones:periodo_actual'
+
+# Segundos que cada proceso puede seguir usando el período actual cacheado
+# si el cambio se hizo desde otro proceso con un caché no compartido
+PERIODO_ACTUAL_TIMEOUT = 60
+
+
+class PeriodoLectivo(models.Model):
+    """
+    Período lectivo (ciclo anual o cuatrimestre) al que pertenecen las
+    inscripciones a materias. Solo uno puede estar marcado como actual.
+    """
+    
+    CUATRIMESTRE_CHOICES = [
+        (1, 'Primer Cuatrimestre'),
+        (2, 'Segundo Cuatrimestre'),
+        (0, 'Ciclo Anual'),
+    ]
+    
+    anio = models.PositiveIntegerField(
+        verbose_name='Año'
+    )
+    
+    cuatrimestre = models.IntegerField(
+        choices=CUATRIMESTRE_CHOICES,
+        default=0,
+        verbose_name='Cuatrimestre'
+    )
+    
+    fecha_inicio = models.DateField(
+        verbose_name='Fecha de Inicio'
+    )
+    
+    fecha_fin = models.DateField(
+        verbose_name='Fecha de Fin'
+    )
+    
+    actual = models.BooleanField(
+        default=False,
+        verbose_name='Período Actual'
+    )
+    
+    cerrado = models.BooleanField(
+        default=False,
+        verbose_name='Cerrado'
+    )
+    
+    fecha_cierre = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Fecha de Cierre'
+    )
+    
+    MODO_ASIGNACION_CHOICES = [
+        ('orden_llegada', 'Por orden de llegada'),
+        ('preferencias', 'Por preferencias (sorteo o prioridad)'),
+    ]
+    
+    modo_asignacion = models.CharField(
+        max_length=15,
+        choices=MODO_ASIGNACION_CHOICES,
+        default='orden_llegada',
+        verbose_name='Modo de Asignación'
+    )
+    
+    inicio_preferencias = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Inicio de Carga de Preferencias'
+    )
+    
+    fin_preferencias = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Fin de Carga de Preferencias'
+    )
+    
+    class Meta:
+        verbose_name = 'Período Lectivo'
+        verbose_name_plural = 'Períodos Lectivos'
+        unique_together = ['anio', 'cuatrimestre']
+        ordering = ['-anio', '-cuatrimestre']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['actual'],
+                condition=Q(actual=True),
+                name='periodo_lectivo_actual_unico'
+            ),
+        ]
+    
+    def __str__(self):
+        if self.cuatrimestre == 0:
+            return f"Ciclo Lectivo {self.anio}"
+        return f"{self.anio} - {self.cuatrimestre}° Cuatrimestre"
+    
+    def clean(self):
+        """Validaciones del período"""
+        if self.fecha_inicio and self.fecha_fin and self.fecha_fin < self.fecha_inicio:
+            raise ValidationError('La fecha de fin debe ser posterior a la de inicio')
+        if self.actual and self.cerrado:
+            raise ValidationError('El período actual no puede estar cerrado')
+        if self.modo_asignacion == 'preferencias' and not (
+            self.inicio_preferencias and self.fin_preferencias
+        ):
+            raise ValidationError('Indique la ventana de carga de preferencias')
+    
+    def save(self, *args, **kwargs):
+        """Guarda el período e invalida el período actual cacheado"""
+        super().save(*args, **kwargs)
+        transaction.on_commit(lambda: cache.delete(PERIODO_ACTUAL_KEY))
+    
+    @classmethod
+    def get_actual_id(cls):
+        """
+        Retorna el id del período actual, cacheado para no agregar una
+        consulta a cada queryset de inscripciones
+        """
+        periodo_id = cache.get(PERIODO_ACTUAL_KEY)
+        if periodo_id is None:
+            periodo_id = cls.objects.filter(actual=True).values_list('pk', flat=True).first()
+            if periodo_id is not None:
+                cache.set(PERIODO_ACTUAL_KEY, periodo_id, PERIODO_ACTUAL_TIMEOUT)
+        return periodo_id
+    
+    @classmethod
+    def get_actual(cls):
+        """Retorna el período actual o None si no hay ninguno definido"""
+        return cls.objects.filter(actual=True).first()
+    
+    def asigna_por_preferencias(self):
+        """Verifica si las inscripciones se asignan por lote en lugar de por orden de llegada"""
+        return self.modo_asignacion == 'preferencias'
+    
+    def acepta_preferencias(self):
+        """Verifica si la ventana de carga de preferencias está abierta"""
+        if not self.asigna_por_preferencias():
+            return False
+        ahora = timezone.now()
+        return self.inicio_preferencias <= ahora <= self.fin_preferencias
+    
+    def marcar_como_actual(self):
+        """Convierte este período en el actual, desmarcando el anterior"""
+        if self.cerrado:
+            raise ValidationError('No se puede activar un período cerrado')
+        with transaction.atomic():
+            PeriodoLectivo.objects.filter(actual=True).exclude(pk=self.pk).update(actual=False)
+            self.actual = True
+            self.save()
+    
+    def cerrar(self):
+        """
+        Marca el período como cerrado
+        Sus inscripciones se mueven luego al archivo con el comando cerrar_periodo
+        """
+        if self.actual:
+            raise ValidationError('No se puede cerrar el período actual; active otro período primero')
+        self.cerrado = True
+        self.fecha_cierre = timezone.now()
+        self.save()
 
 
 class InscripcionManager(models.Manager):
     """
     Manager personalizado para Inscripciones
     Implementa abstracción de lógica de negocio
+    Por defecto solo ve las inscripciones del período lectivo actual; el
+    manager `historico` ve todos los períodos no archivados.
     """
     
+    def __init__(self, solo_periodo_actual=True):
+        super().__init__()
+        self.solo_periodo_actual = solo_periodo_actual
+    
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.solo_periodo_actual:
+            queryset = queryset.filter(periodo_id=PeriodoLectivo.get_actual_id())
+        return queryset
+    
+    def por_periodo(self, periodo):
+        """Filtra inscripciones de un período lectivo"""
+        return super().get_queryset().filter(periodo=periodo)
+    
+    CAMPOS_HISTORIAL = [
+        'alumno_id', 'materia_id', 'materia__codigo', 'materia__nombre',
+        'periodo_id', 'periodo__anio', 'periodo__cuatrimestre', 'fecha_inscripcion', 'estado', 'activa', 'nota_final',
+        'fecha_baja', 'motivo_baja',
+    ]
+    
+    def con_archivo(self, **filtros):
+        """
+        Inscripciones de este manager más las archivadas que cumplen los
+        filtros, como diccionarios (values) unidos en una sola consulta.
+        Pensado para vistas históricas: Inscripcion.historico.con_archivo(alumno=alumno)
+        """
+        vigentes = self.filter(**filtros).values(
+            'id', *self.CAMPOS_HISTORIAL, archivada=models.Value(False)
+        )
+        archivadas = InscripcionArchivada.objects.filter(**filtros).values(
+            'inscripcion_id', *self.CAMPOS_HISTORIAL, archivada=models.Value(True)
+        )
+        return vigentes.order_by().union(archivadas.order_by(), all=True).order_by('-fecha_inscripcion')
+    
     def inscripciones_activas(self):
         """Retorna solo las inscripciones activas"""
         return self.filter(activa=True)
@@ -76,6 +282,22 @@ class Inscripcion(models.Model):
         verbose_name='Materia'
     )
     
+    periodo = models.ForeignKey(
+        PeriodoLectivo,
+        on_delete=models.PROTECT,
+        related_name='inscripciones',
+        verbose_name='Período Lectivo'
+    )
+    
+    comision = models.ForeignKey(
+        Comision,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='inscripciones',
+        verbose_name='Comisión'
+    )
+    
     fecha_inscripcion = models.DateTimeField(
         auto_now_add=True,
         verbose_name='Fecha de Inscripción'
@@ -118,14 +340,24 @@ class Inscripcion(models.Model):
         verbose_name='Motivo de Baja'
     )
     
-    # Manager personalizado
+    # Manager personalizado (período actual) y acceso a todos los períodos
     objects = InscripcionManager()
+    historico = InscripcionManager(solo_periodo_actual=False)
+    
+    # (estado, nota_final) tal como se leyeron de la base; los cambios se
+    # aplican como incrementos al registro académico del alumno
+    calificacion_original = (None, None)
     
     class Meta:
         verbose_name = 'Inscripción'
         verbose_name_plural = 'Inscripciones'
-        unique_together = ['alumno', 'materia']
+        # Un alumno puede recursar una materia en otro período
+        unique_together = ['periodo', 'alumno', 'materia']
         ordering = ['-fecha_inscripcion']
+        indexes = [
+            models.Index(fields=['periodo', 'materia', 'activa'], name='insc_periodo_materia_idx'),
+            models.Index(fields=['periodo', '-fecha_inscripcion'], name='insc_periodo_fecha_idx'),
+        ]
         
     def __str__(self):
         return f"{self.alumno.get_full_name()} - {self.materia.nombre}"
@@ -133,6 +365,15 @@ class Inscripcion(models.Model):
     def get_absolute_url(self):
         return reverse('inscripciones:detalle', kwargs={'pk': self.pk})
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instancia = super().from_db(db, field_names, values)
+        if 'estado' in field_names and 'nota_final' in field_names:
+            instancia.calificacion_original = (instancia.estado, instancia.nota_final)
+        else:
+            instancia.calificacion_original = None
+        return instancia
+    
     def clean(self):
         """
         Validaciones personalizadas del modelo
@@ -151,21 +392,115 @@ class Inscripcion(models.Model):
                 raise ValidationError(
                     'No hay cupo disponible en esta materia'
                 )
+            
+            if self.comision_id is not None:
+                if self.comision.materia_id != self.materia_id:
+                    raise ValidationError('La comisión no pertenece a la materia')
+                if not self.pk and not self.comision.tiene_cupo_disponible():
+                    raise ValidationError('No hay cupo disponible en la comisión')
     
     def save(self, *args, **kwargs):
         """
         Método save personalizado con validaciones
+        Las inscripciones nuevas se asignan al período lectivo actual
         """
-        self.full_clean()
-        super().save(*args, **kwargs)
+        if self.periodo_id is None:
+            self.periodo_id = PeriodoLectivo.get_actual_id()
+            if self.periodo_id is None:
+                raise ValidationError('No hay un período lectivo actual definido')
+        nueva = self._state.adding
+        # Solo al inscribirse o al reactivar una baja: editar la nota de una
+        # inscripción sin comisión no debe bloquear la materia ni fallar si
+        # las comisiones creadas después están llenas
+        reactivada = not nueva and (self.calificacion_original or (None,))[0] == 'baja'
+        with transaction.atomic():
+            if self.activa and self.comision_id is None and (nueva or reactivada):
+                self._asignar_comision()
+            self.full_clean()
+            super().save(*args, **kwargs)
+            if nueva:
+                accion, datos = 'alta', {
+                    'alumno': self.alumno_id, 'materia': self.materia_id, 'comision': self.comision_id,
+                }
+            else:
+                accion, datos = self.cambio_auditable() or (None, None)
+            if accion:
+                registrar_auditoria('inscripcion', self.pk, accion, **datos)
+                publicar(f'inscripcion.{accion}', self.pk, **self.datos_integracion())
+            registrar_calificaciones([self])
+        if nueva:
+            transaction.on_commit(lambda: INSCRIPCIONES.inc(origen='individual'))
+        self._notificar_cambio_cupo()
+    
+    def _asignar_comision(self):
+        """
+        Ubica la inscripción en la comisión menos ocupada de la materia
+        La fila de la materia queda bloqueada hasta el fin de la transacción
+        """
+        materia = Materia.objects.select_for_update().get(pk=self.materia_id)
+        self.comision = materia.elegir_comision()
+    
+    def delete(self, *args, **kwargs):
+        """Elimina la inscripción, descuenta su aporte al registro y avisa el cambio de cupo"""
+        inscripcion_id = self.pk
+        with transaction.atomic():
+            resultado = super().delete(*args, **kwargs)
+            registrar_auditoria(
+                'inscripcion', inscripcion_id, 'eliminacion',
+                alumno=self.alumno_id, materia=self.materia_id, estado=self.estado,
+            )
+            publicar('inscripcion.eliminacion', inscripcion_id, **self.datos_integracion())
+            registrar_calificaciones([self], eliminadas=True)
+        self._notificar_cambio_cupo()
+        return resultado
+    
+    def _notificar_cambio_cupo(self):
+        """
+        Publica el nuevo cupo de la materia una vez confirmada la transacción
+        e invalida los fragmentos cacheados de su carrera
+        """
+        materia_id = self.materia_id
+        carrera_id = self.materia.carrera_id
+        transaction.on_commit(lambda: notificar_cambio_cupo(materia_id))
+        transaction.on_commit(lambda: invalidar_carrera(carrera_id))
+    
+    def cambio_auditable(self):
+        """
+        (acción, datos) de auditoría del cambio de estado o nota respecto de
+        calificacion_original: baja, reactivar o nota; None si no cambió
+        Hay que llamarlo antes de registrar_calificaciones, que actualiza el
+        original.
+        """
+        anterior = self.calificacion_original
+        if anterior is None or anterior == (self.estado, self.nota_final):
+            return None
+        estado, nota = anterior
+        if self.estado == 'baja':
+            return 'baja', {'estado': estado, 'motivo': self.motivo_baja}
+        if estado == 'baja':
+            return 'reactivar', {'estado': self.estado}
+        return 'nota', {
+            'antes': {'estado': estado, 'nota': nota},
+            'despues': {'estado': self.estado, 'nota': self.nota_final},
+        }
+    
+    def datos_integracion(self):
+        """Datos que se publican en el outbox (ver integraciones/outbox.py)"""
+        return {
+            'alumno': self.alumno_id,
+            'materia': self.materia_id,
+            'periodo': self.periodo_id,
+            'comision': self.comision_id,
+            'estado': self.estado,
+            'activa': self.activa,
+            'nota_final': self.nota_final,
+        }
     
     def dar_de_baja(self, motivo=''):
         """
         Da de baja la inscripción
         Método de instancia que encapsula la lógica
         """
-        from django.utils import timezone
-        
         self.activa = False
         self.estado = 'baja'
         self.fecha_baja = timezone.now()
@@ -175,14 +510,20 @@ class Inscripcion(models.Model):
     def reactivar(self):
         """
         Reactiva la inscripción si es posible
+        Bloquea la fila de la materia para que la verificación de cupo y la
+        reactivación sean atómicas frente a inscripciones concurrentes
         """
-        if not self.activa and self.materia.tiene_cupo_disponible():
-            self.activa = True
-            self.estado = 'inscripto'
-            self.fecha_baja = None
-            self.motivo_baja = ''
-            self.save()
-            return True
+        with transaction.atomic():
+            materia = Materia.objects.select_for_update().get(pk=self.materia_id)
+            if not self.activa and materia.tiene_cupo_disponible():
+                self.activa = True
+                self.estado = 'inscripto'
+                self.fecha_baja = None
+                self.motivo_baja = ''
+                # La comisión original puede haberse llenado: se vuelve a asignar
+                self.comision = None
+                self.save()
+                return True
         return False
     
     def get_estado_display_color(self):
@@ -200,3 +541,167 @@ class Inscripcion(models.Model):
     def puede_darse_de_baja(self):
         """Verifica si la inscripción puede darse de baja"""
         return self.activa and self.estado in ['inscripto', 'cursando']
+
+
+class InscripcionArchivada(models.Model):
+    """
+    Inscripciones de períodos lectivos cerrados y bajas antiguas
+    Se mueven fuera de la tabla de inscripciones (comandos cerrar_periodo y
+    archivar_inscripciones) para que las consultas del período en curso
+    recorran solo datos vigentes.
+    """
+    
+    inscripcion_id = models.BigIntegerField(
+        unique=True,
+        verbose_name='ID de Inscripción Original'
+    )
+    
+    alumno = models.ForeignKey(
+        Alumno,
+        on_delete=models.CASCADE,
+        related_name='inscripciones_archivadas',
+        verbose_name='Alumno'
+    )
+    
+    materia = models.ForeignKey(
+        Materia,
+        on_delete=models.CASCADE,
+        related_name='inscripciones_archivadas',
+        verbose_name='Materia'
+    )
+    
+    periodo = models.ForeignKey(
+        PeriodoLectivo,
+        on_delete=models.PROTECT,
+        related_name='inscripciones_archivadas',
+        verbose_name='Período Lectivo'
+    )
+    
+    fecha_inscripcion = models.DateTimeField(
+        verbose_name='Fecha de Inscripción'
+    )
+    
+    estado = models.CharField(
+        max_length=15,
+        choices=Inscripcion.ESTADOS_CHOICES,
+        verbose_name='Estado'
+    )
+    
+    activa = models.BooleanField(
+        verbose_name='Inscripción Activa'
+    )
+    
+    nota_final = models.DecimalField(
+        max_digits=4,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        verbose_name='Nota Final'
+    )
+    
+    observaciones = models.TextField(
+        blank=True,
+        verbose_name='Observaciones'
+    )
+    
+    fecha_baja = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Fecha de Baja'
+    )
+    
+    motivo_baja = models.CharField(
+        max_length=100,
+        blank=True,
+        verbose_name='Motivo de Baja'
+    )
+    
+    fecha_archivo = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Fecha de Archivo'
+    )
+    
+    # Campos copiados tal cual desde Inscripcion al archivar
+    CAMPOS_COPIADOS = [
+        'alumno_id', 'materia_id', 'periodo_id', 'fecha_inscripcion', 'estado',
+        'activa', 'nota_final', 'observaciones', 'fecha_baja', 'motivo_baja',
+    ]
+    
+    class Meta:
+        verbose_name = 'Inscripción Archivada'
+        verbose_name_plural = 'Inscripciones Archivadas'
+        ordering = ['-fecha_inscripcion']
+        indexes = [
+            models.Index(fields=['periodo', 'alumno'], name='insc_arch_periodo_alumno_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.alumno.get_full_name()} - {self.materia.nombre} ({self.periodo})"
+    
+    @classmethod
+    def desde_inscripcion(cls, fila):
+        """Construye el registro archivado a partir de un dict de values()"""
+        return cls(
+            inscripcion_id=fila['id'],
+            **{campo: fila[campo] for campo in cls.CAMPOS_COPIADOS}
+        )
+
+
+class Preferencia(models.Model):
+    """
+    Materia elegida por un alumno, con su orden de prioridad, durante la
+    ventana de preferencias de un período que asigna por lote
+    (ver el comando asignar_inscripciones)
+    """
+    
+    ESTADOS_CHOICES = [
+        ('pendiente', 'Pendiente'),
+        ('asignada', 'Asignada'),
+        ('sin_asignar', 'Sin Asignar'),
+    ]
+    
+    alumno = models.ForeignKey(
+        Alumno,
+        on_delete=models.CASCADE,
+        related_name='preferencias',
+        verbose_name='Alumno'
+    )
+    
+    materia = models.ForeignKey(
+        Materia,
+        on_delete=models.CASCADE,
+        related_name='preferencias',
+        verbose_name='Materia'
+    )
+    
+    periodo = models.ForeignKey(
+        PeriodoLectivo,
+        on_delete=models.CASCADE,
+        related_name='preferencias',
+        verbose_name='Período Lectivo'
+    )
+    
+    orden = models.PositiveSmallIntegerField(
+        verbose_name='Orden de Preferencia'
+    )
+    
+    estado = models.CharField(
+        max_length=15,
+        choices=ESTADOS_CHOICES,
+        default='pendiente',
+        verbose_name='Estado'
+    )
+    
+    fecha = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Fecha'
+    )
+    
+    class Meta:
+        verbose_name = 'Preferencia'
+        verbose_name_plural = 'Preferencias'
+        unique_together = [['periodo', 'alumno', 'materia'], ['periodo', 'alumno', 'orden']]
+        ordering = ['alumno', 'orden']
+    
+    def __str__(self):
+        return f"{self.alumno.get_full_name()} - {self.orden}. {self.materia.nombre}"
@@ -0,0 +1,95 @@
+"""
+Mantenimiento del registro académico (alumnos.RegistroAcademico)
+Cada inscripción aprobada aporta al registro de su alumno en la carrera de
+la materia: una materia aprobada, su nota (si tiene) y su carga horaria.
+Cuando cambia la calificación de una inscripción se resta el aporte
+anterior y se suma el nuevo, en la misma transacción que el cambio.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, Sum
+
+from alumnos.models import RegistroAcademico
+
+
+SIN_APORTE = (0, 0, Decimal(0), 0)
+
+
+def aporte(estado, nota, carga_horaria):
+    """Aporte de una inscripción a los acumulados del registro"""
+    if estado != 'aprobado':
+        return SIN_APORTE
+    if nota is None:
+        return (1, 0, Decimal(0), carga_horaria)
+    return (1, 1, Decimal(nota), carga_horaria)
+
+
+def registrar_calificaciones(inscripciones, eliminadas=False):
+    """
+    Aplica al registro académico los cambios de calificación de las
+    inscripciones (ya guardadas o eliminadas)
+    La materia de cada inscripción debería venir cargada para no consultar
+    su carrera y carga horaria fila por fila.
+    """
+    deltas = defaultdict(lambda: list(SIN_APORTE))
+    for inscripcion in inscripciones:
+        anterior = inscripcion.calificacion_original
+        if anterior is None:
+            # Cargada sin estado o nota (only/defer): no se conoce el aporte previo
+            continue
+        actual = (None, None) if eliminadas else (inscripcion.estado, inscripcion.nota_final)
+        if anterior == actual:
+            continue
+        carga_horaria = inscripcion.materia.carga_horaria
+        antes = aporte(*anterior, carga_horaria)
+        despues = aporte(*actual, carga_horaria)
+        delta = deltas[(inscripcion.alumno_id, inscripcion.materia.carrera_id)]
+        for i in range(len(delta)):
+            delta[i] += despues[i] - antes[i]
+        inscripcion.calificacion_original = actual
+    RegistroAcademico.aplicar(deltas)
+
+
+def reconstruir_registros(alumno_ids=None):
+    """
+    Recalcula desde cero los registros (de todos los alumnos o de los
+    indicados) a partir de las inscripciones aprobadas, vigentes y archivadas
+    Devuelve la cantidad de registros escritos.
+    """
+    from .models import Inscripcion, InscripcionArchivada
+    
+    acumulados = defaultdict(lambda: list(SIN_APORTE))
+    for modelo in (Inscripcion.historico, InscripcionArchivada.objects):
+        aprobadas = modelo.filter(estado='aprobado')
+        if alumno_ids is not None:
+            aprobadas = aprobadas.filter(alumno_id__in=alumno_ids)
+        for fila in aprobadas.order_by().values('alumno_id', 'materia__carrera_id').annotate(
+            aprobadas=Count('id'),
+            con_nota=Count('nota_final'),
+            suma=Sum('nota_final'),
+            carga=Sum('materia__carga_horaria'),
+        ):
+            acumulado = acumulados[(fila['alumno_id'], fila['materia__carrera_id'])]
+            acumulado[0] += fila['aprobadas']
+            acumulado[1] += fila['con_nota']
+            acumulado[2] += fila['suma'] or 0
+            acumulado[3] += fila['carga'] or 0
+
+    registros = [
+        RegistroAcademico(
+            alumno_id=alumno_id,
+            carrera_id=carrera_id,
+            **dict(zip(RegistroAcademico.CAMPOS_ACUMULADOS, acumulado))
+        )
+        for (alumno_id, carrera_id), acumulado in acumulados.items()
+    ]
+
+    with transaction.atomic():
+        existentes = RegistroAcademico.objects.all()
+        if alumno_ids is not None:
+            existentes = existentes.filter(alumno_id__in=alumno_ids)
+        existentes.delete()
+        RegistroAcademico.objects.bulk_create(registros, batch_size=500)
+    return len(registros)
@@ -0,0 +1,11 @@
+"""
+Tareas en segundo plano de inscripciones (ver trabajos/cola.py)
+"""
+from trabajos.cola import tarea
+from .registro import reconstruir_registros
+
+
+@tarea()
+def reconstruir_registro_academico(alumno_ids=None):
+    """Recalcula los registros académicos (de todos o de los alumnos indicados)"""
+    reconstruir_registros(alumno_ids)
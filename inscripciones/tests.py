@@ -0,0 +1,124 @@
+"""
+Tests de inscripción concurrente sobre PostgreSQL
+Solo corren con la configuración de PostgreSQL (en SQLite las escrituras
+ya se serializan con BEGIN IMMEDIATE y no hay bloqueo de filas):
+    DB_ENGINE=django.db.backends.postgresql python manage.py test inscripciones
+"""
+import threading
+import time
+import unittest
+from datetime import date
+
+from django.core.cache import caches
+from django.db import connection, transaction
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+
+from alumnos.models import Alumno, InscripcionCarrera, SinCupoError
+from carreras.models import Carrera
+from inscripciones.models import Inscripcion, PeriodoLectivo
+from materias.models import Materia
+
+
+ESPERA_BLOQUEO = 1.0  # segundos que otra transacción retiene la materia
+
+
+def ejecutar_hilos(funcion, argumentos):
+    """Ejecuta funcion(argumento) en un hilo por argumento y espera a todos"""
+    hilos = [threading.Thread(target=funcion, args=(argumento,)) for argumento in argumentos]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'Requiere DB_ENGINE=django.db.backends.postgresql')
+class CupoConcurrentePostgresqlTests(TransactionTestCase):
+    """Alumno.inscribirse_a bloquea la materia y respeta el cupo entre transacciones"""
+
+    concurrentes = 20
+
+    def setUp(self):
+        # El período actual se cachea por id y el flush entre tests lo borra
+        for cache in caches.all():
+            cache.clear()
+        hoy = date.today()
+        if PeriodoLectivo.get_actual() is None:
+            PeriodoLectivo.objects.create(
+                anio=hoy.year, cuatrimestre=0, fecha_inicio=hoy,
+                fecha_fin=hoy.replace(month=12, day=31), actual=True,
+            )
+        self.carrera = Carrera.objects.create(
+            nombre='Concurrencia', codigo='CONC', duracion_anios=1, titulo_otorgado='-'
+        )
+        self.alumnos = []
+        for numero in range(self.concurrentes):
+            alumno = Alumno.objects.create(
+                nombre='Alumno', apellido=f'{numero}', dni=f'9{numero:07d}',
+                email=f'concurrente{numero}@example.com', fecha_nacimiento=date(2000, 1, 1),
+                numero_legajo=f'C{numero:05d}', fecha_ingreso=hoy,
+            )
+            InscripcionCarrera.objects.create(alumno=alumno, carrera=self.carrera)
+            self.alumnos.append(alumno)
+
+    def crear_materia(self, codigo, cupo):
+        return Materia.objects.create(
+            nombre=codigo, codigo=codigo, carrera=self.carrera, anio_cursado=1,
+            carga_horaria=1, cupo_maximo=cupo,
+        )
+
+    def test_inscribirse_bloquea_la_fila_de_la_materia(self):
+        materia = self.crear_materia('CONC-1', 5)
+        with CaptureQueriesContext(connection) as consultas:
+            self.alumnos[0].inscribirse_a(materia)
+        self.assertTrue(any(
+            'FOR UPDATE' in consulta['sql'] and '"materias_materia"' in consulta['sql']
+            for consulta in consultas.captured_queries
+        ))
+
+    def test_inscribirse_espera_el_bloqueo_de_otra_transaccion(self):
+        materia = self.crear_materia('CONC-2', 5)
+        tomada = threading.Event()
+
+        def retener(_):
+            try:
+                with transaction.atomic():
+                    Materia.objects.select_for_update().get(pk=materia.pk)
+                    tomada.set()
+                    time.sleep(ESPERA_BLOQUEO)
+            finally:
+                tomada.set()
+                connection.close()
+
+        hilo = threading.Thread(target=retener, args=(None,))
+        hilo.start()
+        tomada.wait()
+        inicio = time.perf_counter()
+        self.alumnos[0].inscribirse_a(materia)
+        espera = time.perf_counter() - inicio
+        hilo.join()
+        self.assertGreaterEqual(espera, ESPERA_BLOQUEO * 0.8)
+
+    def test_inscripciones_simultaneas_no_exceden_el_cupo(self):
+        cupo = self.concurrentes // 2
+        materia = self.crear_materia('CONC-3', cupo)
+        aceptadas, rechazadas, errores = [], [], []
+        barrera = threading.Barrier(self.concurrentes)
+
+        def inscribir(alumno):
+            try:
+                barrera.wait()
+                alumno.inscribirse_a(materia)
+                aceptadas.append(alumno.pk)
+            except SinCupoError:
+                rechazadas.append(alumno.pk)
+            except Exception as e:
+                errores.append(e)
+            finally:
+                connection.close()
+
+        ejecutar_hilos(inscribir, self.alumnos)
+        self.assertEqual(errores, [])
+        self.assertEqual(len(aceptadas), cupo)
+        self.assertEqual(len(rechazadas), self.concurrentes - cupo)
+        self.assertEqual(Inscripcion.objects.filter(materia=materia, activa=True).count(), cupo)
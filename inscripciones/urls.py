@@ -12,6 +12,7 @@ urlpatterns = [
     path('mis-inscripciones/', views.MisInscripcionesView.as_view(), name='mis_inscripciones'),
     path('seleccionar-carrera/', views.SeleccionarCarreraView.as_view(), name='seleccionar_carrera'),
     path('inscribirse/<int:materia_id>/', views.InscribirseView.as_view(), name='inscribirse'),
+    path('preferencias/', views.PreferenciasView.as_view(), name='preferencias'),
     path('desinscribirse/<int:materia_id>/', views.DesinscribirseView.as_view(), name='desinscribirse'),
     path('gestion-preceptor/', views.GestionInscripcionesPreceptorView.as_view(), name='gestion_preceptor'),
     
@@ -5,11 +5,14 @@ from django.contrib import messages
 from django.urls import reverse_lazy
 from django.core.exceptions import ValidationError
 from django.http import JsonResponse
-from .models import Inscripcion
-from .forms import InscripcionForm
+from django.db import transaction
+from .models import Inscripcion, PeriodoLectivo, Preferencia
+from .forms import InscripcionForm, PreferenciasForm
 from materias.models import Materia
-from alumnos.models import Alumno
+from alumnos.models import Alumno, SinCupoError
 from usuarios.views import AdminRequiredMixin
+from gestion_academica.db_routing import LecturaReplicaMixin
+from gestion_academica.metricas import INSCRIPCIONES_RECHAZADAS
 
 
 class PreceptorRequiredMixin(LoginRequiredMixin):
@@ -24,7 +27,7 @@ class PreceptorRequiredMixin(LoginRequiredMixin):
         return super().dispatch(request, *args, **kwargs)
 
 
-class InscripcionListView(PreceptorRequiredMixin, ListView):
+class InscripcionListView(PreceptorRequiredMixin, LecturaReplicaMixin, ListView):
     """Vista para listar inscripciones (acceso para preceptor y administrador)"""
     model = Inscripcion
     template_name = 'inscripciones/lista.html'
@@ -40,6 +43,8 @@ class InscripcionDetailView(PreceptorRequiredMixin, DetailView):
     model = Inscripcion
     template_name = 'inscripciones/detalle.html'
     context_object_name = 'inscripcion'
+    # El detalle también muestra inscripciones de períodos anteriores
+    queryset = Inscripcion.historico.select_related('periodo')
 
 
 class InscripcionCreateView(PreceptorRequiredMixin, CreateView):
@@ -88,6 +93,7 @@ class MisInscripcionesView(LoginRequiredMixin, ListView):
         if self.request.user.is_authenticated and self.request.user.es_alumno():
             try:
                 alumno = self.request.user.alumno_profile
+                context['alumno'] = alumno
                 context['carrera_principal'] = alumno.get_carrera_principal()
                 # Contar inscripciones activas
                 context['inscripciones_activas_count'] = self.get_queryset().filter(activa=True).count()
@@ -100,6 +106,14 @@ class MisInscripcionesView(LoginRequiredMixin, ListView):
 class InscribirseView(LoginRequiredMixin, View):
     """Vista para que un alumno se inscriba a una materia"""
     
+    def dispatch(self, request, *args, **kwargs):
+        # En los períodos que asignan por lote no hay inscripción directa
+        periodo = PeriodoLectivo.get_actual()
+        if request.user.is_authenticated and periodo and periodo.asigna_por_preferencias():
+            messages.info(request, 'En este período las materias se asignan según tus preferencias.')
+            return redirect('inscripciones:preferencias')
+        return super().dispatch(request, *args, **kwargs)
+    
     def get(self, request, materia_id):
         if not request.user.es_alumno():
             messages.error(request, 'Solo los alumnos pueden inscribirse a materias.')
@@ -122,6 +136,7 @@ class InscribirseView(LoginRequiredMixin, View):
             
             # Verificar cupo
             if not materia.tiene_cupo_disponible():
+                INSCRIPCIONES_RECHAZADAS.inc(motivo='cupo', etapa='confirmacion')
                 messages.error(request, f'La materia {materia.nombre} no tiene cupo disponible')
                 return redirect('materias:por_carrera', pk=materia.carrera.pk)
             
@@ -151,6 +166,9 @@ class InscribirseView(LoginRequiredMixin, View):
                 f'Te has inscripto correctamente a {materia.nombre}'
             )
             
+        except SinCupoError as e:
+            INSCRIPCIONES_RECHAZADAS.inc(motivo='cupo', etapa='inscripcion')
+            messages.error(request, str(e))
         except Exception as e:
             messages.error(request, str(e))
         
@@ -317,7 +335,7 @@ class GestionInscripcionesPreceptorView(PreceptorRequiredMixin, ListView):
         return context
 
 
-def obtener_materias_por_alumno(request):
+async def obtener_materias_por_alumno(request):
     """Vista AJAX para obtener las materias de la carrera del alumno"""
     alumno_id = request.GET.get('alumno_id')
     
@@ -325,8 +343,8 @@ def obtener_materias_por_alumno(request):
         return JsonResponse({'materias': []})
     
     try:
-        alumno = Alumno.objects.get(pk=alumno_id)
-        carrera = alumno.get_carrera_principal()
+        alumno = await Alumno.objects.aget(pk=alumno_id)
+        carrera = await alumno.aget_carrera_principal()
         
         if not carrera:
             return JsonResponse({'materias': []})
@@ -338,8 +356,72 @@ def obtener_materias_por_alumno(request):
         ).values('id', 'nombre', 'codigo', 'anio_cursado', 'cuatrimestre').order_by('anio_cursado', 'nombre')
         
         return JsonResponse({
-            'materias': list(materias),
+            'materias': [materia async for materia in materias],
             'carrera': carrera.nombre
         })
     except Alumno.DoesNotExist:
         return JsonResponse({'materias': [], 'error': 'Alumno no encontrado'})
+
+
+class PreferenciasView(LoginRequiredMixin, View):
+    """
+    Carga de preferencias del alumno durante la ventana del período
+    Las inscripciones se asignan después, por lote (asignar_inscripciones)
+    """
+    template_name = 'inscripciones/preferencias.html'
+    
+    def dispatch(self, request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return self.handle_no_permission()
+        if not request.user.es_alumno():
+            messages.error(request, 'Solo los alumnos pueden cargar preferencias.')
+            return redirect('home')
+        self.periodo = PeriodoLectivo.get_actual()
+        if self.periodo is None or not self.periodo.asigna_por_preferencias():
+            messages.info(request, 'En este período la inscripción es por orden de llegada.')
+            return redirect('inscripciones:seleccionar_carrera')
+        self.alumno = request.user.alumno_profile
+        return super().dispatch(request, *args, **kwargs)
+    
+    def get_form(self, data=None):
+        materias = self.alumno.get_materias_disponibles().select_related('carrera').order_by(
+            'carrera__nombre', 'anio_cursado', 'nombre'
+        )
+        initial = {
+            f'materia_{materia_id}': orden
+            for materia_id, orden in self.alumno.preferencias.filter(
+                periodo=self.periodo
+            ).values_list('materia_id', 'orden')
+        }
+        return PreferenciasForm(materias, data=data, initial=initial)
+    
+    def render_form(self, form):
+        return render(self.request, self.template_name, {
+            'form': form,
+            'periodo': self.periodo,
+            'abierta': self.periodo.acepta_preferencias(),
+            'preferencias': self.alumno.preferencias.filter(
+                periodo=self.periodo
+            ).select_related('materia'),
+        })
+    
+    def get(self, request):
+        return self.render_form(self.get_form())
+    
+    def post(self, request):
+        if not self.periodo.acepta_preferencias():
+            messages.error(request, 'La ventana de carga de preferencias está cerrada.')
+            return redirect('inscripciones:preferencias')
+        
+        form = self.get_form(data=request.POST)
+        if not form.is_valid():
+            return self.render_form(form)
+        
+        with transaction.atomic():
+            self.alumno.preferencias.filter(periodo=self.periodo).delete()
+            Preferencia.objects.bulk_create([
+                Preferencia(alumno=self.alumno, materia_id=materia_id, periodo=self.periodo, orden=orden)
+                for orden, materia_id in enumerate(form.cleaned_data['preferencias'], start=1)
+            ])
+        messages.success(request, 'Tus preferencias se guardaron correctamente.')
+        return redirect('inscripciones:preferencias')
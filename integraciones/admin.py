@@ -0,0 +1,23 @@
+from django.contrib import admin
+from .models import CursorConsumidor, EventoSalida
+
+
+@admin.register(EventoSalida)
+class EventoSalidaAdmin(admin.ModelAdmin):
+    """Solo lectura: los eventos los escriben los modelos"""
+    list_display = ['id', 'fecha', 'tipo', 'entidad_id']
+    list_filter = ['tipo']
+    search_fields = ['=entidad_id']
+    show_full_result_count = False
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(CursorConsumidor)
+class CursorConsumidorAdmin(admin.ModelAdmin):
+    list_display = ['nombre', 'ultimo_id', 'fecha_actualizacion']
+    readonly_fields = ['huecos', 'fecha_actualizacion']
@@ -0,0 +1,7 @@
+from django.apps import AppConfig
+
+
+class IntegracionesConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'integraciones'
+    verbose_name = 'Integraciones'
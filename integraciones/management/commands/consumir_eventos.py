@@ -0,0 +1,145 @@
+"""
+Comando para entregar los eventos del outbox a otro sistema
+Uso: python manage.py consumir_eventos biblioteca --salida - --seguir
+     python manage.py consumir_eventos campus --webhook https://campus.example/hooks/gestion --lote 200
+
+Cada consumidor (el primer argumento) tiene su propio cursor en la base:
+al volver a ejecutarlo continúa desde el último lote confirmado. Con
+--salida escribe JSON lines (un evento por línea) en un archivo o en la
+salida estándar; con --webhook envía cada lote como {"eventos": [...]} en
+un POST, firmado con HMAC-SHA256 si INTEGRACIONES_WEBHOOK_SECRETO está
+definido. El cursor avanza solo cuando el lote se escribió o el receptor
+respondió 2xx: si el receptor responde 429/503 se respeta Retry-After y
+ante otros errores se reintenta el mismo lote con espera exponencial, así
+el consumo nunca va más rápido de lo que el destino acepta.
+"""
+import hashlib
+import hmac
+import json
+import sys
+import time
+import urllib.error
+import urllib.request
+from functools import partial
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+
+from integraciones.outbox import Consumidor
+
+
+ESPERA_MAXIMA = 60
+
+
+class Command(BaseCommand):
+    help = 'Entrega los eventos de cambio (outbox) como JSON lines o webhooks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('consumidor', help='Nombre del consumidor (identifica el cursor)')
+        destino = parser.add_mutually_exclusive_group(required=True)
+        destino.add_argument('--salida', metavar='ARCHIVO',
+                             help='Archivo JSON lines al que agregar los eventos ("-" para stdout)')
+        destino.add_argument('--webhook', metavar='URL', help='URL que recibe cada lote por POST')
+        parser.add_argument('--lote', type=int, default=100,
+                            help='Eventos por lote (por defecto 100)')
+        parser.add_argument('--tipos', default='',
+                            help='Prefijos de tipo separados por coma, p. ej. inscripcion.,alumno.')
+        parser.add_argument('--seguir', action='store_true',
+                            help='No terminar al alcanzar el final: esperar eventos nuevos')
+        parser.add_argument('--intervalo', type=float, default=1.0,
+                            help='Segundos entre consultas cuando no hay eventos (con --seguir)')
+        parser.add_argument('--desde', type=int, metavar='ID',
+                            help='Reposiciona el cursor: entrega desde el evento ID + 1')
+        parser.add_argument('--timeout', type=float, default=10.0,
+                            help='Timeout de cada POST en segundos')
+
+    def handle(self, *args, **options):
+        tipos = [tipo.strip() for tipo in options['tipos'].split(',') if tipo.strip()]
+        consumidor = Consumidor(options['consumidor'], tipos)
+        if options['desde'] is not None:
+            consumidor.reposicionar(options['desde'])
+
+        if options['webhook']:
+            entregar = partial(self.enviar_webhook, options['webhook'], options['timeout'])
+            salida = None
+        else:
+            salida = self.abrir_salida(options['salida'])
+            entregar = partial(self.escribir, salida)
+
+        entregados = 0
+        try:
+            while True:
+                lote = consumidor.siguiente_lote(options['lote'])
+                if not lote:
+                    if not options['seguir']:
+                        break
+                    time.sleep(options['intervalo'])
+                    continue
+                eventos = consumidor.filtrar(lote)
+                if eventos:
+                    entregar(eventos)
+                consumidor.confirmar(lote)
+                entregados += len(eventos)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if salida not in (None, sys.stdout):
+                salida.close()
+
+        self.stderr.write(
+            f'{options["consumidor"]}: {entregados} eventos entregados, '
+            f'cursor en #{consumidor.cursor.ultimo_id}'
+        )
+
+    def abrir_salida(self, ruta):
+        if ruta == '-':
+            return sys.stdout
+        try:
+            return open(ruta, 'a', encoding='utf-8')
+        except OSError as e:
+            raise CommandError(f'No se pudo abrir el archivo: {e}')
+
+    @staticmethod
+    def serializar(eventos):
+        return [evento.como_dict() for evento in eventos]
+
+    def escribir(self, salida, eventos):
+        """Una línea por evento; flush bloquea si el lector de la tubería va atrasado"""
+        salida.writelines(
+            json.dumps(evento, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+            for evento in self.serializar(eventos)
+        )
+        salida.flush()
+
+    def enviar_webhook(self, url, timeout, eventos):
+        """POST del lote hasta que el receptor lo acepte"""
+        cuerpo = json.dumps({'eventos': self.serializar(eventos)}, cls=DjangoJSONEncoder).encode()
+        cabeceras = {'Content-Type': 'application/json'}
+        secreto = settings.INTEGRACIONES_WEBHOOK_SECRETO
+        if secreto:
+            firma = hmac.new(secreto.encode(), cuerpo, hashlib.sha256).hexdigest()
+            cabeceras['X-Gestion-Firma'] = f'sha256={firma}'
+
+        espera = 1
+        while True:
+            request = urllib.request.Request(url, data=cuerpo, headers=cabeceras, method='POST')
+            try:
+                with urllib.request.urlopen(request, timeout=timeout):
+                    return
+            except urllib.error.HTTPError as e:
+                reintentar = e.headers.get('Retry-After', '')
+                if e.code in (429, 503) and reintentar.isdigit():
+                    pausa = min(int(reintentar), ESPERA_MAXIMA)
+                else:
+                    pausa = espera
+                motivo = f'HTTP {e.code}'
+            except (urllib.error.URLError, TimeoutError, ConnectionError) as e:
+                pausa = espera
+                motivo = str(getattr(e, 'reason', e))
+            self.stderr.write(
+                f'El webhook rechazó el lote #{eventos[0].pk}-#{eventos[-1].pk} ({motivo}); '
+                f'se reintenta en {pausa} s'
+            )
+            time.sleep(pausa)
+            espera = min(espera * 2, ESPERA_MAXIMA)
@@ -0,0 +1,44 @@
+"""
+Comando para borrar los eventos del outbox ya entregados
+Uso: python manage.py purgar_eventos_salida --dias 30
+
+Borra, en lotes, los eventos anteriores al corte que todos los consumidores
+registrados ya recibieron (id menor o igual al menor de sus cursores). Un
+consumidor que se abandona debe borrarse desde el admin para no retener
+eventos indefinidamente.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Min
+from django.utils import timezone
+
+from integraciones.models import CursorConsumidor, EventoSalida
+
+
+class Command(BaseCommand):
+    help = 'Borra los eventos de salida entregados a todos los consumidores'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, default=settings.INTEGRACIONES_RETENCION_DIAS,
+                            help=f'Antigüedad mínima, en días (por defecto {settings.INTEGRACIONES_RETENCION_DIAS})')
+        parser.add_argument('--lote', type=int, default=5000,
+                            help='Eventos borrados por consulta')
+
+    def handle(self, *args, **options):
+        corte = timezone.now() - timedelta(days=options['dias'])
+        limite = CursorConsumidor.objects.aggregate(minimo=Min('ultimo_id'))['minimo']
+        antiguos = EventoSalida.objects.filter(fecha__lt=corte)
+        if limite is not None:
+            antiguos = antiguos.filter(pk__lte=limite)
+
+        total = 0
+        while True:
+            ids = list(antiguos.order_by('pk').values_list('pk', flat=True)[:options['lote']])
+            if not ids:
+                break
+            EventoSalida.objects.filter(pk__in=ids).delete()
+            total += len(ids)
+
+        self.stdout.write(self.style.SUCCESS(f'✅ {total} eventos de salida borrados'))
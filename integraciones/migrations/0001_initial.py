@@ -0,0 +1,46 @@
+# Generated by Django 5.2.6 on 2026-10-19 13:13
+
+import django.core.serializers.json
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CursorConsumidor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=50, unique=True, verbose_name='Nombre')),
+                ('ultimo_id', models.PositiveBigIntegerField(default=0, verbose_name='Último ID Entregado')),
+                ('huecos', models.JSONField(blank=True, default=list, verbose_name='Huecos Pendientes')),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True, verbose_name='Fecha de Actualización')),
+            ],
+            options={
+                'verbose_name': 'Cursor de Consumidor',
+                'verbose_name_plural': 'Cursores de Consumidores',
+                'ordering': ['nombre'],
+            },
+        ),
+        migrations.CreateModel(
+            name='EventoSalida',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Fecha')),
+                ('tipo', models.CharField(help_text='entidad.acción, p. ej. inscripcion.alta', max_length=50, verbose_name='Tipo')),
+                ('entidad_id', models.PositiveBigIntegerField(verbose_name='ID de la Entidad')),
+                ('datos', models.JSONField(blank=True, default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='Datos')),
+            ],
+            options={
+                'verbose_name': 'Evento de Salida',
+                'verbose_name_plural': 'Eventos de Salida',
+                'ordering': ['id'],
+            },
+        ),
+    ]
@@ -0,0 +1,91 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils import timezone
+
+
+class EventoSalida(models.Model):
+    """
+    Evento de cambio para otros sistemas (outbox transaccional)
+    Se inserta en la misma transacción que el cambio que describe, así que
+    existe si y solo si el cambio se confirmó. El id creciente es el cursor
+    de los consumidores (ver integraciones/outbox.py).
+    """
+    
+    fecha = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Fecha'
+    )
+    
+    tipo = models.CharField(
+        max_length=50,
+        verbose_name='Tipo',
+        help_text='entidad.acción, p. ej. inscripcion.alta'
+    )
+    
+    entidad_id = models.PositiveBigIntegerField(
+        verbose_name='ID de la Entidad'
+    )
+    
+    datos = models.JSONField(
+        default=dict,
+        blank=True,
+        encoder=DjangoJSONEncoder,
+        verbose_name='Datos'
+    )
+    
+    class Meta:
+        verbose_name = 'Evento de Salida'
+        verbose_name_plural = 'Eventos de Salida'
+        ordering = ['id']
+    
+    def __str__(self):
+        return f"#{self.pk} {self.tipo} {self.entidad_id}"
+    
+    def como_dict(self):
+        """Representación que reciben los consumidores"""
+        return {
+            'id': self.pk,
+            'tipo': self.tipo,
+            'entidad_id': self.entidad_id,
+            'fecha': self.fecha,
+            'datos': self.datos,
+        }
+
+
+class CursorConsumidor(models.Model):
+    """
+    Posición de un consumidor en el stream de eventos
+    ultimo_id es el mayor id entregado; huecos son los rangos [desde, hasta,
+    visto] de ids menores todavía no vistos, que pueden corresponder a
+    transacciones más lentas que aún no se confirmaron.
+    """
+    
+    nombre = models.CharField(
+        max_length=50,
+        unique=True,
+        verbose_name='Nombre'
+    )
+    
+    ultimo_id = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name='Último ID Entregado'
+    )
+    
+    huecos = models.JSONField(
+        default=list,
+        blank=True,
+        verbose_name='Huecos Pendientes'
+    )
+    
+    fecha_actualizacion = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Fecha de Actualización'
+    )
+    
+    class Meta:
+        verbose_name = 'Cursor de Consumidor'
+        verbose_name_plural = 'Cursores de Consumidores'
+        ordering = ['nombre']
+    
+    def __str__(self):
+        return f"{self.nombre} (#{self.ultimo_id})"
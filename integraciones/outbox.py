@@ -0,0 +1,102 @@
+"""
+Outbox transaccional para integraciones (biblioteca, campus virtual, cobranzas)
+Los modelos llaman a publicar() / publicar_muchos() dentro de la misma
+transacción atómica que el cambio: el evento se confirma o se revierte con
+él, y los otros sistemas no necesitan consultar nuestras tablas.
+
+Tipos de evento (entidad.acción):
+- inscripcion.alta | baja | reactivar | nota | eliminacion
+- inscripcion_carrera.alta | baja | reactivar | eliminacion
+- alumno.alta | modificacion | eliminacion
+- usuario.alta | rol | activacion | desactivacion
+
+Los consumidores (comando consumir_eventos) leen por id con un cursor
+propio. Con varias conexiones escribiendo, un id menor puede confirmarse
+después que uno mayor: los ids salteados quedan como huecos en el cursor y
+se vuelven a buscar durante INTEGRACIONES_ESPERA_HUECOS segundos (después
+se asumen revertidos). La entrega es "al menos una vez": los receptores
+deben ignorar los ids repetidos.
+"""
+import time
+
+from django.conf import settings
+from django.db.models import Q
+
+from .models import CursorConsumidor, EventoSalida
+
+
+def publicar(tipo, entidad_id, **datos):
+    """Inserta un evento; llamar dentro de la transacción del cambio"""
+    publicar_muchos([(tipo, entidad_id, datos)])
+
+
+def publicar_muchos(eventos):
+    """Inserta varios eventos (tipo, entidad_id, datos) con un bulk_create"""
+    if not settings.INTEGRACIONES_OUTBOX_ACTIVO:
+        return
+    EventoSalida.objects.bulk_create([
+        EventoSalida(tipo=tipo, entidad_id=entidad_id, datos=datos)
+        for tipo, entidad_id, datos in eventos
+    ], batch_size=500)
+
+
+class Consumidor:
+    """
+    Lectura por lotes del stream con un cursor persistente
+    Un solo proceso por nombre de consumidor. El cursor solo avanza con
+    confirmar(), después de que el destino aceptó el lote.
+    """
+
+    def __init__(self, nombre, tipos=()):
+        self.cursor, _ = CursorConsumidor.objects.get_or_create(nombre=nombre)
+        self.tipos = tuple(tipos)
+
+    def reposicionar(self, ultimo_id):
+        """Vuelve a entregar desde ultimo_id + 1 (descarta los huecos)"""
+        self.cursor.ultimo_id = ultimo_id
+        self.cursor.huecos = []
+        self.cursor.save()
+
+    def siguiente_lote(self, tamanio):
+        """Próximos eventos sin entregar (incluye los que llenan huecos), por id"""
+        condicion = Q(pk__gt=self.cursor.ultimo_id)
+        for desde, hasta, _ in self.cursor.huecos:
+            condicion |= Q(pk__range=(desde, hasta))
+        return list(EventoSalida.objects.filter(condicion).order_by('pk')[:tamanio])
+
+    def filtrar(self, eventos):
+        """Eventos de los tipos pedidos; el resto se confirma sin entregar"""
+        if not self.tipos:
+            return eventos
+        return [evento for evento in eventos if evento.tipo.startswith(self.tipos)]
+
+    def confirmar(self, eventos):
+        """Avanza el cursor hasta el último evento del lote y actualiza los huecos"""
+        ahora = time.time()
+        espera = settings.INTEGRACIONES_ESPERA_HUECOS
+        ids = sorted(evento.pk for evento in eventos)
+
+        huecos = []
+        for desde, hasta, visto in self.cursor.huecos:
+            if ahora - visto > espera:
+                continue
+            inicio = desde
+            for evento_id in ids:
+                if desde <= evento_id <= hasta:
+                    if evento_id > inicio:
+                        huecos.append([inicio, evento_id - 1, visto])
+                    inicio = evento_id + 1
+            if inicio <= hasta:
+                huecos.append([inicio, hasta, visto])
+
+        anterior = self.cursor.ultimo_id
+        for evento_id in ids:
+            if evento_id <= anterior:
+                continue
+            if evento_id > anterior + 1:
+                huecos.append([anterior + 1, evento_id - 1, ahora])
+            anterior = evento_id
+
+        self.cursor.ultimo_id = anterior
+        self.cursor.huecos = huecos
+        self.cursor.save(update_fields=['ultimo_id', 'huecos', 'fecha_actualizacion'])
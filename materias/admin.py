@@ -1,3 +1,23 @@
 from django.contrib import admin
+from .models import Comision, Correlatividad, Horario
 
-# Register your models here.
+
+@admin.register(Correlatividad)
+class CorrelatividadAdmin(admin.ModelAdmin):
+    list_display = ['materia', 'requisito']
+    list_filter = ['materia__carrera']
+    search_fields = ['materia__nombre', 'requisito__nombre']
+
+
+@admin.register(Horario)
+class HorarioAdmin(admin.ModelAdmin):
+    list_display = ['materia', 'dia', 'hora_inicio', 'hora_fin']
+    list_filter = ['dia', 'materia__carrera']
+    search_fields = ['materia__nombre']
+
+
+@admin.register(Comision)
+class ComisionAdmin(admin.ModelAdmin):
+    list_display = ['materia', 'nombre', 'cupo_maximo', 'docente', 'activa']
+    list_filter = ['activa', 'materia__carrera']
+    search_fields = ['materia__nombre', 'nombre']
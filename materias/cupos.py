@@ -0,0 +1,140 @@
+"""
+Difusión en tiempo real del estado de cupo de las materias
+Pub/sub en proceso que alimenta el stream SSE de cupos
+"""
+import asyncio
+import json
+import threading
+
+from django.db.models import Count
+
+from .models import Materia, INSCRIPCIONES_VIGENTES, anotacion_cupo_total
+
+
+# Cantidad máxima de eventos pendientes por suscriptor. Como cada evento
+# trae el estado completo de la materia, si el cliente se atrasa alcanza
+# con descartar los más viejos.
+MAX_EVENTOS_PENDIENTES = 50
+
+
+def serializar_cupo(materia_id, cupo_maximo, inscriptos):
+    """Arma el estado de cupo que se envía a los clientes"""
+    disponible = cupo_maximo - inscriptos
+    estado = Materia.estado_cupo_para(disponible)
+    return {
+        'materia_id': materia_id,
+        'inscriptos': inscriptos,
+        'cupo_maximo': cupo_maximo,
+        'cupo_disponible': disponible,
+        'tiene_cupo': disponible > 0,
+        'clase': estado['clase'],
+        'texto': estado['texto'],
+    }
+
+
+def _queryset_cupos(materia_ids):
+    """Una sola consulta con el conteo de inscriptos de todas las materias"""
+    return Materia.objects.filter(id__in=materia_ids).annotate(
+        inscriptos=Count('inscripciones', filter=INSCRIPCIONES_VIGENTES),
+        cupo_total=anotacion_cupo_total()
+    ).values('id', 'cupo_total', 'inscriptos')
+
+
+def snapshot_cupos(materia_ids):
+    """Retorna el estado de cupo actual de las materias indicadas"""
+    return [
+        serializar_cupo(fila['id'], fila['cupo_total'], fila['inscriptos'])
+        for fila in _queryset_cupos(materia_ids)
+    ]
+
+
+async def asnapshot_cupos(materia_ids):
+    """Versión asíncrona de snapshot_cupos para las vistas ASGI"""
+    return [
+        serializar_cupo(fila['id'], fila['cupo_total'], fila['inscriptos'])
+        async for fila in _queryset_cupos(materia_ids)
+    ]
+
+
+def formatear_evento(estado):
+    """Serializa un estado de cupo en formato Server-Sent Events"""
+    return f"event: cupo\ndata: {json.dumps(estado)}\n\n"
+
+
+class Suscripcion:
+    """
+    Suscripción de un cliente SSE a un conjunto de materias
+    Los eventos se entregan en una cola asyncio del event loop del cliente
+    """
+
+    def __init__(self, materia_ids, loop):
+        self.materia_ids = frozenset(materia_ids)
+        self.loop = loop
+        self.cola = asyncio.Queue(maxsize=MAX_EVENTOS_PENDIENTES)
+
+    def entregar(self, estado):
+        """Encola un evento descartando el más viejo si la cola está llena"""
+        if self.cola.full():
+            self.cola.get_nowait()
+        self.cola.put_nowait(estado)
+
+
+class CupoBroker:
+    """
+    Pub/sub en proceso de cambios de cupo
+    Los cambios se publican desde código sincrónico (vistas, modelos) y se
+    entregan a los streams asíncronos de forma thread-safe. Cada proceso
+    tiene su propio broker: con varios workers, cada uno notifica a sus
+    propios clientes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._suscriptores = {}
+
+    def suscribir(self, materia_ids):
+        """Registra una suscripción; debe llamarse dentro de un event loop"""
+        suscripcion = Suscripcion(materia_ids, asyncio.get_running_loop())
+        with self._lock:
+            for materia_id in suscripcion.materia_ids:
+                self._suscriptores.setdefault(materia_id, set()).add(suscripcion)
+        return suscripcion
+
+    def desuscribir(self, suscripcion):
+        """Elimina la suscripción de todas sus materias"""
+        with self._lock:
+            for materia_id in suscripcion.materia_ids:
+                suscriptores = self._suscriptores.get(materia_id)
+                if suscriptores is None:
+                    continue
+                suscriptores.discard(suscripcion)
+                if not suscriptores:
+                    del self._suscriptores[materia_id]
+
+    def tiene_suscriptores(self, materia_id):
+        """Verifica si alguna página está mirando la materia"""
+        return materia_id in self._suscriptores
+
+    def publicar(self, estado):
+        """Entrega el estado de cupo a todos los suscriptores de la materia"""
+        with self._lock:
+            suscriptores = list(self._suscriptores.get(estado['materia_id'], ()))
+        for suscripcion in suscriptores:
+            if suscripcion.loop.is_closed():
+                continue
+            suscripcion.loop.call_soon_threadsafe(suscripcion.entregar, estado)
+
+
+broker = CupoBroker()
+
+
+def notificar_cambio_cupo(materia_id):
+    """
+    Publica el nuevo estado de cupo de una materia
+    Hace una única lectura por cambio, sin importar cuántos clientes estén
+    conectados, y ninguna si nadie está mirando la materia.
+    """
+    if not broker.tiene_suscriptores(materia_id):
+        return
+    for estado in snapshot_cupos([materia_id]):
+        broker.publicar(estado)
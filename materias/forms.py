@@ -1,7 +1,10 @@
+from decimal import Decimal
+
 from django import forms
 from django.core.exceptions import ValidationError
 from .models import Materia
 from carreras.models import Carrera
+from inscripciones.models import Inscripcion
 from unidecode import unidecode
 
 
@@ -276,4 +279,75 @@ class InscripcionMateriaForm(forms.Form):
             'rows': 3,
             'placeholder': 'Observaciones opcionales sobre la inscripción'
         })
-    )
\ No newline at end of file
+    )
+
+class PlanillaNotasForm(forms.Form):
+    """
+    Planilla de notas de una materia: nota y estado por inscripción
+    Se valida todo en memoria; solo se devuelven las filas modificadas
+    para guardarlas juntas con bulk_update.
+    """
+    
+    NOTA_APROBACION = Decimal('4')
+    ESTADOS_CALIFICABLES = [
+        (valor, texto) for valor, texto in Inscripcion.ESTADOS_CHOICES if valor != 'baja'
+    ]
+    
+    def __init__(self, inscripciones, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.inscripciones = list(inscripciones)
+        for inscripcion in self.inscripciones:
+            self.fields[f'nota_{inscripcion.pk}'] = forms.DecimalField(
+                required=False,
+                min_value=0,
+                max_value=10,
+                max_digits=4,
+                decimal_places=2,
+                initial=inscripcion.nota_final,
+                widget=forms.NumberInput(attrs={
+                    'class': 'form-control form-control-sm',
+                    'step': '0.01',
+                    'style': 'width: 6rem;',
+                })
+            )
+            self.fields[f'estado_{inscripcion.pk}'] = forms.ChoiceField(
+                choices=self.ESTADOS_CALIFICABLES,
+                initial=inscripcion.estado,
+                widget=forms.Select(attrs={'class': 'form-select form-select-sm'})
+            )
+    
+    def filas(self):
+        """Ternas (inscripcion, campo nota, campo estado) para el template"""
+        return [
+            (inscripcion, self[f'nota_{inscripcion.pk}'], self[f'estado_{inscripcion.pk}'])
+            for inscripcion in self.inscripciones
+        ]
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        for inscripcion in self.inscripciones:
+            nota = cleaned_data.get(f'nota_{inscripcion.pk}')
+            estado = cleaned_data.get(f'estado_{inscripcion.pk}')
+            if estado == 'aprobado' and (nota is None or nota < self.NOTA_APROBACION):
+                self.add_error(
+                    f'nota_{inscripcion.pk}',
+                    f'Para aprobar la nota debe ser al menos {self.NOTA_APROBACION}.'
+                )
+            elif estado == 'desaprobado' and nota is not None and nota >= self.NOTA_APROBACION:
+                self.add_error(
+                    f'nota_{inscripcion.pk}',
+                    'Una nota de aprobación no corresponde al estado Desaprobado.'
+                )
+        return cleaned_data
+    
+    def get_modificadas(self):
+        """Inscripciones con nota o estado distintos, ya actualizadas en memoria"""
+        modificadas = []
+        for inscripcion in self.inscripciones:
+            nota = self.cleaned_data[f'nota_{inscripcion.pk}']
+            estado = self.cleaned_data[f'estado_{inscripcion.pk}']
+            if nota != inscripcion.nota_final or estado != inscripcion.estado:
+                inscripcion.nota_final = nota
+                inscripcion.estado = estado
+                modificadas.append(inscripcion)
+        return modificadas
@@ -0,0 +1,125 @@
+"""
+Detección de superposiciones horarias entre materias
+Cada franja se representa como un intervalo en minutos desde el lunes a
+las 00:00; ordenando los intervalos por inicio, una sola pasada alcanza
+para encontrar superposiciones (O(k log k + p) para k franjas y p pares de
+franjas que se superponen).
+"""
+import heapq
+
+from django.core.cache import caches
+from django.db.models import Q
+
+from carreras.catalogo import get_carrera_version
+from .models import Horario
+
+
+MINUTOS_POR_DIA = 24 * 60
+
+CONFLICTOS_KEY = 'horarios:conflictos:{}:{}'
+
+
+def minutos_semana(dia, hora):
+    """Convierte día y hora en minutos desde el inicio de la semana"""
+    return dia * MINUTOS_POR_DIA + hora.hour * 60 + hora.minute
+
+
+def comparten_cuatrimestre(cuatrimestre_a, cuatrimestre_b):
+    """Dos materias se cursan a la vez si son del mismo cuatrimestre o alguna es anual"""
+    return cuatrimestre_a == cuatrimestre_b or 0 in (cuatrimestre_a, cuatrimestre_b)
+
+
+def _intervalos(filas):
+    """Arma los intervalos (inicio, fin, materia_id, cuatrimestre) ordenados por inicio"""
+    return sorted(
+        (
+            minutos_semana(fila['dia'], fila['hora_inicio']),
+            minutos_semana(fila['dia'], fila['hora_fin']),
+            fila['materia_id'],
+            fila['materia__cuatrimestre'],
+        )
+        for fila in filas
+    )
+
+
+def pares_superpuestos(filas):
+    """
+    Retorna el conjunto de pares (materia_a, materia_b) con franjas que se
+    superponen. Barrido por inicio manteniendo las franjas todavía abiertas
+    en un heap ordenado por fin: las que terminaron se descartan desde la
+    cima, y cada franja solo se compara con las que siguen en curso.
+    """
+    pares = set()
+    abiertas = []  # heap de (fin, materia_id, cuatrimestre)
+    for inicio, fin, materia_id, cuatrimestre in _intervalos(filas):
+        while abiertas and abiertas[0][0] <= inicio:
+            heapq.heappop(abiertas)
+        for _, otra_id, otro_cuatrimestre in abiertas:
+            if otra_id != materia_id and comparten_cuatrimestre(cuatrimestre, otro_cuatrimestre):
+                pares.add((min(materia_id, otra_id), max(materia_id, otra_id)))
+        heapq.heappush(abiertas, (fin, materia_id, cuatrimestre))
+    return pares
+
+
+def _filas_horarios(queryset, *campos):
+    return queryset.values('materia_id', 'materia__cuatrimestre', 'dia', 'hora_inicio', 'hora_fin', *campos)
+
+
+def calcular_matriz_conflictos(carrera_id):
+    """Calcula, para cada materia de la carrera, las materias con las que choca"""
+    filas = _filas_horarios(
+        Horario.objects.filter(materia__carrera_id=carrera_id, materia__activa=True)
+    )
+    matriz = {}
+    for materia_a, materia_b in pares_superpuestos(filas):
+        matriz.setdefault(materia_a, set()).add(materia_b)
+        matriz.setdefault(materia_b, set()).add(materia_a)
+    return matriz
+
+
+def get_matriz_conflictos(carrera_id):
+    """
+    Matriz de conflictos de la carrera, precalculada y cacheada por versión:
+    cualquier cambio de horarios o materias de la carrera genera una nueva
+    """
+    cache = caches['catalog']
+    key = CONFLICTOS_KEY.format(carrera_id, get_carrera_version(carrera_id))
+    matriz = cache.get(key)
+    if matriz is None:
+        matriz = calcular_matriz_conflictos(carrera_id)
+        cache.set(key, matriz)
+    return matriz
+
+
+def materias_en_conflicto(matriz, materias_inscriptas):
+    """Materias de la matriz que chocan con alguna de las inscriptas"""
+    inscriptas = set(materias_inscriptas)
+    return sorted(
+        materia_id for materia_id, otras in matriz.items()
+        if materia_id not in inscriptas and otras & inscriptas
+    )
+
+
+def superposicion_con_inscripciones(alumno, materia):
+    """
+    Retorna el nombre de la primera materia inscripta del alumno que se
+    superpone en horario con `materia`, o None si no hay conflicto.
+    Una sola consulta trae las franjas (y los nombres) de la materia y de
+    las inscriptas.
+    """
+    filas = list(_filas_horarios(
+        Horario.objects.filter(
+            Q(materia=materia) |
+            Q(
+                materia__inscripciones__alumno=alumno,
+                materia__inscripciones__activa=True,
+                materia__inscripciones__periodo__actual=True,
+            )
+        ).distinct(),
+        'materia__nombre',
+    ))
+    nombres = {fila['materia_id']: fila['materia__nombre'] for fila in filas}
+    for materia_a, materia_b in pares_superpuestos(filas):
+        if materia.pk in (materia_a, materia_b):
+            return nombres[materia_b if materia_a == materia.pk else materia_a]
+    return None
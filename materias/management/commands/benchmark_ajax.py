@@ -0,0 +1,157 @@
+"""
+Comando para comparar el rendimiento de las vistas AJAX bajo WSGI y ASGI
+Uso: python manage.py benchmark_ajax --clientes 500 --servidor ambos
+
+Levanta un servidor local por cada modo (el servidor WSGI con hilos de
+Django y uvicorn para ASGI) y dispara solicitudes concurrentes contra los
+endpoints AJAX, reportando solicitudes por segundo y latencias.
+"""
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from carreras.models import Carrera
+from materias.models import Materia
+from alumnos.models import Alumno
+
+
+class Command(BaseCommand):
+    help = 'Compara el throughput de las vistas AJAX bajo WSGI y ASGI'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clientes', type=int, default=500,
+                            help='Clientes concurrentes (por defecto 500)')
+        parser.add_argument('--solicitudes', type=int, default=10,
+                            help='Solicitudes por cliente (por defecto 10)')
+        parser.add_argument('--servidor', choices=['wsgi', 'asgi', 'ambos'], default='ambos')
+        parser.add_argument('--puerto', type=int, default=8765,
+                            help='Puerto base para los servidores locales')
+
+    def handle(self, *args, **options):
+        rutas = self.obtener_rutas()
+        modos = ['wsgi', 'asgi'] if options['servidor'] == 'ambos' else [options['servidor']]
+
+        if 'asgi' in modos:
+            try:
+                import uvicorn  # noqa: F401
+            except ImportError:
+                raise CommandError('Para medir ASGI instale uvicorn: pip install uvicorn')
+
+        self.stdout.write(self.style.SUCCESS('=' * 60))
+        self.stdout.write(self.style.SUCCESS(
+            f'   BENCHMARK AJAX - {options["clientes"]} clientes x {options["solicitudes"]} solicitudes'
+        ))
+        self.stdout.write(self.style.SUCCESS('=' * 60))
+
+        for indice, modo in enumerate(modos):
+            puerto = options['puerto'] + indice
+            servidor = self.iniciar_servidor(modo, puerto)
+            try:
+                self.esperar_servidor(puerto)
+                for nombre, ruta in rutas:
+                    resultado = asyncio.run(self.medir(
+                        puerto, ruta, options['clientes'], options['solicitudes']
+                    ))
+                    self.reportar(modo, nombre, resultado)
+            finally:
+                servidor.terminate()
+                servidor.wait(timeout=10)
+
+    def obtener_rutas(self):
+        """Arma las URLs de los cuatro endpoints con datos existentes"""
+        materia = Materia.objects.filter(activa=True).first()
+        alumno = Alumno.objects.first()
+        if not materia or not alumno or not Carrera.objects.exists():
+            raise CommandError('Se necesitan al menos una carrera, una materia activa y un alumno cargados.')
+
+        return [
+            ('materias_por_carrera_ajax', f'/materias/ajax/por-carrera/?carrera_id={materia.carrera_id}'),
+            ('verificar_cupo_ajax', f'/materias/ajax/verificar-cupo/?materia_id={materia.pk}'),
+            ('obtener_materias_por_alumno', f'/inscripciones/ajax/materias-por-alumno/?alumno_id={alumno.pk}'),
+            ('carreras_activas_json', '/carreras/api/activas/'),
+        ]
+
+    def iniciar_servidor(self, modo, puerto):
+        """Levanta el servidor local en un subproceso"""
+        if modo == 'wsgi':
+            comando = [sys.executable, 'manage.py', 'runserver', '--noreload', f'127.0.0.1:{puerto}']
+        else:
+            comando = [
+                sys.executable, '-m', 'uvicorn', 'gestion_academica.asgi:application',
+                '--host', '127.0.0.1', '--port', str(puerto), '--log-level', 'warning',
+            ]
+        return subprocess.Popen(
+            comando,
+            cwd=settings.BASE_DIR,
+            env=os.environ.copy(),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+
+    def esperar_servidor(self, puerto, timeout=30):
+        """Espera a que el servidor acepte conexiones"""
+        limite = time.monotonic() + timeout
+        while time.monotonic() < limite:
+            try:
+                with socket.create_connection(('127.0.0.1', puerto), timeout=1):
+                    return
+            except OSError:
+                time.sleep(0.2)
+        raise CommandError(f'El servidor en el puerto {puerto} no respondió a tiempo.')
+
+    async def medir(self, puerto, ruta, clientes, solicitudes):
+        """Ejecuta los clientes concurrentes y junta las latencias"""
+        latencias = []
+        errores = 0
+        solicitud = (
+            f'GET {ruta} HTTP/1.1\r\n'
+            f'Host: 127.0.0.1:{puerto}\r\n'
+            'X-Requested-With: XMLHttpRequest\r\n'
+            'Connection: close\r\n\r\n'
+        ).encode()
+
+        async def cliente():
+            nonlocal errores
+            for _ in range(solicitudes):
+                inicio = time.perf_counter()
+                try:
+                    reader, writer = await asyncio.open_connection('127.0.0.1', puerto)
+                    writer.write(solicitud)
+                    await writer.drain()
+                    respuesta = await reader.read()
+                    writer.close()
+                    if not respuesta.startswith(b'HTTP/1.1 200') and not respuesta.startswith(b'HTTP/1.0 200'):
+                        errores += 1
+                        continue
+                except OSError:
+                    errores += 1
+                    continue
+                latencias.append(time.perf_counter() - inicio)
+
+        inicio = time.perf_counter()
+        await asyncio.gather(*(cliente() for _ in range(clientes)))
+        duracion = time.perf_counter() - inicio
+        return {'latencias': sorted(latencias), 'errores': errores, 'duracion': duracion}
+
+    def reportar(self, modo, nombre, resultado):
+        """Imprime throughput y percentiles de latencia"""
+        latencias = resultado['latencias']
+        exitosas = len(latencias)
+        throughput = exitosas / resultado['duracion'] if resultado['duracion'] else 0
+
+        def percentil(p):
+            if not latencias:
+                return 0
+            return latencias[min(exitosas - 1, int(exitosas * p))] * 1000
+
+        self.stdout.write(
+            f'   {modo.upper():<5} {nombre:<28} {throughput:8.1f} req/s   '
+            f'p50 {percentil(0.50):7.1f} ms   p95 {percentil(0.95):7.1f} ms   '
+            f'errores {resultado["errores"]}'
+        )
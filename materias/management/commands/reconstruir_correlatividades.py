@@ -0,0 +1,30 @@
+"""
+Comando para reconstruir la clausura transitiva de correlatividades
+Uso: python manage.py reconstruir_correlatividades [--carrera ID]
+
+La clausura se mantiene sola al guardar o borrar correlatividades desde la
+aplicación; este comando sirve después de cargas masivas o restauraciones.
+"""
+from django.core.management.base import BaseCommand
+from carreras.models import Carrera
+from materias.models import CorrelatividadTransitiva
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye la tabla de correlatividades transitivas por carrera'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--carrera', type=int,
+                            help='ID de la carrera (por defecto, todas)')
+
+    def handle(self, *args, **options):
+        carreras = Carrera.objects.all()
+        if options['carrera']:
+            carreras = carreras.filter(pk=options['carrera'])
+
+        for carrera in carreras:
+            CorrelatividadTransitiva.reconstruir(carrera.pk)
+            total = CorrelatividadTransitiva.objects.filter(carrera=carrera).count()
+            self.stdout.write(f'   {carrera.nombre}: {total} relaciones')
+
+        self.stdout.write(self.style.SUCCESS('✅ Correlatividades reconstruidas.'))
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.6 on 2026-10-19 12:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('carreras', '0001_initial'),
+        ('materias', '0002_materia_docente'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Correlatividad',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('materia', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='correlatividades', to='materias.materia', verbose_name='Materia')),
+                ('requisito', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='habilita', to='materias.materia', verbose_name='Materia Requerida')),
+            ],
+            options={
+                'verbose_name': 'Correlatividad',
+                'verbose_name_plural': 'Correlatividades',
+                'unique_together': {('materia', 'requisito')},
+            },
+        ),
+        migrations.CreateModel(
+            name='CorrelatividadTransitiva',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('carrera', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='correlatividades_transitivas', to='carreras.carrera', verbose_name='Carrera')),
+                ('materia', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='requisitos_transitivos', to='materias.materia', verbose_name='Materia')),
+                ('requisito', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='materias.materia', verbose_name='Materia Requerida')),
+            ],
+            options={
+                'verbose_name': 'Correlatividad Transitiva',
+                'verbose_name_plural': 'Correlatividades Transitivas',
+                'unique_together': {('materia', 'requisito')},
+            },
+        ),
+    ]
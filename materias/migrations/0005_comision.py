@@ -0,0 +1,34 @@
+# Generated by Django 5.2.6 on 2026-10-19 12:41
+
+import django.core.validators
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('materias', '0004_horario'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Comision',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=20, verbose_name='Nombre')),
+                ('cupo_maximo', models.PositiveIntegerField(default=30, validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(100)], verbose_name='Cupo Máximo')),
+                ('activa', models.BooleanField(default=True, verbose_name='Activa')),
+                ('docente', models.ForeignKey(blank=True, limit_choices_to={'rol': 'docente'}, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='comisiones_asignadas', to=settings.AUTH_USER_MODEL, verbose_name='Docente')),
+                ('materia', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='comisiones', to='materias.materia', verbose_name='Materia')),
+            ],
+            options={
+                'verbose_name': 'Comisión',
+                'verbose_name_plural': 'Comisiones',
+                'ordering': ['materia', 'nombre'],
+                'unique_together': {('materia', 'nombre')},
+            },
+        ),
+    ]
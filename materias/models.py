@@ -1,9 +1,19 @@
-from django.db import models
+from django.db import models, transaction
+from django.core.exceptions import ValidationError
+from django.db.models.functions import Coalesce
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.urls import reverse
 from carreras.models import Carrera
+from carreras.catalogo import invalidar_catalogo
 
 
+# Inscripciones que ocupan cupo: las activas del período lectivo actual.
+# Para anotaciones con Count, que no pasan por el manager de Inscripcion.
+INSCRIPCIONES_VIGENTES = models.Q(
+    inscripciones__activa=True,
+    inscripciones__periodo__actual=True
+)
+
 class Materia(models.Model):
     """
     Modelo para las materias de las carreras
@@ -95,13 +105,55 @@ class Materia(models.Model):
     def get_absolute_url(self):
         return reverse('materias:detalle', kwargs={'pk': self.pk})
     
+    def save(self, *args, **kwargs):
+        """Guarda la materia e invalida los fragmentos cacheados del catálogo"""
+        super().save(*args, **kwargs)
+        carrera_id = self.carrera_id
+        transaction.on_commit(lambda: invalidar_catalogo(carrera_id))
+    
+    def delete(self, *args, **kwargs):
+        carrera_id = self.carrera_id
+        resultado = super().delete(*args, **kwargs)
+        transaction.on_commit(lambda: invalidar_catalogo(carrera_id))
+        return resultado
+    
     def get_inscriptos_count(self):
-        """Retorna la cantidad de alumnos inscriptos"""
+        """
+        Retorna la cantidad de alumnos inscriptos
+        Usa la anotación `inscriptos` de los listados si está presente
+        """
+        if hasattr(self, 'inscriptos'):
+            return self.inscriptos
         return self.inscripciones.filter(activa=True).count()
     
+    async def aget_inscriptos_count(self):
+        """
+        Versión asíncrona de get_inscriptos_count
+        Filtra por periodo__actual en la misma consulta: el manager por
+        defecto resuelve el período actual con una consulta sincrónica.
+        """
+        if hasattr(self, 'inscriptos'):
+            return self.inscriptos
+        return await self.inscripciones.model.historico.filter(
+            materia=self, activa=True, periodo__actual=True
+        ).acount()
+    
+    def get_cupo_total(self):
+        """
+        Retorna el cupo total: la suma de las comisiones activas o, si la
+        materia no está dividida en comisiones, su cupo máximo.
+        Usa la anotación `cupo_total` de los listados si está presente.
+        """
+        if not hasattr(self, 'cupo_total'):
+            total = self.comisiones.filter(activa=True).aggregate(
+                total=models.Sum('cupo_maximo')
+            )['total']
+            self.cupo_total = self.cupo_maximo if total is None else total
+        return self.cupo_total
+    
     def get_cupo_disponible(self):
         """Retorna el cupo disponible"""
-        return self.cupo_maximo - self.get_inscriptos_count()
+        return self.get_cupo_total() - self.get_inscriptos_count()
     
     def tiene_cupo_disponible(self):
         """Verifica si hay cupo disponible"""
@@ -111,6 +163,28 @@ class Materia(models.Model):
         """Verifica si la materia puede eliminarse (no tiene inscripciones activas)"""
         return not self.inscripciones.filter(activa=True).exists()
     
+    def elegir_comision(self):
+        """
+        Motor de asignación: retorna la comisión activa menos ocupada (en
+        proporción a su cupo) que todavía tenga lugar, o None si la materia
+        no tiene comisiones. Debe llamarse con la fila de la materia
+        bloqueada para que dos inscripciones no elijan el mismo último lugar.
+        """
+        comisiones = list(
+            self.comisiones.filter(activa=True).annotate(
+                inscriptos=models.Count('inscripciones', filter=models.Q(
+                    inscripciones__activa=True,
+                    inscripciones__periodo__actual=True
+                ))
+            )
+        )
+        if not comisiones:
+            return None
+        libres = [c for c in comisiones if c.inscriptos < c.cupo_maximo]
+        if not libres:
+            raise ValidationError('No hay cupo disponible en ninguna comisión')
+        return min(libres, key=lambda c: (c.inscriptos / c.cupo_maximo, c.inscriptos, c.pk))
+    
     def get_cuatrimestre_display_short(self):
         """Retorna una versión corta del cuatrimestre"""
         if self.cuatrimestre == 0:
@@ -119,10 +193,302 @@ class Materia(models.Model):
     
     def get_estado_cupo(self):
         """Retorna el estado del cupo para mostrar en templates"""
-        disponible = self.get_cupo_disponible()
-        if disponible == 0:
+        return self.estado_cupo_para(self.get_cupo_disponible())
+    
+    @staticmethod
+    def estado_cupo_para(disponible):
+        """Retorna el estado del cupo para una cantidad de lugares disponibles"""
+        if disponible <= 0:
             return {'clase': 'danger', 'texto': 'Sin cupo'}
         elif disponible <= 5:
             return {'clase': 'warning', 'texto': f'{disponible} disponibles'}
         else:
             return {'clase': 'success', 'texto': f'{disponible} disponibles'}
+
+
+def anotacion_cupo_total():
+    """
+    Expresión para anotar el cupo total de cada materia en una sola
+    consulta: suma de sus comisiones activas o, si no tiene, cupo_maximo
+    """
+    cupo_comisiones = Comision.objects.filter(
+        materia=models.OuterRef('pk'), activa=True
+    ).values('materia').annotate(total=models.Sum('cupo_maximo')).values('total')
+    return Coalesce(models.Subquery(cupo_comisiones), models.F('cupo_maximo'))
+
+
+class Comision(models.Model):
+    """
+    Comisión de una materia, con su propio cupo y docente
+    Las materias con mucha demanda se dividen en comisiones y cada
+    inscripción se asigna a la menos ocupada.
+    """
+    
+    materia = models.ForeignKey(
+        Materia,
+        on_delete=models.CASCADE,
+        related_name='comisiones',
+        verbose_name='Materia'
+    )
+    
+    nombre = models.CharField(
+        max_length=20,
+        verbose_name='Nombre'
+    )
+    
+    cupo_maximo = models.PositiveIntegerField(
+        default=30,
+        validators=[MinValueValidator(1), MaxValueValidator(100)],
+        verbose_name='Cupo Máximo'
+    )
+    
+    docente = models.ForeignKey(
+        'usuarios.Usuario',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        limit_choices_to={'rol': 'docente'},
+        related_name='comisiones_asignadas',
+        verbose_name='Docente'
+    )
+    
+    activa = models.BooleanField(
+        default=True,
+        verbose_name='Activa'
+    )
+    
+    class Meta:
+        verbose_name = 'Comisión'
+        verbose_name_plural = 'Comisiones'
+        unique_together = ['materia', 'nombre']
+        ordering = ['materia', 'nombre']
+    
+    def __str__(self):
+        return f"{self.materia.nombre} - Comisión {self.nombre}"
+    
+    def save(self, *args, **kwargs):
+        """Guarda la comisión e invalida los fragmentos de su carrera (cambia el cupo)"""
+        super().save(*args, **kwargs)
+        carrera_id = self.materia.carrera_id
+        transaction.on_commit(lambda: invalidar_catalogo(carrera_id))
+    
+    def delete(self, *args, **kwargs):
+        carrera_id = self.materia.carrera_id
+        resultado = super().delete(*args, **kwargs)
+        transaction.on_commit(lambda: invalidar_catalogo(carrera_id))
+        return resultado
+    
+    def get_inscriptos_count(self):
+        """Retorna la cantidad de alumnos inscriptos en la comisión"""
+        return self.inscripciones.filter(activa=True).count()
+    
+    def tiene_cupo_disponible(self):
+        """Verifica si la comisión tiene lugar"""
+        return self.get_inscriptos_count() < self.cupo_maximo
+
+
+class Horario(models.Model):
+    """
+    Franja horaria semanal de cursada de una materia
+    """
+    
+    DIAS_CHOICES = [
+        (0, 'Lunes'),
+        (1, 'Martes'),
+        (2, 'Miércoles'),
+        (3, 'Jueves'),
+        (4, 'Viernes'),
+        (5, 'Sábado'),
+    ]
+    
+    materia = models.ForeignKey(
+        Materia,
+        on_delete=models.CASCADE,
+        related_name='horarios',
+        verbose_name='Materia'
+    )
+    
+    dia = models.PositiveSmallIntegerField(
+        choices=DIAS_CHOICES,
+        verbose_name='Día'
+    )
+    
+    hora_inicio = models.TimeField(
+        verbose_name='Hora de Inicio'
+    )
+    
+    hora_fin = models.TimeField(
+        verbose_name='Hora de Fin'
+    )
+    
+    class Meta:
+        verbose_name = 'Horario'
+        verbose_name_plural = 'Horarios'
+        ordering = ['dia', 'hora_inicio']
+    
+    def __str__(self):
+        return f"{self.get_dia_display()[:3]} {self.hora_inicio:%H:%M}-{self.hora_fin:%H:%M}"
+    
+    def clean(self):
+        """Valida que la franja tenga duración positiva"""
+        if self.hora_inicio and self.hora_fin and self.hora_fin <= self.hora_inicio:
+            raise ValidationError('La hora de fin debe ser posterior a la de inicio')
+    
+    def save(self, *args, **kwargs):
+        """Guarda el horario e invalida los fragmentos y conflictos de la carrera"""
+        self.full_clean()
+        super().save(*args, **kwargs)
+        carrera_id = self.materia.carrera_id
+        transaction.on_commit(lambda: invalidar_catalogo(carrera_id))
+    
+    def delete(self, *args, **kwargs):
+        carrera_id = self.materia.carrera_id
+        resultado = super().delete(*args, **kwargs)
+        transaction.on_commit(lambda: invalidar_catalogo(carrera_id))
+        return resultado
+
+
+class Correlatividad(models.Model):
+    """
+    Correlatividad directa entre materias de una misma carrera:
+    para cursar `materia` hay que tener aprobada `requisito`
+    """
+    
+    materia = models.ForeignKey(
+        Materia,
+        on_delete=models.CASCADE,
+        related_name='correlatividades',
+        verbose_name='Materia'
+    )
+    
+    requisito = models.ForeignKey(
+        Materia,
+        on_delete=models.CASCADE,
+        related_name='habilita',
+        verbose_name='Materia Requerida'
+    )
+    
+    class Meta:
+        verbose_name = 'Correlatividad'
+        verbose_name_plural = 'Correlatividades'
+        unique_together = ['materia', 'requisito']
+    
+    def __str__(self):
+        return f"{self.materia.nombre} requiere {self.requisito.nombre}"
+    
+    def clean(self):
+        """Valida que la correlatividad no forme ciclos ni cruce carreras"""
+        if self.materia_id and self.requisito_id:
+            if self.materia_id == self.requisito_id:
+                raise ValidationError('Una materia no puede ser correlativa de sí misma')
+            if self.materia.carrera_id != self.requisito.carrera_id:
+                raise ValidationError('Las materias correlativas deben ser de la misma carrera')
+            # Se recorre el grafo de la tabla directa y no la clausura
+            # precalculada: esta se reconstruye recién al confirmar, así que
+            # no ve las correlatividades agregadas en la misma transacción
+            aristas = Correlatividad.objects.filter(
+                materia__carrera_id=self.materia.carrera_id
+            ).exclude(pk=self.pk).values_list('materia_id', 'requisito_id')
+            if self.materia_id in calcular_clausura(aristas).get(self.requisito_id, ()):
+                raise ValidationError(
+                    f'{self.requisito.nombre} ya requiere (directa o indirectamente) '
+                    f'a {self.materia.nombre}'
+                )
+    
+    def save(self, *args, **kwargs):
+        """Guarda la correlatividad y reconstruye la clausura de la carrera"""
+        self.full_clean()
+        super().save(*args, **kwargs)
+        carrera_id = self.materia.carrera_id
+        transaction.on_commit(lambda: CorrelatividadTransitiva.reconstruir(carrera_id))
+    
+    def delete(self, *args, **kwargs):
+        carrera_id = self.materia.carrera_id
+        resultado = super().delete(*args, **kwargs)
+        transaction.on_commit(lambda: CorrelatividadTransitiva.reconstruir(carrera_id))
+        return resultado
+
+
+def calcular_clausura(aristas):
+    """
+    Calcula la clausura transitiva de un grafo de correlatividades
+    Recibe pares (materia_id, requisito_id) y retorna un dict
+    materia_id -> conjunto de todos sus requisitos directos e indirectos
+    """
+    directos = {}
+    for materia_id, requisito_id in aristas:
+        directos.setdefault(materia_id, set()).add(requisito_id)
+    
+    clausura = {}
+    
+    def requisitos_de(materia_id, visitando):
+        if materia_id in clausura:
+            return clausura[materia_id]
+        visitando.add(materia_id)
+        resultado = set()
+        for requisito_id in directos.get(materia_id, ()):
+            resultado.add(requisito_id)
+            # Un ciclo no debería existir (clean lo impide); si aparece se corta
+            if requisito_id not in visitando:
+                resultado |= requisitos_de(requisito_id, visitando)
+        visitando.discard(materia_id)
+        clausura[materia_id] = resultado
+        return resultado
+    
+    for materia_id in directos:
+        requisitos_de(materia_id, set())
+    return clausura
+
+
+class CorrelatividadTransitiva(models.Model):
+    """
+    Clausura transitiva de las correlatividades de cada carrera
+    Tabla precalculada: contiene un registro por cada requisito directo o
+    indirecto de cada materia, de modo que verificar correlativas no
+    requiere recorrer el grafo en cada inscripción. Se reconstruye
+    completa para la carrera cada vez que cambia una correlatividad.
+    """
+    
+    carrera = models.ForeignKey(
+        Carrera,
+        on_delete=models.CASCADE,
+        related_name='correlatividades_transitivas',
+        verbose_name='Carrera'
+    )
+    
+    materia = models.ForeignKey(
+        Materia,
+        on_delete=models.CASCADE,
+        related_name='requisitos_transitivos',
+        verbose_name='Materia'
+    )
+    
+    requisito = models.ForeignKey(
+        Materia,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Materia Requerida'
+    )
+    
+    class Meta:
+        verbose_name = 'Correlatividad Transitiva'
+        verbose_name_plural = 'Correlatividades Transitivas'
+        unique_together = ['materia', 'requisito']
+    
+    def __str__(self):
+        return f"{self.materia_id} -> {self.requisito_id}"
+    
+    @classmethod
+    def reconstruir(cls, carrera_id):
+        """Recalcula la clausura de una carrera a partir de sus correlatividades"""
+        aristas = Correlatividad.objects.filter(
+            materia__carrera_id=carrera_id
+        ).values_list('materia_id', 'requisito_id')
+        clausura = calcular_clausura(aristas)
+        with transaction.atomic():
+            cls.objects.filter(carrera_id=carrera_id).delete()
+            cls.objects.bulk_create([
+                cls(carrera_id=carrera_id, materia_id=materia_id, requisito_id=requisito_id)
+                for materia_id, requisitos in clausura.items()
+                for requisito_id in requisitos
+            ])
@@ -22,4 +22,8 @@ urlpatterns = [
     # Vistas AJAX
     path('ajax/por-carrera/', views.materias_por_carrera_ajax, name='ajax_por_carrera'),
     path('ajax/verificar-cupo/', views.verificar_cupo_ajax, name='ajax_verificar_cupo'),
+    path('ajax/cupos/', views.cupos_ajax, name='ajax_cupos'),
+    
+    # Stream de cupos en tiempo real (SSE), solo bajo ASGI
+    path('stream/cupos/', views.cupos_stream, name='stream_cupos'),
 ]
@@ -1,14 +1,26 @@
+import asyncio
+
 from django.shortcuts import render, redirect, get_object_or_404
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib import messages
 from django.urls import reverse_lazy
+from django.db import transaction
 from django.db.models import Count, F, Q
-from django.http import JsonResponse
-from .models import Materia
-from .forms import MateriaForm, FiltroMateriaForm
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, JsonResponse, StreamingHttpResponse, HttpResponseBadRequest
+from .models import Materia, INSCRIPCIONES_VIGENTES, anotacion_cupo_total
+from .cupos import broker, asnapshot_cupos, snapshot_cupos, formatear_evento
+from .horarios import get_matriz_conflictos, materias_en_conflicto
+from .forms import MateriaForm, FiltroMateriaForm, PlanillaNotasForm
 from carreras.models import Carrera
+from inscripciones.models import Inscripcion
+from inscripciones.registro import registrar_calificaciones
+from auditoria.eventos import registrar_muchos
+from integraciones.outbox import publicar_muchos
+from carreras.catalogo import get_carrera_version
 from usuarios.views import AdminRequiredMixin
+from gestion_academica.db_routing import LecturaReplicaMixin
 
 
 class DocenteRequiredMixin(LoginRequiredMixin):
@@ -23,7 +35,7 @@ class DocenteRequiredMixin(LoginRequiredMixin):
         return super().dispatch(request, *args, **kwargs)
 
 
-class MateriaListView(ListView):
+class MateriaListView(LecturaReplicaMixin, ListView):
     """Vista para listar materias con filtros avanzados"""
     model = Materia
     template_name = 'materias/lista.html'
@@ -32,7 +44,8 @@ class MateriaListView(ListView):
     
     def get_queryset(self):
         queryset = Materia.objects.select_related('carrera').annotate(
-            inscriptos=Count('inscripciones', filter=Q(inscripciones__activa=True))
+            inscriptos=Count('inscripciones', filter=INSCRIPCIONES_VIGENTES),
+            cupo_total=anotacion_cupo_total()
         )
         
         # Aplicar filtros desde GET parameters
@@ -50,7 +63,7 @@ class MateriaListView(ListView):
         
         con_cupo = self.request.GET.get('con_cupo')
         if con_cupo:
-            queryset = queryset.filter(inscriptos__lt=F('cupo_maximo'))
+            queryset = queryset.filter(inscriptos__lt=F('cupo_total'))
         
         buscar = self.request.GET.get('buscar')
         if buscar:
@@ -75,7 +88,7 @@ class MateriaListView(ListView):
         queryset_completo = self.get_queryset()
         context['materias_activas'] = queryset_completo.filter(activa=True).count()
         context['materias_con_cupo'] = queryset_completo.filter(
-            inscriptos__lt=F('cupo_maximo'), activa=True
+            inscriptos__lt=F('cupo_total'), activa=True
         ).count()
         context['total_inscripciones'] = sum(
             materia.inscriptos for materia in queryset_completo if hasattr(materia, 'inscriptos')
@@ -93,6 +106,17 @@ class MateriaDetailView(DetailView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
+        context.update(contexto_cupos(self.request))
+        
+        # Comisiones con su ocupación en una sola consulta
+        context['comisiones'] = self.object.comisiones.filter(activa=True).select_related(
+            'docente'
+        ).annotate(
+            inscriptos=Count('inscripciones', filter=Q(
+                inscripciones__activa=True, inscripciones__periodo__actual=True
+            ))
+        )
+        
         # Obtener inscripciones activas (para administradores y docentes de la materia)
         if self.request.user.is_authenticated:
             es_admin = self.request.user.rol == 'administrador'
@@ -102,7 +126,7 @@ class MateriaDetailView(DetailView):
             if es_admin or es_docente_materia:
                 context['inscripciones'] = self.object.inscripciones.filter(
                     activa=True
-                ).select_related('alumno').order_by('fecha_inscripcion')
+                ).select_related('alumno', 'comision').order_by('fecha_inscripcion')
                 context['puede_ver_inscripciones'] = True
         
         # Verificar si el alumno puede inscribirse (está inscrito en la carrera y no en la materia)
@@ -197,7 +221,7 @@ class MateriaDeleteView(AdminRequiredMixin, DeleteView):
         return response
 
 
-class MateriasPorCarreraView(ListView):
+class MateriasPorCarreraView(LecturaReplicaMixin, ListView):
     """Vista de materias filtradas por carrera"""
     model = Materia
     template_name = 'materias/por_carrera.html'
@@ -210,12 +234,15 @@ class MateriasPorCarreraView(ListView):
             carrera=self.carrera, 
             activa=True
         ).annotate(
-            inscriptos=Count('inscripciones', filter=Q(inscripciones__activa=True))
-        ).order_by('anio_cursado', 'cuatrimestre', 'nombre')
+            inscriptos=Count('inscripciones', filter=INSCRIPCIONES_VIGENTES),
+            cupo_total=anotacion_cupo_total()
+        ).prefetch_related('horarios').order_by('anio_cursado', 'cuatrimestre', 'nombre')
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['carrera'] = self.carrera
+        context['carrera_version'] = get_carrera_version(self.carrera.pk)
+        context.update(contexto_cupos(self.request))
         
         # Calcular total de horas
         materias_list = context['materias']
@@ -229,6 +256,13 @@ class MateriasPorCarreraView(ListView):
                 carreras_activas = alumno.get_carreras_activas()
                 context['puede_inscribirse'] = self.carrera in carreras_activas
                 context['alumno'] = alumno
+                if context['puede_inscribirse']:
+                    # Materias que chocan en horario con las que ya cursa,
+                    # a partir de la matriz precalculada de la carrera
+                    inscriptas = alumno.inscripciones.filter(activa=True).values_list('materia_id', flat=True)
+                    context['materias_en_conflicto'] = materias_en_conflicto(
+                        get_matriz_conflictos(self.carrera.pk), inscriptas
+                    )
             except:
                 context['puede_inscribirse'] = False
         else:
@@ -246,14 +280,15 @@ class MateriasConCupoView(ListView):
     
     def get_queryset(self):
         return Materia.objects.filter(activa=True).annotate(
-            inscriptos=Count('inscripciones', filter=Q(inscripciones__activa=True))
-        ).filter(inscriptos__lt=F('cupo_maximo')).select_related('carrera').order_by(
+            inscriptos=Count('inscripciones', filter=INSCRIPCIONES_VIGENTES),
+            cupo_total=anotacion_cupo_total()
+        ).filter(inscriptos__lt=F('cupo_total')).select_related('carrera').order_by(
             'carrera__nombre', 'anio_cursado', 'cuatrimestre', 'nombre'
         )
 
 
-# Vista AJAX para obtener materias por carrera (útil para formularios dinámicos)
-def materias_por_carrera_ajax(request):
+# Vistas AJAX (útiles para formularios dinámicos)
+async def materias_por_carrera_ajax(request):
     """Vista AJAX para obtener materias de una carrera específica"""
     if request.method == 'GET' and request.headers.get('x-requested-with') == 'XMLHttpRequest':
         carrera_id = request.GET.get('carrera_id')
@@ -264,25 +299,30 @@ def materias_por_carrera_ajax(request):
             ).values('id', 'nombre', 'codigo', 'anio_cursado', 'cuatrimestre')
             
             return JsonResponse({
-                'materias': list(materias),
+                'materias': [materia async for materia in materias],
                 'success': True
             })
     
     return JsonResponse({'success': False, 'error': 'Solicitud inválida'})
 
 
-def verificar_cupo_ajax(request):
+async def verificar_cupo_ajax(request):
     """Vista AJAX para verificar el cupo disponible de una materia"""
     if request.method == 'GET' and request.headers.get('x-requested-with') == 'XMLHttpRequest':
         materia_id = request.GET.get('materia_id')
         if materia_id:
             try:
-                materia = Materia.objects.get(id=materia_id, activa=True)
+                # Cupo e inscriptos en una sola consulta
+                materia = await Materia.objects.annotate(
+                    cupo_total=anotacion_cupo_total(),
+                    inscriptos=Count('inscripciones', filter=INSCRIPCIONES_VIGENTES),
+                ).aget(id=materia_id, activa=True)
+                cupo_disponible = materia.cupo_total - materia.inscriptos
                 return JsonResponse({
-                    'cupo_disponible': materia.get_cupo_disponible(),
-                    'cupo_maximo': materia.cupo_maximo,
-                    'inscriptos': materia.get_inscriptos_count(),
-                    'tiene_cupo': materia.tiene_cupo_disponible(),
+                    'cupo_disponible': cupo_disponible,
+                    'cupo_maximo': materia.cupo_total,
+                    'inscriptos': materia.inscriptos,
+                    'tiene_cupo': cupo_disponible > 0,
                     'success': True
                 })
             except Materia.DoesNotExist:
@@ -291,6 +331,94 @@ def verificar_cupo_ajax(request):
     return JsonResponse({'success': False, 'error': 'Materia no encontrada'})
 
 
+# Cupos en tiempo real: stream SSE bajo ASGI; bajo WSGI un stream infinito
+# ocuparía un hilo por visitante, así que las páginas consultan cada tanto
+MAX_MATERIAS_POR_STREAM = 100
+INTERVALO_KEEPALIVE = 15  # segundos
+INTERVALO_SONDEO = 30  # segundos, sin SSE
+
+
+def servido_por_asgi(request):
+    """La solicitud llegó por el handler ASGI (uvicorn) y no por WSGI"""
+    return isinstance(request, ASGIRequest)
+
+
+def contexto_cupos(request):
+    """Variables que usa materias/cupos_stream.html para elegir SSE o sondeo"""
+    return {
+        'cupos_sse': servido_por_asgi(request),
+        'cupos_intervalo_ms': INTERVALO_SONDEO * 1000,
+    }
+
+
+def materias_pedidas(request):
+    """Ids del parámetro materias=1,2,3; ValueError si es inválido"""
+    try:
+        materia_ids = {
+            int(valor) for valor in request.GET.get('materias', '').split(',') if valor.strip()
+        }
+    except ValueError:
+        raise ValueError('Parámetro "materias" inválido')
+    if not materia_ids or len(materia_ids) > MAX_MATERIAS_POR_STREAM:
+        raise ValueError('Cantidad de materias inválida')
+    return materia_ids
+
+
+def cupos_ajax(request):
+    """
+    Estado de cupo actual de las materias indicadas, para el sondeo
+    Uso: /materias/ajax/cupos/?materias=1,2,3
+    """
+    try:
+        materia_ids = materias_pedidas(request)
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+    response = JsonResponse({'cupos': snapshot_cupos(materia_ids)})
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+
+async def cupos_stream(request):
+    """
+    Vista SSE que envía los cambios de cupo de las materias indicadas
+    Uso: /materias/stream/cupos/?materias=1,2,3
+    Envía primero el estado actual y luego cada cambio publicado por el
+    broker, en lugar de que cada página consulte la base periódicamente.
+    Bajo WSGI responde 404: las páginas usan el sondeo de cupos_ajax.
+    """
+    if not servido_por_asgi(request):
+        raise Http404('El stream de cupos requiere un servidor ASGI')
+    try:
+        materia_ids = materias_pedidas(request)
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+    
+    async def eventos():
+        # Suscribirse antes de leer el estado inicial para no perder cambios
+        suscripcion = broker.suscribir(materia_ids)
+        try:
+            yield f"retry: {INTERVALO_KEEPALIVE * 1000}\n\n"
+            for estado in await asnapshot_cupos(materia_ids):
+                yield formatear_evento(estado)
+            
+            while True:
+                try:
+                    estado = await asyncio.wait_for(
+                        suscripcion.cola.get(), timeout=INTERVALO_KEEPALIVE
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield formatear_evento(estado)
+        finally:
+            broker.desuscribir(suscripcion)
+    
+    response = StreamingHttpResponse(eventos(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Evitar buffering en nginx
+    return response
+
+
 class MisMateriasDocenteView(DocenteRequiredMixin, ListView):
     """Vista para que el docente vea sus materias asignadas y listas de alumnos"""
     model = Materia
@@ -298,11 +426,11 @@ class MisMateriasDocenteView(DocenteRequiredMixin, ListView):
     context_object_name = 'materias'
     
     def get_queryset(self):
-        # Solo las materias asignadas al docente actual
+        # Solo las materias asignadas al docente actual (completas o por comisión)
         return Materia.objects.filter(
-            docente=self.request.user,
+            Q(docente=self.request.user) | Q(comisiones__docente=self.request.user),
             activa=True
-        ).select_related('carrera').prefetch_related(
+        ).distinct().select_related('carrera').prefetch_related(
             'inscripciones__alumno'
         ).order_by('carrera__nombre', 'anio_cursado', 'nombre')
     
@@ -337,13 +465,61 @@ class ListaAlumnosMateriaDocenteView(DocenteRequiredMixin, DetailView):
     context_object_name = 'materia'
     
     def get_queryset(self):
-        # Solo puede ver sus propias materias
-        return Materia.objects.filter(docente=self.request.user)
+        # Solo puede ver sus propias materias (completas o por comisión)
+        return Materia.objects.filter(
+            Q(docente=self.request.user) | Q(comisiones__docente=self.request.user)
+        ).distinct()
+    
+    def get_inscripciones(self):
+        # Inscripciones activas de la materia, o solo las de sus comisiones
+        # si el docente no es el titular de la materia
+        inscripciones = self.object.inscripciones.filter(activa=True)
+        if self.object.docente_id != self.request.user.pk:
+            inscripciones = inscripciones.filter(comision__docente=self.request.user)
+        return inscripciones.select_related(
+            'alumno', 'comision', 'materia'
+        ).order_by('alumno__apellido', 'alumno__nombre')
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        # Obtener todas las inscripciones activas de esta materia
-        context['inscripciones'] = self.object.inscripciones.filter(
-            activa=True
-        ).select_related('alumno').order_by('alumno__apellido', 'alumno__nombre')
+        if 'planilla' not in context:
+            context['planilla'] = PlanillaNotasForm(self.get_inscripciones())
+        # La planilla ya evaluó la consulta: se reutiliza la misma lista
+        context['inscripciones'] = context['planilla'].inscripciones
         return context
+    
+    def post(self, request, *args, **kwargs):
+        """
+        Guarda la planilla de notas completa
+        Las notas se validan en el formulario y se escriben con un único
+        bulk_update: no hace falta repetir por fila las validaciones de
+        inscripción (carreras del alumno, cupo) que hace Inscripcion.save().
+        Como bulk_update no pasa por save(), los aportes al registro
+        académico, los eventos de auditoría y los del outbox se aplican
+        aparte, en la misma transacción.
+        """
+        self.object = self.get_object()
+        planilla = PlanillaNotasForm(self.get_inscripciones(), request.POST)
+        if not planilla.is_valid():
+            messages.error(request, 'Revise las notas marcadas en la planilla.')
+            return self.render_to_response(self.get_context_data(planilla=planilla))
+        
+        modificadas = planilla.get_modificadas()
+        with transaction.atomic():
+            Inscripcion.objects.bulk_update(modificadas, ['nota_final', 'estado'], batch_size=200)
+            cambios = [
+                (inscripcion, *cambio)
+                for inscripcion in modificadas
+                if (cambio := inscripcion.cambio_auditable())
+            ]
+            registrar_muchos('inscripcion', [
+                (inscripcion.pk, accion, datos) for inscripcion, accion, datos in cambios
+            ])
+            publicar_muchos([
+                (f'inscripcion.{accion}', inscripcion.pk, inscripcion.datos_integracion())
+                for inscripcion, accion, _ in cambios
+            ])
+            registrar_calificaciones(modificadas)
+        
+        messages.success(request, f'Planilla guardada: {len(modificadas)} inscripciones actualizadas.')
+        return redirect('materias:lista_alumnos', pk=self.object.pk)
@@ -0,0 +1,20 @@
+from django.contrib import admin
+from django.utils import timezone
+from .models import Trabajo
+
+
+@admin.register(Trabajo)
+class TrabajoAdmin(admin.ModelAdmin):
+    list_display = ['id', 'tarea', 'estado', 'prioridad', 'intentos', 'max_intentos', 'fecha_creacion', 'duracion_ms']
+    list_filter = ['estado', 'tarea']
+    search_fields = ['tarea', 'error']
+    readonly_fields = ['bloqueado_por', 'bloqueado_hasta', 'fecha_creacion', 'fecha_inicio', 'fecha_fin', 'duracion_ms', 'error']
+    date_hierarchy = 'fecha_creacion'
+    actions = ['reintentar']
+    
+    @admin.action(description='Volver a encolar los trabajos seleccionados')
+    def reintentar(self, request, queryset):
+        cantidad = queryset.exclude(estado='en_curso').update(
+            estado='pendiente', intentos=0, disponible_desde=timezone.now(), error=''
+        )
+        self.message_user(request, f'{cantidad} trabajos vueltos a encolar.')
@@ -0,0 +1,152 @@
+"""
+Cola de trabajos en segundo plano sobre la base de datos
+Las tareas se declaran en un módulo tareas.py de cada aplicación:
+
+    from trabajos.cola import tarea
+
+    @tarea(max_intentos=5)
+    def enviar_email(asunto, mensaje, destinatarios):
+        ...
+
+y se encolan con argumentos serializables en JSON:
+
+    enviar_email.encolar(asunto='...', mensaje='...', destinatarios=[...])
+
+El trabajo se guarda en la misma transacción que el resto de los cambios
+del request, así que solo queda visible para los workers si esa
+transacción se confirma. Con TRABAJOS_SINCRONICO=True (por defecto con
+DEBUG) se ejecuta en el mismo proceso apenas se confirma la transacción,
+reintentándolo en el momento si falla (hasta max_intentos).
+Si no, al encolar se advierte en el log cuando hay trabajos esperando hace
+más de TRABAJOS_ALERTA_ESPERA segundos: ningún run_worker los está tomando.
+"""
+import logging
+import threading
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+
+logger = logging.getLogger(__name__)
+
+_tareas = {}
+_descubiertas = False
+_descubrir_lock = threading.Lock()
+
+# Como mucho una verificación de atraso por minuto y proceso
+INTERVALO_VERIFICACION = 60
+_ultima_verificacion = 0.0
+
+
+def tarea(nombre=None, max_intentos=3):
+    """
+    Registra una función como tarea de la cola
+    Agrega a la función el método encolar(prioridad=0, retraso=None, **argumentos).
+    """
+    def decorador(funcion):
+        clave = nombre or f'{funcion.__module__}.{funcion.__name__}'
+        _tareas[clave] = funcion
+        funcion.nombre_tarea = clave
+        funcion.encolar = lambda prioridad=0, retraso=None, **argumentos: encolar(
+            clave, argumentos, prioridad=prioridad, retraso=retraso, max_intentos=max_intentos
+        )
+        return funcion
+    return decorador
+
+
+def descubrir_tareas():
+    """Importa los módulos tareas.py de las aplicaciones instaladas (una sola vez)"""
+    global _descubiertas
+    with _descubrir_lock:
+        if not _descubiertas:
+            autodiscover_modules('tareas')
+            _descubiertas = True
+
+
+def obtener_tarea(nombre):
+    descubrir_tareas()
+    try:
+        return _tareas[nombre]
+    except KeyError:
+        raise LookupError(f'Tarea no registrada: {nombre}')
+
+
+def encolar(nombre, argumentos=None, prioridad=0, retraso=None, max_intentos=3):
+    """
+    Crea el trabajo pendiente; retraso (segundos o timedelta) posterga su inicio
+    Devuelve el Trabajo creado.
+    """
+    from .models import Trabajo
+
+    disponible_desde = timezone.now()
+    if retraso:
+        if not isinstance(retraso, timedelta):
+            retraso = timedelta(seconds=retraso)
+        disponible_desde += retraso
+    trabajo = Trabajo.objects.create(
+        tarea=nombre,
+        argumentos=argumentos or {},
+        prioridad=prioridad,
+        max_intentos=max_intentos,
+        disponible_desde=disponible_desde,
+    )
+    if settings.TRABAJOS_SINCRONICO:
+        from .worker import Worker
+        transaction.on_commit(lambda: Worker(concurrencia=1).ejecutar_en_linea(trabajo.pk))
+    else:
+        verificar_atraso()
+    return trabajo
+
+
+def verificar_atraso():
+    """Advierte en el log si hay trabajos pendientes que ningún worker tomó"""
+    global _ultima_verificacion
+    from .models import Trabajo
+
+    ahora = time.monotonic()
+    if ahora - _ultima_verificacion < INTERVALO_VERIFICACION:
+        return
+    _ultima_verificacion = ahora
+    espera = settings.TRABAJOS_ALERTA_ESPERA
+    atrasados = Trabajo.objects.filter(
+        estado='pendiente', disponible_desde__lt=timezone.now() - timedelta(seconds=espera)
+    ).count()
+    if atrasados:
+        logger.warning(
+            '%s trabajos esperan hace más de %s s: verifique que run_worker esté en '
+            'ejecución (o use TRABAJOS_SINCRONICO=True en desarrollo)', atrasados, espera
+        )
+
+
+def ejecutar_tarea(nombre, argumentos, en_linea=False):
+    """
+    Ejecuta una tarea en un hilo o proceso del worker
+    No lanza excepciones: devuelve (error, duracion_ms), con error None si
+    terminó bien o el traceback como texto (serializable entre procesos).
+    Igual que un request, cada trabajo descarta al empezar y al terminar las
+    conexiones vencidas o rotas, salvo en línea (la conexión es del request).
+    """
+    if not en_linea:
+        close_old_connections()
+    inicio = time.perf_counter()
+    error = None
+    try:
+        obtener_tarea(nombre)(**argumentos)
+    except Exception:
+        error = traceback.format_exc()
+    finally:
+        if not en_linea:
+            close_old_connections()
+    return error, int((time.perf_counter() - inicio) * 1000)
+
+
+def inicializar_proceso():
+    """Inicializador de los procesos del worker en modo 'procesos'"""
+    import django
+    django.setup()
+    descubrir_tareas()
@@ -0,0 +1,67 @@
+"""
+Comando para ejecutar el worker de la cola de trabajos
+Uso: python manage.py run_worker [--concurrencia 4] [--modo hilos|procesos] [--hasta-vaciar]
+
+Toma trabajos de la tabla trabajos_trabajo y los ejecuta en paralelo. No
+necesita un broker externo: se pueden levantar varios workers (en uno o
+más servidores) contra la misma base. Con SIGINT/SIGTERM deja de tomar
+trabajos, espera los que están en curso e imprime las métricas por tarea.
+"""
+import signal
+
+from django.core.management.base import BaseCommand
+from trabajos.cola import descubrir_tareas
+from trabajos.worker import MODOS, Worker
+
+
+class Command(BaseCommand):
+    help = 'Ejecuta los trabajos en segundo plano encolados en la base de datos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrencia', type=int,
+                            help='Trabajos simultáneos (por defecto, TRABAJOS_CONCURRENCIA)')
+        parser.add_argument('--modo', choices=MODOS, default='hilos',
+                            help='Pool de hilos (E/S: emails) o de procesos (CPU: PDF, recálculos)')
+        parser.add_argument('--alquiler', type=int,
+                            help='Segundos de alquiler de cada trabajo (por defecto, TRABAJOS_ALQUILER)')
+        parser.add_argument('--espera', type=float, default=1.0,
+                            help='Segundos entre consultas cuando la cola está vacía')
+        parser.add_argument('--hasta-vaciar', action='store_true',
+                            help='Termina cuando no quedan trabajos disponibles')
+
+    def handle(self, *args, **options):
+        descubrir_tareas()
+        worker = Worker(
+            concurrencia=options['concurrencia'],
+            modo=options['modo'],
+            alquiler=options['alquiler'],
+            espera=options['espera'],
+        )
+        signal.signal(signal.SIGINT, lambda *_: worker.detener())
+        signal.signal(signal.SIGTERM, lambda *_: worker.detener())
+
+        self.stdout.write(
+            f'🚀 Worker {worker.identificador}: {worker.concurrencia} {worker.modo}, '
+            f'alquiler {worker.alquiler} s'
+        )
+        worker.ejecutar(hasta_vaciar=options['hasta_vaciar'], al_terminar=self._informar)
+
+        self.stdout.write('\n📊 Métricas por tarea (ms):')
+        self.stdout.write(
+            f'   {"Tarea":<45} {"OK":>5} {"Reint.":>6} {"Fall.":>5} {"Venc.":>5} {"Prom.":>8} {"p95":>8} {"Máx.":>8}'
+        )
+        for nombre, completados, reintentos, fallidos, perdidos, promedio, p95, maximo in worker.resumen_metricas():
+            self.stdout.write(
+                f'   {nombre:<45} {completados:>5} {reintentos:>6} {fallidos:>5} {perdidos:>5} '
+                f'{promedio:>8.1f} {p95:>8} {maximo:>8}'
+            )
+        self.stdout.write(self.style.SUCCESS('✅ Worker detenido.'))
+
+    def _informar(self, fila, error, duracion_ms):
+        if error is None:
+            self.stdout.write(f'   ✓ {fila["tarea"]} #{fila["pk"]} ({duracion_ms} ms)')
+        else:
+            ultima_linea = error.strip().splitlines()[-1]
+            self.stdout.write(self.style.WARNING(
+                f'   ✗ {fila["tarea"]} #{fila["pk"]} intento {fila["intentos"]}/{fila["max_intentos"]}: {ultima_linea}'
+            ))
@@ -0,0 +1,110 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Trabajo(models.Model):
+    """
+    Trabajo pendiente de la cola en base de datos
+    Lo ejecuta el comando run_worker. Mientras está en curso, el worker que
+    lo tomó lo "alquila" hasta bloqueado_hasta y renueva el alquiler
+    periódicamente; si el worker muere, al vencer el alquiler otro worker
+    lo vuelve a tomar.
+    """
+    
+    ESTADOS_CHOICES = [
+        ('pendiente', 'Pendiente'),
+        ('en_curso', 'En curso'),
+        ('completado', 'Completado'),
+        ('fallido', 'Fallido'),
+    ]
+    
+    tarea = models.CharField(
+        max_length=150,
+        verbose_name='Tarea'
+    )
+    
+    argumentos = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name='Argumentos'
+    )
+    
+    prioridad = models.SmallIntegerField(
+        default=0,
+        verbose_name='Prioridad',
+        help_text='Los trabajos de mayor prioridad se toman primero'
+    )
+    
+    estado = models.CharField(
+        max_length=12,
+        choices=ESTADOS_CHOICES,
+        default='pendiente',
+        verbose_name='Estado'
+    )
+    
+    intentos = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Intentos'
+    )
+    
+    max_intentos = models.PositiveSmallIntegerField(
+        default=3,
+        verbose_name='Máximo de Intentos'
+    )
+    
+    disponible_desde = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Disponible Desde'
+    )
+    
+    bloqueado_por = models.CharField(
+        max_length=100,
+        blank=True,
+        verbose_name='Worker'
+    )
+    
+    bloqueado_hasta = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Bloqueado Hasta'
+    )
+    
+    fecha_creacion = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Fecha de Creación'
+    )
+    
+    fecha_inicio = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Fecha de Inicio'
+    )
+    
+    fecha_fin = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Fecha de Fin'
+    )
+    
+    duracion_ms = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        verbose_name='Duración (ms)'
+    )
+    
+    error = models.TextField(
+        blank=True,
+        verbose_name='Último Error'
+    )
+    
+    class Meta:
+        verbose_name = 'Trabajo'
+        verbose_name_plural = 'Trabajos'
+        ordering = ['-fecha_creacion']
+        indexes = [
+            models.Index(fields=['estado', 'disponible_desde'], name='trabajo_pendiente_idx'),
+            models.Index(fields=['estado', 'bloqueado_hasta'], name='trabajo_alquiler_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.tarea} #{self.pk} ({self.get_estado_display()})"
@@ -0,0 +1,249 @@
+"""
+Worker de la cola de trabajos
+Toma trabajos pendientes en lotes y los ejecuta en un pool de hilos o de
+procesos. Para que dos workers no tomen el mismo trabajo:
+- en bases con SELECT ... FOR UPDATE SKIP LOCKED (PostgreSQL) las filas
+  candidatas se bloquean y los demás workers las saltean
+- en SQLite (sin bloqueo de filas) el UPDATE que marca el trabajo como
+  en curso solo afecta filas que sigan pendientes, y la escritura está
+  serializada por el lock de la base
+En ambos casos el trabajo queda alquilado hasta bloqueado_hasta; el worker
+renueva el alquiler mientras lo ejecuta y recupera los que vencieron.
+"""
+import logging
+import multiprocessing
+import os
+import socket
+import statistics
+import threading
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .cola import ejecutar_tarea, inicializar_proceso
+from .models import Trabajo
+
+
+logger = logging.getLogger(__name__)
+
+MODOS = ['hilos', 'procesos']
+
+# Segundos de espera antes del reintento n: RETRASO_REINTENTO * 2 ** (n - 1)
+RETRASO_REINTENTO = 10
+
+
+class Worker:
+    """Ejecuta trabajos de la cola con concurrencia configurable"""
+
+    def __init__(self, concurrencia=None, modo='hilos', alquiler=None, espera=1.0):
+        if modo not in MODOS:
+            raise ValueError(f'Modo desconocido: {modo}')
+        self.concurrencia = concurrencia or settings.TRABAJOS_CONCURRENCIA
+        self.modo = modo
+        self.alquiler = alquiler or settings.TRABAJOS_ALQUILER
+        self.espera = espera
+        self.identificador = f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}'
+        self.metricas = defaultdict(lambda: {
+            'completados': 0, 'reintentos': 0, 'fallidos': 0, 'perdidos': 0, 'duraciones': [],
+        })
+        self._detener = threading.Event()
+
+    # ------------------------------------------------------------------
+    # Operaciones sobre la cola
+    # ------------------------------------------------------------------
+
+    def reclamar(self, cantidad):
+        """Toma hasta `cantidad` trabajos disponibles y los marca en curso"""
+        ahora = timezone.now()
+        candidatos = Trabajo.objects.filter(
+            estado='pendiente', disponible_desde__lte=ahora
+        ).order_by('-prioridad', 'disponible_desde', 'pk')
+
+        with transaction.atomic():
+            if connection.features.has_select_for_update_skip_locked:
+                candidatos = candidatos.select_for_update(skip_locked=True)
+            ids = list(candidatos.values_list('pk', flat=True)[:cantidad])
+            if not ids:
+                return []
+            Trabajo.objects.filter(pk__in=ids, estado='pendiente').update(
+                estado='en_curso',
+                bloqueado_por=self.identificador,
+                bloqueado_hasta=ahora + timedelta(seconds=self.alquiler),
+                intentos=F('intentos') + 1,
+                fecha_inicio=ahora,
+            )
+            return list(Trabajo.objects.filter(
+                pk__in=ids, estado='en_curso', bloqueado_por=self.identificador
+            ).values('pk', 'tarea', 'argumentos', 'intentos', 'max_intentos'))
+
+    def renovar_alquiler(self, ids):
+        """Extiende el alquiler de los trabajos que este worker sigue ejecutando"""
+        if ids:
+            Trabajo.objects.filter(pk__in=ids, bloqueado_por=self.identificador).update(
+                bloqueado_hasta=timezone.now() + timedelta(seconds=self.alquiler)
+            )
+
+    @staticmethod
+    def recuperar_vencidos():
+        """
+        Devuelve a la cola los trabajos cuyo worker dejó vencer el alquiler
+        (o los da por fallidos si ya agotaron los intentos)
+        """
+        ahora = timezone.now()
+        vencidos = Trabajo.objects.filter(estado='en_curso', bloqueado_hasta__lt=ahora)
+        vencidos.filter(intentos__gte=F('max_intentos')).update(
+            estado='fallido', bloqueado_por='', bloqueado_hasta=None, fecha_fin=ahora,
+            error='El worker no terminó el trabajo antes de vencer el alquiler.',
+        )
+        return vencidos.update(
+            estado='pendiente', bloqueado_por='', bloqueado_hasta=None, disponible_desde=ahora,
+        )
+
+    def registrar_resultado(self, fila, error, duracion_ms, en_linea=False):
+        """
+        Guarda el resultado de un trabajo y acumula las métricas de su tarea
+        Solo si el trabajo sigue alquilado por este worker: si el alquiler
+        venció, recuperar_vencidos lo devolvió a la cola y puede tenerlo
+        otro worker, así que el resultado se descarta. En línea no hay
+        worker que lo retome más tarde: el reintento queda disponible ya.
+        Devuelve el estado registrado, o None si se descartó.
+        """
+        ahora = timezone.now()
+        metricas = self.metricas[fila['tarea']]
+        metricas['duraciones'].append(duracion_ms)
+        campos = {'bloqueado_por': '', 'bloqueado_hasta': None, 'duracion_ms': duracion_ms}
+        if error is None:
+            clave = 'completados'
+            campos.update(estado='completado', fecha_fin=ahora, error='')
+        elif fila['intentos'] < fila['max_intentos']:
+            clave = 'reintentos'
+            retraso = 0 if en_linea else RETRASO_REINTENTO * 2 ** (fila['intentos'] - 1)
+            campos.update(
+                estado='pendiente', error=error,
+                disponible_desde=ahora + timedelta(seconds=retraso),
+            )
+        else:
+            clave = 'fallidos'
+            campos.update(estado='fallido', fecha_fin=ahora, error=error)
+        actualizados = Trabajo.objects.filter(
+            pk=fila['pk'], estado='en_curso', bloqueado_por=self.identificador
+        ).update(**campos)
+        if not actualizados:
+            metricas['perdidos'] += 1
+            logger.warning(
+                'Se descarta el resultado de %s #%s: el alquiler de %s venció y el trabajo '
+                'volvió a la cola (considere aumentar TRABAJOS_ALQUILER)',
+                fila['tarea'], fila['pk'], self.identificador,
+            )
+            return None
+        metricas[clave] += 1
+        return campos['estado']
+
+    # ------------------------------------------------------------------
+    # Ejecución
+    # ------------------------------------------------------------------
+
+    def _crear_pool(self):
+        if self.modo == 'hilos':
+            return ThreadPoolExecutor(max_workers=self.concurrencia, thread_name_prefix='trabajo')
+        return ProcessPoolExecutor(
+            max_workers=self.concurrencia,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=inicializar_proceso,
+        )
+
+    def detener(self):
+        """Deja de tomar trabajos; los que están en curso terminan normalmente"""
+        self._detener.set()
+
+    def ejecutar(self, hasta_vaciar=False, al_terminar=None):
+        """
+        Bucle principal del worker
+        Con hasta_vaciar=True termina cuando no quedan trabajos disponibles.
+        al_terminar(fila, error, duracion_ms) se llama después de cada trabajo.
+        """
+        en_vuelo = {}
+        ultimo_mantenimiento = 0
+        pool = self._crear_pool()
+        try:
+            while not self._detener.is_set():
+                if time.monotonic() - ultimo_mantenimiento >= self.alquiler / 3:
+                    close_old_connections()
+                    self.recuperar_vencidos()
+                    self.renovar_alquiler([fila['pk'] for fila in en_vuelo.values()])
+                    ultimo_mantenimiento = time.monotonic()
+
+                libres = self.concurrencia - len(en_vuelo)
+                if libres:
+                    for fila in self.reclamar(libres):
+                        futuro = pool.submit(ejecutar_tarea, fila['tarea'], fila['argumentos'])
+                        en_vuelo[futuro] = fila
+
+                if not en_vuelo:
+                    if hasta_vaciar:
+                        break
+                    self._detener.wait(self.espera)
+                    continue
+
+                terminados, _ = wait(en_vuelo, timeout=self.espera, return_when=FIRST_COMPLETED)
+                for futuro in terminados:
+                    self._finalizar(en_vuelo.pop(futuro), futuro, al_terminar)
+
+            # Apagado ordenado: se esperan los trabajos en curso
+            for futuro in list(en_vuelo):
+                futuro.exception()
+                self._finalizar(en_vuelo.pop(futuro), futuro, al_terminar)
+        finally:
+            pool.shutdown(wait=True)
+
+    def _finalizar(self, fila, futuro, al_terminar):
+        try:
+            error, duracion_ms = futuro.result()
+        except Exception as e:
+            # El proceso murió o el resultado no se pudo transferir
+            error, duracion_ms = f'{type(e).__name__}: {e}', 0
+        self.registrar_resultado(fila, error, duracion_ms)
+        if al_terminar:
+            al_terminar(fila, error, duracion_ms)
+
+    def ejecutar_en_linea(self, trabajo_id):
+        """
+        Toma y ejecuta un trabajo puntual en el proceso actual (modo sincrónico)
+        Si falla se reintenta en el momento hasta agotar max_intentos.
+        """
+        estado = 'pendiente'
+        while estado == 'pendiente':
+            ahora = timezone.now()
+            tomado = Trabajo.objects.filter(pk=trabajo_id, estado='pendiente').update(
+                estado='en_curso', bloqueado_por=self.identificador,
+                bloqueado_hasta=ahora + timedelta(seconds=self.alquiler),
+                intentos=F('intentos') + 1, fecha_inicio=ahora,
+            )
+            if not tomado:
+                return
+            fila = Trabajo.objects.values('pk', 'tarea', 'argumentos', 'intentos', 'max_intentos').get(
+                pk=trabajo_id
+            )
+            error, duracion_ms = ejecutar_tarea(fila['tarea'], fila['argumentos'], en_linea=True)
+            estado = self.registrar_resultado(fila, error, duracion_ms, en_linea=True)
+
+    def resumen_metricas(self):
+        """Filas (tarea, completados, reintentos, fallidos, perdidos, promedio, p95, máximo) en ms"""
+        filas = []
+        for nombre, metricas in sorted(self.metricas.items()):
+            duraciones = sorted(metricas['duraciones'])
+            p95 = duraciones[max(0, int(len(duraciones) * 0.95) - 1)] if duraciones else 0
+            filas.append((
+                nombre, metricas['completados'], metricas['reintentos'], metricas['fallidos'],
+                metricas['perdidos'],
+                statistics.fmean(duraciones) if duraciones else 0, p95,
+                duraciones[-1] if duraciones else 0,
+            ))
+        return filas
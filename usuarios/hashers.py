@@ -0,0 +1,60 @@
+"""
+Hashers de contraseñas del sistema
+La política (cuál se usa para contraseñas nuevas) y los parámetros de costo
+se configuran en gestion_academica/hasher_config.py.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher, PBKDF2PasswordHasher, ScryptPasswordHasher, make_password,
+)
+
+
+class ScryptAjustadoHasher(ScryptPasswordHasher):
+    """scrypt con N y r configurables; los hashes con otros parámetros se actualizan al ingresar"""
+
+    def __init__(self):
+        self.work_factor = settings.HASHER_PARAMETROS['scrypt_work_factor']
+        self.block_size = settings.HASHER_PARAMETROS['scrypt_block_size']
+
+
+class Argon2AjustadoHasher(Argon2PasswordHasher):
+    """Argon2id con tiempo, memoria y paralelismo configurables"""
+
+    def __init__(self):
+        self.time_cost = settings.HASHER_PARAMETROS['argon2_time_cost']
+        self.memory_cost = settings.HASHER_PARAMETROS['argon2_memory_cost']
+        self.parallelism = settings.HASHER_PARAMETROS['argon2_parallelism']
+
+
+class ContrasenaInicialHasher(PBKDF2PasswordHasher):
+    """
+    PBKDF2 barato para contraseñas iniciales
+    Nunca es el preferido: Django lo reemplaza por el hasher de la política
+    en el primer login correcto.
+    """
+    algorithm = 'pbkdf2_inicial'
+
+    def __init__(self):
+        self.iterations = settings.HASHER_PARAMETROS['inicial_iteraciones']
+
+
+def hashear_contrasena_inicial(password):
+    return make_password(password, hasher=ContrasenaInicialHasher.algorithm)
+
+
+def hashear_en_paralelo(passwords, hasher='default', hilos=None):
+    """
+    Hashes de muchas contraseñas, en el mismo orden
+    scrypt, PBKDF2 (hashlib) y Argon2 (argon2-cffi) liberan el GIL mientras
+    calculan, así que un pool de hilos ocupa todos los núcleos sin el costo
+    de levantar procesos.
+    """
+    passwords = list(passwords)
+    hilos = hilos or os.cpu_count() or 1
+    if hilos == 1 or len(passwords) < 2:
+        return [make_password(password, hasher=hasher) for password in passwords]
+    with ThreadPoolExecutor(max_workers=hilos, thread_name_prefix='hash') as pool:
+        return list(pool.map(lambda password: make_password(password, hasher=hasher), passwords))
@@ -0,0 +1,155 @@
+"""
+Límites de intentos con ventanas deslizantes (login y recuperación de contraseña)
+Cada límite cuenta intentos por clave (IP, usuario o email) en el caché
+'ratelimit' con dos ventanas fijas consecutivas: la estimación de la
+ventana deslizante pondera la anterior por la fracción que todavía cae
+dentro del período, como en:
+
+    estimado = anterior * (1 - transcurrido / ventana) + actual
+
+La verificación se hace al principio del POST, antes de tocar la base o
+calcular un hash, con una sola lectura (get_many) de todas las claves.
+Los límites se configuran en settings.LIMITES_INTENTOS.
+"""
+import hashlib
+import logging
+import math
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.contrib import messages
+from django.core.cache import caches
+
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_rechazos = Counter()
+
+
+def _cache():
+    return caches['ratelimit']
+
+
+def ip_cliente(request):
+    """IP del cliente; detrás de un proxy debe reescribir REMOTE_ADDR (p. ej. con el servidor)"""
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def _normalizar(valor):
+    """Claves cortas y sin caracteres especiales para cualquier backend de caché"""
+    return hashlib.sha1(str(valor).strip().lower().encode('utf-8')).hexdigest()[:20]
+
+
+def _claves_cache(nombre, valor, ahora):
+    """Claves de la ventana actual y la anterior, y segundos transcurridos de la actual"""
+    _, ventana = settings.LIMITES_INTENTOS[nombre]
+    numero = int(ahora // ventana)
+    base = f'{nombre}:{_normalizar(valor)}'
+    return f'{base}:{numero}', f'{base}:{numero - 1}', ahora - numero * ventana
+
+
+def verificar(claves):
+    """
+    Revisa los límites {nombre: valor} sin registrar nada
+    Devuelve (nombre, segundos_para_reintentar) del primer límite excedido,
+    o None si todos permiten el intento.
+    """
+    if not settings.LIMITES_INTENTOS_ACTIVOS:
+        return None
+    ahora = time.time()
+    ventanas = {
+        nombre: _claves_cache(nombre, valor, ahora)
+        for nombre, valor in claves.items() if valor
+    }
+    contadores = _cache().get_many(
+        [clave for actual, anterior, _ in ventanas.values() for clave in (actual, anterior)]
+    )
+    for nombre, (actual, anterior, transcurrido) in ventanas.items():
+        maximo, ventana = settings.LIMITES_INTENTOS[nombre]
+        en_actual = contadores.get(actual, 0)
+        en_anterior = contadores.get(anterior, 0)
+        estimado = en_anterior * (1 - transcurrido / ventana) + en_actual
+        if estimado < maximo:
+            continue
+        if en_actual >= maximo or not en_anterior:
+            espera = ventana - transcurrido
+        else:
+            # Momento en que el peso de la ventana anterior deja pasar un intento
+            espera = ventana * (1 - (maximo - en_actual) / en_anterior) - transcurrido
+        return nombre, max(1, math.ceil(espera))
+    return None
+
+
+def registrar(claves):
+    """Suma un intento en la ventana actual de cada límite {nombre: valor}"""
+    if not settings.LIMITES_INTENTOS_ACTIVOS:
+        return
+    cache = _cache()
+    ahora = time.time()
+    for nombre, valor in claves.items():
+        if not valor:
+            continue
+        actual, _, _ = _claves_cache(nombre, valor, ahora)
+        _, ventana = settings.LIMITES_INTENTOS[nombre]
+        # La clave vive dos ventanas: mientras es la actual y mientras es la anterior
+        cache.add(actual, 0, timeout=2 * ventana)
+        try:
+            cache.incr(actual)
+        except ValueError:
+            # Expiró entre add e incr
+            cache.set(actual, 1, timeout=2 * ventana)
+
+
+def reiniciar(claves):
+    """Borra los contadores de los límites indicados (p. ej. tras un login correcto)"""
+    ahora = time.time()
+    _cache().delete_many([
+        clave
+        for nombre, valor in claves.items() if valor
+        for clave in _claves_cache(nombre, valor, ahora)[:2]
+    ])
+
+
+def registrar_rechazo(nombre, request):
+    with _lock:
+        _rechazos[nombre] += 1
+    logger.warning('Límite de intentos "%s" excedido desde %s', nombre, ip_cliente(request))
+
+
+def get_rechazos():
+    """Cantidad de solicitudes rechazadas por límite (contadores por proceso)"""
+    with _lock:
+        return dict(_rechazos)
+
+
+class LimiteIntentosMixin:
+    """
+    Corta el POST con 429 si se excede alguno de los límites de get_claves_limite()
+    Las vistas deciden cuándo registrar cada intento con registrar().
+    """
+
+    def get_claves_limite(self):
+        """{nombre del límite: valor de la clave} para el request actual"""
+        return {}
+
+    def post(self, request, *args, **kwargs):
+        self.claves_limite = self.get_claves_limite()
+        excedido = verificar(self.claves_limite)
+        if excedido:
+            return self.respuesta_limitada(*excedido)
+        return super().post(request, *args, **kwargs)
+
+    def respuesta_limitada(self, nombre, segundos):
+        registrar_rechazo(nombre, self.request)
+        minutos = math.ceil(segundos / 60)
+        messages.error(
+            self.request,
+            f'Demasiados intentos. Intenta nuevamente en {minutos} minuto{"s" if minutos != 1 else ""}.'
+        )
+        response = self.render_to_response(self.get_context_data())
+        response.status_code = 429
+        response['Retry-After'] = str(segundos)
+        return response
@@ -0,0 +1,75 @@
+"""
+Comando para medir el rendimiento de los hashers de contraseñas
+Uso: python manage.py benchmark_hashers --cantidad 64 --hilos 8
+
+Para cada hasher configurado en PASSWORD_HASHERS informa hashes por
+segundo en secuencia y con el pool de hilos de hashear_en_paralelo, y el
+tiempo de verificar una contraseña (lo que paga cada login). Sirve para
+ajustar los parámetros de gestion_academica/hasher_config.py al hardware:
+un login no debería tardar más de unas décimas de segundo.
+"""
+import os
+import time
+
+from django.contrib.auth.hashers import check_password, get_hashers, make_password
+from django.core.management.base import BaseCommand
+
+from usuarios.hashers import hashear_en_paralelo
+
+
+class Command(BaseCommand):
+    help = 'Mide hashes por segundo de cada hasher configurado, en secuencia y en paralelo'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cantidad', type=int, default=32,
+                            help='Contraseñas a hashear por hasher (por defecto 32)')
+        parser.add_argument('--hilos', type=int, default=os.cpu_count() or 1,
+                            help='Hilos del modo paralelo (por defecto, uno por núcleo)')
+        parser.add_argument('--hasher', action='append', dest='hashers',
+                            help='Algoritmo a medir (repetible; por defecto, todos)')
+
+    def handle(self, *args, **options):
+        cantidad = options['cantidad']
+        hilos = options['hilos']
+        passwords = [f'{30000000 + i}' for i in range(cantidad)]
+
+        self.stdout.write(self.style.SUCCESS('=' * 78))
+        self.stdout.write(self.style.SUCCESS(
+            f'   BENCHMARK DE HASHERS - {cantidad} contraseñas, {hilos} hilos'
+        ))
+        self.stdout.write(self.style.SUCCESS('=' * 78))
+        self.stdout.write(
+            f'{"Hasher":<28} {"Secuencial":>12} {"Paralelo":>12} {"Mejora":>8} {"Verificar":>12}'
+        )
+        self.stdout.write(f'{"":<28} {"hashes/s":>12} {"hashes/s":>12} {"":>8} {"ms":>12}')
+        self.stdout.write('-' * 78)
+
+        for indice, hasher in enumerate(get_hashers()):
+            if options['hashers'] and hasher.algorithm not in options['hashers']:
+                continue
+            nombre = hasher.algorithm + (' (preferido)' if indice == 0 else '')
+            try:
+                make_password('calentamiento', hasher=hasher.algorithm)
+            except ValueError as e:
+                # Librería opcional no instalada (p. ej. argon2-cffi)
+                self.stdout.write(f'{nombre:<28} {self.style.WARNING(str(e))}')
+                continue
+
+            inicio = time.perf_counter()
+            hashes = [make_password(password, hasher=hasher.algorithm) for password in passwords]
+            secuencial = cantidad / (time.perf_counter() - inicio)
+
+            inicio = time.perf_counter()
+            hashear_en_paralelo(passwords, hasher=hasher.algorithm, hilos=hilos)
+            paralelo = cantidad / (time.perf_counter() - inicio)
+
+            inicio = time.perf_counter()
+            for password, encoded in zip(passwords, hashes):
+                check_password(password, encoded)
+            verificar = (time.perf_counter() - inicio) / cantidad * 1000
+
+            self.stdout.write(
+                f'{nombre:<28} {secuencial:>12.1f} {paralelo:>12.1f} '
+                f'{paralelo / secuencial:>7.1f}x {verificar:>12.2f}'
+            )
+        self.stdout.write('-' * 78)
@@ -0,0 +1,142 @@
+"""
+Comando para medir el costo por request de la pila de middleware
+Uso: python manage.py benchmark_middleware --iteraciones 2000
+
+Arma la pila de settings.MIDDLEWARE alrededor de una vista vacía y la
+ejecuta en proceso (sin servidor ni resolución de URLs) para cuatro tipos
+de request: página anónima, página autenticada, sondeo AJAX autenticado y
+archivo estático. Compara contra la misma pila con el SessionMiddleware
+estándar de Django e informa microsegundos y consultas por request, ya
+descontado el costo de la vista sola.
+"""
+import statistics
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.utils.module_loading import import_string
+
+from usuarios.models import Usuario
+
+
+SESION_SELECTIVA = 'usuarios.middleware.SesionSelectivaMiddleware'
+SESION_DJANGO = 'django.contrib.sessions.middleware.SessionMiddleware'
+
+
+def vista_vacia(request):
+    return HttpResponse('ok')
+
+
+def construir_pila(rutas):
+    manejador = vista_vacia
+    for ruta in reversed(rutas):
+        try:
+            manejador = import_string(ruta)(manejador)
+        except MiddlewareNotUsed:
+            pass
+    return manejador
+
+
+class Command(BaseCommand):
+    help = 'Mide el overhead por request de la pila de middleware'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iteraciones', type=int, default=1000,
+                            help='Requests por caso y configuración (por defecto 1000)')
+
+    def handle(self, *args, **options):
+        usuario = Usuario.objects.filter(is_active=True, debe_cambiar_password=False).first()
+        if usuario is None:
+            raise CommandError('Se necesita al menos un usuario activo que no deba cambiar la contraseña.')
+
+        session_store = import_module(settings.SESSION_ENGINE).SessionStore
+        sesion = session_store()
+        sesion[SESSION_KEY] = str(usuario.pk)
+        sesion[BACKEND_SESSION_KEY] = 'django.contrib.auth.backends.ModelBackend'
+        sesion[HASH_SESSION_KEY] = usuario.get_session_auth_hash()
+        sesion.create()
+
+        factory = RequestFactory()
+        cookie = {settings.SESSION_COOKIE_NAME: sesion.session_key}
+        casos = [
+            ('página anónima', lambda: factory.get('/carreras/')),
+            ('página autenticada', lambda: self.con_cookies(factory.get('/carreras/'), cookie)),
+            ('AJAX autenticado', lambda: self.con_cookies(
+                factory.get('/materias/ajax/verificar-cupo/', HTTP_X_REQUESTED_WITH='XMLHttpRequest'),
+                cookie,
+            )),
+            ('estático', lambda: self.con_cookies(
+                factory.get('/' + settings.STATIC_URL.lstrip('/') + 'css/estilos.css'), cookie
+            )),
+        ]
+
+        actual = list(settings.MIDDLEWARE)
+        if SESION_SELECTIVA not in actual:
+            raise CommandError(f'MIDDLEWARE no incluye {SESION_SELECTIVA}')
+        configuraciones = [
+            ('Django estándar', construir_pila([
+                SESION_DJANGO if ruta == SESION_SELECTIVA else ruta for ruta in actual
+            ])),
+            ('camino rápido', construir_pila(actual)),
+        ]
+
+        iteraciones = options['iteraciones']
+        self.stdout.write(self.style.SUCCESS('=' * 78))
+        self.stdout.write(self.style.SUCCESS(
+            f'   BENCHMARK DE MIDDLEWARE - {iteraciones} requests por caso'
+        ))
+        self.stdout.write(self.style.SUCCESS('=' * 78))
+        self.stdout.write(
+            f'{"Caso":<22} {"Configuración":<18} {"Mediana µs":>12} {"p95 µs":>10} {"Consultas":>10}'
+        )
+        self.stdout.write('-' * 78)
+
+        try:
+            base = self.medir(vista_vacia, casos[0][1], iteraciones)[0]
+            for nombre, crear_request in casos:
+                for configuracion, pila in configuraciones:
+                    mediana, p95, consultas = self.medir(pila, crear_request, iteraciones)
+                    self.stdout.write(
+                        f'{nombre:<22} {configuracion:<18} {mediana - base:>12.1f} '
+                        f'{p95 - base:>10.1f} {consultas:>10.1f}'
+                    )
+                self.stdout.write('')
+        finally:
+            sesion.delete()
+        self.stdout.write('-' * 78)
+
+    @staticmethod
+    def con_cookies(request, cookies):
+        request.COOKIES.update(cookies)
+        return request
+
+    @staticmethod
+    def medir(manejador, crear_request, iteraciones):
+        """(mediana µs, p95 µs, consultas por request)"""
+        manejador(crear_request())  # calentamiento
+        duraciones = []
+        consultas = 0
+
+        def contar(execute, sql, params, many, context):
+            nonlocal consultas
+            consultas += 1
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(contar):
+            for _ in range(iteraciones):
+                request = crear_request()
+                inicio = time.perf_counter()
+                manejador(request)
+                duraciones.append((time.perf_counter() - inicio) * 1_000_000)
+        duraciones.sort()
+        return (
+            statistics.median(duraciones),
+            duraciones[int(len(duraciones) * 0.95) - 1],
+            consultas / iteraciones,
+        )
@@ -3,6 +3,7 @@ Comando para crear usuario administrador semilla
 Uso: python manage.py crear_admin_semilla
 """
 from django.core.management.base import BaseCommand
+from usuarios.hashers import hashear_contrasena_inicial
 from usuarios.models import Usuario
 
 
@@ -22,7 +23,6 @@ class Command(BaseCommand):
             admin = Usuario.objects.create_user(
                 username='admin',
                 email='admin@sistema.com',
-                password='admin123',  # Contraseña temporal
                 first_name='Administrador',
                 last_name='del Sistema',
                 dni='00000000',
@@ -32,6 +32,9 @@ class Command(BaseCommand):
                 is_superuser=True,
                 debe_cambiar_password=True  # Forzar cambio de contraseña
             )
+            # Contraseña temporal con el hash barato de contraseñas iniciales
+            admin.password = hashear_contrasena_inicial('admin123')
+            admin.save(update_fields=['password'])
 
             self.stdout.write(
                 self.style.SUCCESS('\n✅ Usuario administrador creado exitosamente!\n')
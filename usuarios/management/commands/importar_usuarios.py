@@ -0,0 +1,189 @@
+"""
+Comando para crear usuarios por lote desde un CSV (p. ej. una cohorte de ingresantes)
+Uso: python manage.py importar_usuarios ingresantes.csv --hilos 8
+
+Columnas: dni, nombre, apellido, email, rol y, opcionales, telefono,
+fecha_nacimiento (AAAA-MM-DD) y carrera (código; obligatoria para alumnos).
+Igual que el alta individual, el usuario es el DNI, la contraseña inicial
+también y se pide cambiarla en el primer ingreso. Los hashes se calculan en
+paralelo antes de abrir la transacción y todas las filas se insertan con
+bulk_create. Las filas con DNI, email o usuario ya existentes se informan
+y se saltean.
+"""
+import csv
+import time
+from datetime import date
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.core.validators import validate_email
+from django.db import transaction
+
+from alumnos.models import Alumno, InscripcionCarrera
+from auditoria.eventos import registrar_muchos
+from carreras.catalogo import invalidar_catalogo
+from carreras.models import Carrera
+from integraciones.outbox import publicar_muchos
+from usuarios.hashers import ContrasenaInicialHasher, hashear_en_paralelo
+from usuarios.models import PerfilUsuario, Usuario
+
+
+COLUMNAS = ['dni', 'nombre', 'apellido', 'email', 'rol']
+
+
+class Command(BaseCommand):
+    help = 'Crea usuarios (y sus alumnos) por lote desde un archivo CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument('archivo', help='CSV con encabezado')
+        parser.add_argument('--hilos', type=int,
+                            help='Hilos para calcular los hashes (por defecto, uno por núcleo)')
+        parser.add_argument('--hasher', choices=['inicial', 'politica'], default='inicial',
+                            help='Hash de la contraseña inicial: barato (por defecto) o el de la política')
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['archivo'], newline='', encoding='utf-8-sig') as archivo:
+                filas = list(csv.DictReader(archivo))
+        except OSError as e:
+            raise CommandError(f'No se pudo leer el archivo: {e}')
+        if filas and not set(COLUMNAS) <= set(filas[0]):
+            raise CommandError(f'Faltan columnas; se esperan: {", ".join(COLUMNAS)}')
+
+        validas = self.validar(filas)
+        if not validas:
+            self.stdout.write(self.style.WARNING('No hay usuarios para crear.'))
+            return
+
+        inicio = time.perf_counter()
+        hashes = hashear_en_paralelo(
+            [fila['dni'] for fila in validas],
+            hasher=ContrasenaInicialHasher.algorithm if options['hasher'] == 'inicial' else 'default',
+            hilos=options['hilos'],
+        )
+        duracion_hash = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        creados, alumnos = self.crear(validas, hashes)
+        duracion_escritura = time.perf_counter() - inicio
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Usuarios creados: {creados} (alumnos: {alumnos})'
+        ))
+        self.stdout.write(
+            f'Hashes: {duracion_hash:.2f} s ({len(hashes) / duracion_hash:.0f} hashes/s), '
+            f'escritura: {duracion_escritura:.2f} s'
+        )
+
+    def validar(self, filas):
+        """Filas completas y sin conflictos con la base ni entre sí"""
+        carreras = {c.codigo: c for c in Carrera.objects.filter(activa=True)}
+        roles = {codigo for codigo, _ in Usuario.ROLES_CHOICES}
+        existentes = {
+            campo: set(Usuario.objects.filter(**{f'{campo}__in': [f[clave] for f in filas]})
+                       .values_list(campo, flat=True))
+            for campo, clave in (('dni', 'dni'), ('email', 'email'), ('username', 'dni'))
+        }
+        for campo in ('dni', 'email'):
+            existentes[campo] |= set(Alumno.objects.filter(**{f'{campo}__in': [f[campo] for f in filas]})
+                                     .values_list(campo, flat=True))
+
+        validas = []
+        for numero, fila in enumerate(filas, start=2):
+            fila = {clave: (valor or '').strip() for clave, valor in fila.items() if clave}
+            error = None
+            if not all(fila.get(columna) for columna in COLUMNAS):
+                error = 'faltan datos obligatorios'
+            elif not (fila['dni'].isdigit() and 7 <= len(fila['dni']) <= 8):
+                error = f'DNI inválido "{fila["dni"]}"'
+            elif not self.email_valido(fila['email']):
+                error = f'email inválido "{fila["email"]}"'
+            elif fila['rol'] not in roles:
+                error = f'rol desconocido "{fila["rol"]}"'
+            elif fila['dni'] in existentes['dni'] or fila['dni'] in existentes['username']:
+                error = f'el DNI {fila["dni"]} ya existe'
+            elif fila['email'] in existentes['email']:
+                error = f'el email {fila["email"]} ya existe'
+            elif fila['rol'] == 'alumno':
+                if fila.get('carrera') not in carreras:
+                    error = f'carrera inexistente o inactiva "{fila.get("carrera", "")}"'
+                elif not fila.get('fecha_nacimiento'):
+                    error = 'falta la fecha de nacimiento del alumno'
+            if not error and fila.get('fecha_nacimiento'):
+                try:
+                    fila['fecha_nacimiento'] = date.fromisoformat(fila['fecha_nacimiento'])
+                except ValueError:
+                    error = f'fecha de nacimiento inválida "{fila["fecha_nacimiento"]}"'
+
+            if error:
+                self.stdout.write(self.style.WARNING(f'Línea {numero}: {error}; se saltea'))
+                continue
+            fila['carrera'] = carreras.get(fila.get('carrera'))
+            existentes['dni'].add(fila['dni'])
+            existentes['email'].add(fila['email'])
+            validas.append(fila)
+        return validas
+
+    @staticmethod
+    def email_valido(email):
+        try:
+            validate_email(email)
+        except ValidationError:
+            return False
+        return True
+
+    def crear(self, filas, hashes):
+        with transaction.atomic():
+            usuarios = Usuario.objects.bulk_create([
+                Usuario(
+                    username=fila['dni'],
+                    password=password,
+                    first_name=fila['nombre'],
+                    last_name=fila['apellido'],
+                    email=fila['email'],
+                    dni=fila['dni'],
+                    telefono=fila.get('telefono', ''),
+                    fecha_nacimiento=fila.get('fecha_nacimiento') or None,
+                    rol=fila['rol'],
+                    debe_cambiar_password=True,
+                )
+                for fila, password in zip(filas, hashes)
+            ], batch_size=500)
+            PerfilUsuario.objects.bulk_create(
+                [PerfilUsuario(usuario=usuario) for usuario in usuarios], batch_size=500
+            )
+            registrar_muchos('usuario', [
+                (usuario.pk, 'alta', {'rol': usuario.rol, 'origen': 'importacion'})
+                for usuario in usuarios
+            ])
+
+            hoy = date.today()
+            alumnos_filas = [(u, f) for u, f in zip(usuarios, filas) if f['rol'] == 'alumno']
+            alumnos = Alumno.objects.bulk_create([
+                Alumno(
+                    usuario=usuario,
+                    numero_legajo=fila['dni'],
+                    nombre=fila['nombre'],
+                    apellido=fila['apellido'],
+                    dni=fila['dni'],
+                    email=fila['email'],
+                    telefono=fila.get('telefono', ''),
+                    fecha_nacimiento=fila['fecha_nacimiento'],
+                    fecha_ingreso=hoy,
+                    activo=True,
+                )
+                for usuario, fila in alumnos_filas
+            ], batch_size=500)
+            inscripciones = InscripcionCarrera.objects.bulk_create([
+                InscripcionCarrera(alumno=alumno, carrera=fila['carrera'], activa=True)
+                for alumno, (_, fila) in zip(alumnos, alumnos_filas)
+            ], batch_size=500)
+            # bulk_create no pasa por save(): el outbox y el catálogo se actualizan aparte
+            publicar_muchos(
+                [('usuario.alta', u.pk, u.datos_integracion()) for u in usuarios]
+                + [('alumno.alta', a.pk, a.datos_integracion()) for a in alumnos]
+                + [('inscripcion_carrera.alta', i.pk, i.datos_integracion()) for i in inscripciones]
+            )
+            if alumnos:
+                transaction.on_commit(invalidar_catalogo)
+        return len(usuarios), len(alumnos)
@@ -1,71 +1,168 @@
 """
 Middleware para gestión de sesiones y auto-logout
+
+Camino rápido:
+- SesionSelectivaMiddleware reemplaza a SessionMiddleware. Las rutas de
+  settings.RUTAS_SIN_SESION (estáticos, media, endpoints públicos de AJAX)
+  reciben una sesión vacía que nunca se lee ni se guarda, así que tampoco
+  cargan el usuario. Los pedidos AJAX que no modifican la sesión no la
+  guardan: un sondeo periódico no renueva la expiración.
+- SessionTimeoutMiddleware y ForcePasswordChangeMiddleware hacen primero
+  los chequeos baratos (ruta, AJAX) y solo después consultan request.user,
+  que es lo que carga la sesión.
+
+Todos funcionan en modo sincrónico y asincrónico: bajo ASGI la cadena no
+se adapta a sync y las vistas async no ocupan un hilo por request.
 """
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
 from django.conf import settings
+from django.contrib.sessions.middleware import SessionMiddleware
 from django.utils import timezone
 from django.shortcuts import redirect
 from django.urls import reverse
-from datetime import timedelta
+from django.utils.cache import patch_vary_headers
+
+
+def es_ajax(request):
+    return request.headers.get('x-requested-with') == 'XMLHttpRequest'
+
+
+def sin_sesion(request):
+    """True si la ruta está en RUTAS_SIN_SESION (ver SesionSelectivaMiddleware)"""
+    return getattr(request, 'sin_sesion', False)
+
+
+class SesionSelectivaMiddleware(SessionMiddleware):
+    """
+    SessionMiddleware que no toca la sesión en las rutas permitidas
+    ni la guarda en pedidos AJAX que no la modificaron
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.prefijos = tuple(
+            '/' + prefijo.lstrip('/') for prefijo in settings.RUTAS_SIN_SESION if prefijo
+        )
+
+    def process_request(self, request):
+        if request.path.startswith(self.prefijos):
+            # Sin clave de sesión: vacía, no se carga de la base ni se guarda
+            request.sin_sesion = True
+            request.session = self.SessionStore(None)
+            return
+        super().process_request(request)
+
+    def process_response(self, request, response):
+        if sin_sesion(request):
+            return response
+        session = getattr(request, 'session', None)
+        if session is not None and es_ajax(request) and not session.modified:
+            if session.accessed:
+                patch_vary_headers(response, ('Cookie',))
+            return response
+        return super().process_response(request, response)
 
 
 class SessionTimeoutMiddleware:
     """
     Middleware que gestiona el timeout de sesión
     Agrega información al contexto sobre el tiempo restante
+    Los pedidos AJAX no cuentan como actividad del usuario.
     """
-    
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
-    
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
     def __call__(self, request):
-        if request.user.is_authenticated:
-            # Obtener el tiempo de última actividad
-            last_activity = request.session.get('last_activity')
-            
-            if last_activity:
-                # Calcular tiempo transcurrido
-                elapsed_time = (timezone.now() - timezone.datetime.fromisoformat(last_activity)).total_seconds()
-                timeout = settings.SESSION_COOKIE_AGE
-                tiempo_restante = int(timeout - elapsed_time)
-                
-                # Agregar información de sesión al request
-                request.session_timeout = tiempo_restante
-                request.session_warning = tiempo_restante <= 300  # Advertir en últimos 5 minutos
-            else:
-                request.session_timeout = settings.SESSION_COOKIE_AGE
-                request.session_warning = False
-            
-            # Actualizar última actividad
-            request.session['last_activity'] = timezone.now().isoformat()
-            # Resetear warning cuando hay actividad
-            if 'warning_shown' in request.session:
-                del request.session['warning_shown']
-        
+        if self.async_mode:
+            return self.__acall__(request)
+        if not sin_sesion(request) and not es_ajax(request):
+            self.registrar_actividad(request)
         response = self.get_response(request)
         return response
 
+    async def __acall__(self, request):
+        if not sin_sesion(request) and not es_ajax(request):
+            # Lee y escribe la sesión: va a un hilo
+            await sync_to_async(self.registrar_actividad)(request)
+        return await self.get_response(request)
+
+    def registrar_actividad(self, request):
+        if not request.user.is_authenticated:
+            return
+        # Obtener el tiempo de última actividad
+        last_activity = request.session.get('last_activity')
+        ahora = timezone.now()
+
+        if last_activity:
+            # Calcular tiempo transcurrido
+            elapsed_time = (ahora - timezone.datetime.fromisoformat(last_activity)).total_seconds()
+            timeout = settings.SESSION_COOKIE_AGE
+            tiempo_restante = int(timeout - elapsed_time)
+
+            # Agregar información de sesión al request
+            request.session_timeout = tiempo_restante
+            request.session_warning = tiempo_restante <= 300  # Advertir en últimos 5 minutos
+        else:
+            request.session_timeout = settings.SESSION_COOKIE_AGE
+            request.session_warning = False
+
+        # Actualizar última actividad
+        request.session['last_activity'] = ahora.isoformat()
+        # Resetear warning cuando hay actividad
+        request.session.pop('warning_shown', None)
+
 
 class ForcePasswordChangeMiddleware:
     """
     Middleware que obliga a los usuarios a cambiar su contraseña
     si tienen el flag debe_cambiar_password activado
     """
-    
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
-    
-    def __call__(self, request):
-        # URLs que no requieren cambio de contraseña
-        exempt_urls = [
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        # URLs que no requieren cambio de contraseña (se resuelven una sola vez)
+        self.exempt_urls = frozenset([
             reverse('usuarios:cambiar_password'),
             reverse('usuarios:logout'),
-        ]
-        
+        ])
+        self.exempt_prefixes = ('/' + settings.STATIC_URL.lstrip('/'),)
+
+    def exento(self, request):
+        return (
+            sin_sesion(request)
+            or request.path in self.exempt_urls
+            or request.path.startswith(self.exempt_prefixes)
+        )
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
         # Verificar si el usuario debe cambiar contraseña
-        if request.user.is_authenticated and request.user.debe_cambiar_password:
+        if (
+            not self.exento(request)
+            and request.user.is_authenticated
+            and request.user.debe_cambiar_password
+        ):
             # Permitir acceso solo a las URLs exentas
-            if request.path not in exempt_urls and not request.path.startswith('/static/'):
-                return redirect('usuarios:cambiar_password')
-        
+            return redirect('usuarios:cambiar_password')
+
         response = self.get_response(request)
         return response
+
+    async def __acall__(self, request):
+        if not self.exento(request):
+            usuario = await request.auser()
+            if usuario.is_authenticated and usuario.debe_cambiar_password:
+                return redirect('usuarios:cambiar_password')
+        return await self.get_response(request)
@@ -1,8 +1,11 @@
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.db import models, transaction
 from django.core.validators import RegexValidator
 from django.utils.translation import gettext_lazy as _
 
+from auditoria.eventos import registrar as registrar_auditoria
+from integraciones.outbox import publicar_muchos
+
 
 class Usuario(AbstractUser):
     """
@@ -72,6 +75,9 @@ class Usuario(AbstractUser):
         verbose_name='Fecha de Actualización'
     )
     
+    # (rol, is_active) tal como se leyeron de la base; sus cambios se auditan
+    auditado_original = None
+    
     # Configuración del modelo
     class Meta:
         verbose_name = 'Usuario'
@@ -81,6 +87,48 @@ class Usuario(AbstractUser):
     def __str__(self):
         return f"{self.get_full_name()} ({self.dni})"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instancia = super().from_db(db, field_names, values)
+        if 'rol' in field_names and 'is_active' in field_names:
+            instancia.auditado_original = (instancia.rol, instancia.is_active)
+        return instancia
+    
+    def save(self, *args, **kwargs):
+        """
+        Guarda el usuario y audita el alta y los cambios de rol o de estado
+        Los mismos cambios se publican en el outbox, en la misma transacción.
+        """
+        nuevo = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            cambios = []
+            if nuevo:
+                cambios.append(('alta', {'rol': self.rol}))
+            elif self.auditado_original is not None:
+                rol, activo = self.auditado_original
+                if rol != self.rol:
+                    cambios.append(('rol', {'antes': rol, 'despues': self.rol}))
+                if activo != self.is_active:
+                    cambios.append(('activacion' if self.is_active else 'desactivacion', {}))
+            for accion, datos in cambios:
+                registrar_auditoria('usuario', self.pk, accion, **datos)
+            if cambios:
+                publicar_muchos([
+                    (f'usuario.{accion}', self.pk, self.datos_integracion()) for accion, _ in cambios
+                ])
+        self.auditado_original = (self.rol, self.is_active)
+    
+    def datos_integracion(self):
+        """Datos que se publican en el outbox (ver integraciones/outbox.py)"""
+        return {
+            'username': self.username,
+            'dni': self.dni,
+            'email': self.email,
+            'rol': self.rol,
+            'is_active': self.is_active,
+        }
+    
     def get_full_name(self):
         """Retorna el nombre completo del usuario"""
         if self.first_name and self.last_name:
@@ -0,0 +1,19 @@
+"""
+Tareas en segundo plano de usuarios (ver trabajos/cola.py)
+"""
+from django.conf import settings
+from django.core.mail import send_mail
+from django.core.management import call_command
+from trabajos.cola import tarea
+
+
+@tarea(max_intentos=5)
+def enviar_email(asunto, mensaje, destinatarios):
+    """Envía un email; si el servidor SMTP falla, el worker lo reintenta"""
+    send_mail(asunto, mensaje, settings.DEFAULT_FROM_EMAIL, destinatarios, fail_silently=False)
+
+
+@tarea()
+def limpiar_sesiones():
+    """Borra las sesiones vencidas (equivale a manage.py clearsessions)"""
+    call_command('clearsessions')
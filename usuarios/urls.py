@@ -25,6 +25,10 @@ urlpatterns = [
     path('<int:pk>/editar/', views.UsuarioUpdateView.as_view(), name='editar'),
     path('<int:pk>/eliminar/', views.UsuarioDeleteView.as_view(), name='eliminar'),
     
+    # Estadísticas internas (solo administradores)
+    path('estadisticas/cache/', views.EstadisticasCacheView.as_view(), name='estadisticas_cache'),
+    path('estadisticas/perfiles/', views.PerfilesView.as_view(), name='estadisticas_perfiles'),
+    
     # Perfil de usuario
     path('perfil/', views.PerfilView.as_view(), name='perfil'),
     path('perfil/editar/', views.EditarPerfilView.as_view(), name='editar_perfil'),
@@ -1,15 +1,16 @@
 from django.shortcuts import render, redirect, get_object_or_404
-from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView, TemplateView, FormView
+from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView, TemplateView, FormView, View
 from django.contrib.auth.views import LoginView, LogoutView, PasswordChangeView
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.contrib.auth import login, update_session_auth_hash
 from django.contrib import messages
+from django.conf import settings
 from django.urls import reverse_lazy
 from django.db import transaction
 from django.db.models import Q
 from django.core.exceptions import PermissionDenied
-from django.core.mail import send_mail
-from django.conf import settings
+from django.http import HttpResponse, JsonResponse
+from django.utils import timezone
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django.utils.encoding import force_bytes, force_str
 from django.contrib.auth.tokens import default_token_generator
@@ -17,20 +18,44 @@ from datetime import date, datetime, timedelta
 import secrets
 import string
 
+from auditoria.eventos import registrar as registrar_auditoria
 from .models import Usuario, PerfilUsuario
 from .forms import CustomLoginForm, UsuarioCreateForm, UsuarioUpdateForm, CustomPasswordChangeForm, PerfilUsuarioForm
 from .perfil_forms import PerfilUpdateForm
+from .tareas import enviar_email
+from .hashers import hashear_contrasena_inicial
+from . import limites
+from .limites import LimiteIntentosMixin, ip_cliente
 
 
-class CustomLoginView(LoginView):
+class CustomLoginView(LimiteIntentosMixin, LoginView):
     """
     Vista personalizada de inicio de sesión
+    Limita los intentos por IP (todos) y por usuario (solo los fallidos)
+    antes de buscar al usuario o verificar la contraseña.
     """
     template_name = 'usuarios/login.html'
     redirect_authenticated_user = True
     
+    def get_claves_limite(self):
+        return {
+            'login_ip': ip_cliente(self.request),
+            'login_usuario': self.request.POST.get('username', ''),
+        }
+    
+    def post(self, request, *args, **kwargs):
+        response = super().post(request, *args, **kwargs)
+        if response.status_code != 429:
+            limites.registrar({'login_ip': self.claves_limite['login_ip']})
+        return response
+    
+    def form_invalid(self, form):
+        limites.registrar({'login_usuario': self.claves_limite['login_usuario']})
+        return super().form_invalid(form)
+    
     def form_valid(self, form):
         """Maneja el login exitoso"""
+        limites.reiniciar({'login_usuario': self.claves_limite['login_usuario']})
         response = super().form_valid(form)
         user = form.get_user()
         
@@ -98,6 +123,50 @@ class AdminRequiredMixin(UserPassesTestMixin):
         return redirect('home')
 
 
+class EstadisticasCacheView(AdminRequiredMixin, View):
+    """
+    Vista JSON con aciertos, fallos y ratio por alias de caché (solo administradores)
+    Los valores corresponden al proceso que atiende la solicitud.
+    """
+    
+    def get(self, request):
+        from gestion_academica.cache_backends import get_estadisticas
+        return JsonResponse({
+            'caches': get_estadisticas(),
+            'limites_rechazados': limites.get_rechazos(),
+        })
+
+
+class PerfilesView(AdminRequiredMixin, View):
+    """
+    Perfiles acumulados por PerfiladoMiddleware (solo administradores)
+    ?formato=resumen (JSON, por defecto), collapsed (texto) o speedscope (JSON)
+    y ?vista=<nombre de la vista> para exportar una sola. POST los reinicia.
+    """
+    
+    def get(self, request):
+        from gestion_academica import perfilado
+        formato = request.GET.get('formato', 'resumen')
+        vista = request.GET.get('vista') or None
+        if formato == 'collapsed':
+            response = HttpResponse(perfilado.exportar_collapsed(vista), content_type='text/plain; charset=utf-8')
+            response['Content-Disposition'] = 'attachment; filename="perfiles.collapsed.txt"'
+            return response
+        if formato == 'speedscope':
+            response = JsonResponse(perfilado.exportar_speedscope(vista))
+            response['Content-Disposition'] = 'attachment; filename="perfiles.speedscope.json"'
+            return response
+        return JsonResponse({
+            'activo': settings.PERFILADO_ACTIVO,
+            'vistas': perfilado.get_resumen(),
+        })
+    
+    def post(self, request):
+        from gestion_academica import perfilado
+        perfilado.reiniciar_perfiles()
+        return JsonResponse({'reiniciado': True})
+
+
 class UsuarioListView(AdminRequiredMixin, ListView):
     """
     Vista para listar usuarios (solo administradores)
@@ -278,7 +347,8 @@ class UsuarioCreateView(AdminRequiredMixin, CreateView):
             dni = form.cleaned_data['dni']
             materias_asignadas = form.cleaned_data.get('materias', [])
             
-            form.instance.set_password(dni)
+            # Hash barato: se reemplaza por el de la política en el primer login
+            form.instance.password = hashear_contrasena_inicial(dni)
             form.instance.debe_cambiar_password = True
             
             response = super().form_valid(form)
@@ -371,7 +441,10 @@ class UsuarioUpdateView(AdminRequiredMixin, UpdateView):
                 materias_seleccionadas = form.cleaned_data.get('materias', [])
                 
                 # Desasignar materias que ya no están seleccionadas
-                Materia.objects.filter(docente=self.object).update(docente=None)
+                # update() no toca auto_now: la API usa fecha_actualizacion como versión
+                Materia.objects.filter(docente=self.object).update(
+                    docente=None, fecha_actualizacion=timezone.now()
+                )
                 
                 # Asignar las nuevas materias seleccionadas
                 if materias_seleccionadas:
@@ -488,9 +561,11 @@ class EditarPerfilView(LoginRequiredMixin, UpdateView):
 
 
 # Vistas de Recuperación de Contraseña
-class RecuperarPasswordView(FormView):
+class RecuperarPasswordView(LimiteIntentosMixin, FormView):
     """
     Vista para solicitar recuperación de contraseña
+    Cada solicitud (válida o no) cuenta para los límites por IP y por email,
+    que se verifican antes de consultar la base o encolar el email.
     """
     template_name = 'usuarios/recuperar_password.html'
     success_url = reverse_lazy('usuarios:recuperar_password_enviado')
@@ -499,17 +574,25 @@ class RecuperarPasswordView(FormView):
         from .forms import RecuperarPasswordForm
         return RecuperarPasswordForm
     
+    def get_claves_limite(self):
+        return {
+            'recuperar_ip': ip_cliente(self.request),
+            'recuperar_email': self.request.POST.get('email', ''),
+        }
+    
+    def post(self, request, *args, **kwargs):
+        response = super().post(request, *args, **kwargs)
+        if response.status_code != 429:
+            limites.registrar(self.claves_limite)
+        return response
+    
     def form_valid(self, form):
         """Envía el email de recuperación"""
         email = form.cleaned_data['email']
         
-        # Registrar intento de recuperación (para prevenir spam/ataques)
-        import logging
-        logger = logging.getLogger(__name__)
-        logger.info(f"Intento de recuperación de contraseña para: {email}")
-        
         try:
             usuario = Usuario.objects.get(email=email, is_active=True)
+            registrar_auditoria('usuario', usuario.pk, 'recuperar_password')
             
             # Generar token de recuperación
             token = default_token_generator.make_token(usuario)
@@ -541,7 +624,8 @@ class RecuperarPasswordView(FormView):
     def enviar_email_recuperacion(self, usuario, reset_link):
         """
         Envía el email de recuperación de contraseña
-        En desarrollo, solo imprime el enlace
+        El enlace es un token válido: no se escribe en logs ni en consola
+        (en desarrollo, EMAIL_BACKEND de consola muestra el email completo)
         """
         asunto = 'Recuperación de Contraseña - Sistema de Gestión Académica'
         mensaje = f"""
@@ -559,29 +643,8 @@ class RecuperarPasswordView(FormView):
         Sistema de Gestión Académica
         """
         
-        # En desarrollo, imprimir el enlace en la consola
-        print(f"\n{'='*50}")
-        print("EMAIL DE RECUPERACIÓN DE CONTRASEÑA")
-        print(f"{'='*50}")
-        print(f"Para: {usuario.email}")
-        print(f"Asunto: {asunto}")
-        print(f"Enlace de recuperación: {reset_link}")
-        print(f"{'='*50}\n")
-        
-        # Enviar email real
-        try:
-            send_mail(
-                asunto,
-                mensaje,
-                settings.DEFAULT_FROM_EMAIL,
-                [usuario.email],
-                fail_silently=False,
-            )
-            print(f"✅ Email enviado correctamente a {usuario.email}")
-        except Exception as e:
-            print(f"❌ Error al enviar email: {e}")
-            # Aún así mostramos el enlace en consola como respaldo
-            pass
+        # Enviar email real en segundo plano (el worker reintenta si falla el SMTP)
+        enviar_email.encolar(prioridad=10, asunto=asunto, mensaje=mensaje, destinatarios=[usuario.email])
 
 
 class RecuperarPasswordEnviadoView(TemplateView):
@@ -631,10 +694,7 @@ class RestablecerPasswordView(FormView):
         """Establece la nueva contraseña"""
         nueva_password = form.cleaned_data['new_password1']
         
-        # Registrar cambio de contraseña
-        import logging
-        logger = logging.getLogger(__name__)
-        logger.info(f"Contraseña restablecida para usuario: {self.usuario.username} ({self.usuario.email})")
+        registrar_auditoria('usuario', self.usuario.pk, 'restablecer_password')
         
         # Cambiar contraseña
         self.usuario.set_password(nueva_password)
@@ -680,18 +740,7 @@ Saludos,
 Sistema de Gestión Académica
         """
         
-        try:
-            send_mail(
-                asunto,
-                mensaje,
-                settings.DEFAULT_FROM_EMAIL,
-                [usuario.email],
-                fail_silently=True,
-            )
-        except Exception as e:
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.error(f"Error al enviar notificación de cambio de contraseña: {e}")
+        enviar_email.encolar(asunto=asunto, mensaje=mensaje, destinatarios=[usuario.email])
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)